@@ -0,0 +1,165 @@
+# cooking_agent/benchmarks/bench_adapter_pool.py
+"""
+MCP 어댑터 HTTP 호출 벤치마크: 요청마다 httpx.AsyncClient 생성(이전) vs 공용 keep-alive 연결 풀(현재)
+
+모의 서버(smart_home_app/mock-server)를 띄우고, 냉장고/인덕션 어댑터의 get_status()를 번갈아 호출합니다.
+- sequential : 1,000건을 하나씩 (호출마다 연결을 새로 맺는 비용이 그대로 드러남)
+- concurrent : 1,000건을 한꺼번에 (이전 방식은 연결 1,000개, 공용 풀은 MCP_HTTP_MAX_CONNECTIONS개로 제한)
+출력: 전체 시간, 처리량(calls/s), 호출당 지연 p50/p99(ms), 오류 수, 서버와 맺은 TCP 연결 수
+
+실행 (back 디렉토리에서): python benchmarks/bench_adapter_pool.py [--calls 1000] [--url http://127.0.0.1:10000]
+--url 이 없으면 모의 서버를 직접 띄웁니다.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mcp_utils.adapters as adapters
+from mcp_utils.adapters import InductionMCPAdapter, RefrigeratorMCPAdapter
+from utils.metrics import observe_tool_call
+
+MOCK_SERVER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "mock-server")
+
+
+class LegacyRequestMixin:
+    """이전 방식: 요청마다 AsyncClient를 만들고 닫음 (adapters.py 변경 전 _request와 동일)"""
+
+    async def _request(self, method: str, endpoint: str, params: dict = None, data: dict = None) -> dict:
+        tool = f"{method} /{endpoint.strip('/').split('/')[0]}"
+        started = time.perf_counter()
+        async with httpx.AsyncClient() as client:
+            try:
+                response = await client.request(method, f"{self.base_url}{endpoint}", params=params, json=data)
+                response.raise_for_status()
+                observe_tool_call(self.mcp_type, tool, started)
+                return response.json()
+            except httpx.HTTPError:
+                observe_tool_call(self.mcp_type, tool, started, error=True)
+                raise
+
+
+class LegacyRefrigerator(LegacyRequestMixin, RefrigeratorMCPAdapter):
+    pass
+
+
+class LegacyInduction(LegacyRequestMixin, InductionMCPAdapter):
+    pass
+
+
+class ConnectionCounter:
+    """httpx 전송 계층에서 새 TCP 연결 수를 셉니다."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        logger = logging.getLogger("httpcore.connection")
+        logger.setLevel(logging.DEBUG)
+        logger.propagate = False
+        logger.addHandler(self._Handler(self))
+
+    class _Handler(logging.Handler):
+        def __init__(self, counter: "ConnectionCounter") -> None:
+            super().__init__(logging.DEBUG)
+            self.counter = counter
+
+        def emit(self, record: logging.LogRecord) -> None:
+            if record.getMessage().startswith("connect_tcp.complete"):
+                self.counter.count += 1
+
+
+async def timed_call(adapter) -> tuple:
+    start = time.perf_counter()
+    try:
+        await adapter.get_status()
+        return (time.perf_counter() - start) * 1000, None
+    except httpx.HTTPError as e:
+        return (time.perf_counter() - start) * 1000, type(e).__name__
+
+
+async def run_case(pair: list, calls: int, concurrent: bool) -> dict:
+    start = time.perf_counter()
+    if concurrent:
+        results = await asyncio.gather(*(timed_call(pair[i % 2]) for i in range(calls)))
+    else:
+        results = [await timed_call(pair[i % 2]) for i in range(calls)]
+    elapsed = time.perf_counter() - start
+    latencies = sorted(latency for latency, error in results if error is None)
+    return {
+        "elapsed_s": elapsed,
+        "calls_per_s": calls / elapsed,
+        "p50_ms": statistics.median(latencies) if latencies else float("nan"),
+        "p99_ms": latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] if latencies else float("nan"),
+        "errors": sum(1 for _, error in results if error is not None),
+    }
+
+
+async def wait_ready(url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(f"{url}/")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"모의 서버 준비 시간 초과: {url}")
+
+
+async def main(url: str, calls: int) -> None:
+    os.environ.setdefault("REFRIGERATOR_MCP_URL", f"{url}/refrigerator")
+    os.environ.setdefault("INDUCTION_MCP_URL", f"{url}/api/induction")
+    await wait_ready(url)
+    counter = ConnectionCounter()
+    variants = {
+        "per-call client": [LegacyRefrigerator(), LegacyInduction()],
+        "pooled client": [RefrigeratorMCPAdapter(), InductionMCPAdapter()],
+    }
+    # 연결/임포트 워밍업
+    for pair in variants.values():
+        await run_case(pair, 10, concurrent=False)
+
+    print(f"calls: {calls} (refrigerator/induction get_status alternating), target: {url}, "
+          f"pool max_connections={adapters.MCP_HTTP_MAX_CONNECTIONS}")
+    print(f"{'mode':10} | {'client':15} | {'total':>8} | {'calls/s':>8} | {'p50':>8} | {'p99':>9} | "
+          f"{'errors':>6} | {'tcp connects':>12}")
+    for concurrent in (False, True):
+        for name, pair in variants.items():
+            await adapters.close_http_client()
+            before = counter.count
+            result = await run_case(pair, calls, concurrent)
+            print(f"{'concurrent' if concurrent else 'sequential':10} | {name:15} | {result['elapsed_s']:>7.2f}s | "
+                  f"{result['calls_per_s']:>8.0f} | {result['p50_ms']:>6.2f}ms | {result['p99_ms']:>7.2f}ms | "
+                  f"{result['errors']:>6} | {counter.count - before:>12}")
+    await adapters.close_http_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--url", help="실행 중인 모의 서버 주소 (없으면 직접 띄움)")
+    parser.add_argument("--port", type=int, default=10099, help="직접 띄울 모의 서버 포트")
+    args = parser.parse_args()
+
+    server = None
+    target = args.url
+    if target is None:
+        target = f"http://127.0.0.1:{args.port}"
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port), "--log-level", "warning"],
+            cwd=MOCK_SERVER_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+    try:
+        asyncio.run(main(target.rstrip("/"), args.calls))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
@@ -0,0 +1,184 @@
+# cooking_agent/benchmarks/bench_delta_checkpoint.py
+"""
+델타 체크포인트 벤치마크 (replay LLM + 스텁 MCP, 완전 오프라인)
+
+--steps 단계짜리 레시피로 요리 세션("김치찌개 레시피 알려줘" → "요리 계속 진행해줘")을 실행하면서
+기존 AsyncSqliteSaver(plain)와 DeltaAsyncSqliteSaver(delta)를 임시 SQLite 파일에서 비교합니다.
+- DB 크기(연결을 닫은 뒤 파일 크기)와 테이블별 저장 바이트
+- 체크포인트 저장(aput) / 쓰기 저장(aput_writes) 지연 시간 p50/p95
+- blob 정리: 실행이 끝나면 서버 종료 때처럼 aprune_blobs를 호출 (참조 중인 blob을 지우면 아래 복원 검증에서 실패)
+- 복원 검증: 새 saver(빈 캐시)로 파일을 다시 열어 get_state_history로 읽은 모든 체크포인트가
+  aput 호출 시점의 채널 값과 같아야 함 (호출 즉시 깊은 복사해 둔 값과 비교)
+
+실행 (back 디렉토리에서): python benchmarks/bench_delta_checkpoint.py [--steps 30] [--sessions 1]
+"""
+import argparse
+import asyncio
+import copy
+import importlib
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiosqlite
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from bench_node_overhead import SCRIPT_PATH, STUB_RESULTS
+from graph_builder import create_cooking_agent_graph
+from utils.delta_checkpoint import DeltaAsyncSqliteSaver
+from utils.llm_provider import ReplayScript, set_llm_provider
+
+SESSION = ["김치찌개 레시피 알려줘", "요리 계속 진행해줘"]
+SAVERS = {"plain": AsyncSqliteSaver, "delta": DeltaAsyncSqliteSaver}
+
+
+def make_stub(steps: int):
+    base = STUB_RESULTS[("cooking", "get_recipe_steps")]
+    plan = [
+        {**base[i % len(base)], "instruction": f"{i + 1}단계: {base[i % len(base)]['instruction']}"}
+        for i in range(steps)
+    ]
+    results = {**STUB_RESULTS, ("cooking", "get_recipe_steps"): plan}
+
+    async def stub_call_mcp_tool(mcp_server_name, tool_name, tool_args=None):
+        return results.get((mcp_server_name, tool_name), {"status": "ok"})
+
+    return stub_call_mcp_tool
+
+
+def timed(saver, name: str, latencies: list, expected: dict = None) -> None:
+    original = getattr(saver, name)
+
+    async def wrapper(*args, **kwargs):
+        if expected is not None:
+            checkpoint = args[1]
+            expected[checkpoint["id"]] = copy.deepcopy(checkpoint["channel_values"])
+        start = time.perf_counter()
+        try:
+            return await original(*args, **kwargs)
+        finally:
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    setattr(saver, name, wrapper)
+
+
+def percentile(values: list, q: float) -> float:
+    return statistics.quantiles(values, n=100)[q - 1] if len(values) > 1 else (values[0] if values else 0.0)
+
+
+async def table_bytes(conn) -> dict:
+    sizes = {}
+    queries = {
+        "checkpoints": "SELECT COUNT(*), COALESCE(SUM(LENGTH(checkpoint) + LENGTH(metadata)), 0) FROM checkpoints",
+        "writes": "SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM writes",
+        "checkpoint_blobs": "SELECT COUNT(*), COALESCE(SUM(LENGTH(hash) + COALESCE(LENGTH(prev), 0) + LENGTH(data)), 0) FROM checkpoint_blobs",
+    }
+    for table, query in queries.items():
+        try:
+            sizes[table] = tuple(await (await conn.execute(query)).fetchone())
+        except aiosqlite.OperationalError:
+            continue
+    return sizes
+
+
+async def restore(saver_cls, path: str, threads: list, expected: dict) -> tuple:
+    """새 saver(빈 캐시)로 파일을 다시 열어 모든 체크포인트를 get_state_history로 읽고, 저장 시점 값과 다른 개수를 셉니다."""
+    saver = saver_cls(aiosqlite.connect(path))
+    graph = create_cooking_agent_graph(checkpointer=saver)
+    restored, mismatched = 0, 0
+    start = time.perf_counter()
+    for thread_id in threads:
+        async for snapshot in graph.aget_state_history({"configurable": {"thread_id": thread_id}}):
+            values = expected[snapshot.config["configurable"]["checkpoint_id"]]
+            restored += 1
+            # 저장 시점에 없던 리듀서 채널(messages)은 복원 시 빈 리스트로 보이므로 같은 것으로 봄
+            mismatched += any(values.get(key) != value and (key in values or value) for key, value in snapshot.values.items())
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    await saver.conn.close()
+    return restored, mismatched, elapsed_ms
+
+
+async def run(name: str, directory: str, steps: int, sessions: int) -> dict:
+    path = os.path.join(directory, f"{name}.sqlite")
+    saver = SAVERS[name](aiosqlite.connect(path))
+    put_ms, writes_ms, expected = [], [], {}
+    timed(saver, "aput", put_ms, expected)
+    timed(saver, "aput_writes", writes_ms)
+    graph = create_cooking_agent_graph(checkpointer=saver)
+    threads = [f"bench-session-{i}" for i in range(sessions)]
+
+    start = time.perf_counter()
+    for thread_id in threads:
+        config = {"configurable": {"thread_id": thread_id}, "recursion_limit": steps * 2 + 20}
+        for message in SESSION:
+            await graph.ainvoke({"messages": [HumanMessage(content=message)]}, config=config)
+    session_s = time.perf_counter() - start
+
+    final = await graph.aget_state({"configurable": {"thread_id": threads[0]}})
+    pruned = await saver.aprune_blobs() if hasattr(saver, "aprune_blobs") else 0
+    tables = await table_bytes(saver.conn)
+    await saver.conn.close()
+    file_bytes = sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+    restored, mismatched, restore_ms = await restore(SAVERS[name], path, threads, expected)
+    return {
+        "name": name, "session_s": session_s, "put_ms": put_ms, "writes_ms": writes_ms, "tables": tables,
+        "file_bytes": file_bytes, "restored": restored, "mismatched": mismatched, "restore_ms": restore_ms,
+        "pruned": pruned,
+        "executed_steps": sum("단계:" in str(m.content) for m in final.values["messages"]),
+        "messages": len(final.values["messages"]),
+    }
+
+
+async def main(steps: int, sessions: int) -> int:
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter("ignore")
+    set_llm_provider("replay", ReplayScript.load(SCRIPT_PATH))
+    stub = make_stub(steps)
+    for module in ("nodes.cooking_planner_node", "nodes.ingredient_check_node",
+                   "nodes.replanning_or_guidance_node", "mcp_utils.mcp_client"):
+        importlib.import_module(module).call_mcp_tool = stub
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = [await run(name, directory, steps, sessions) for name in SAVERS]
+
+    plain = results[0]
+    print(f"[session] {steps}단계 레시피 x {sessions}세션: 실행한 단계 {plain['executed_steps']}, 메시지 {plain['messages']}개, "
+          f"체크포인트 {len(plain['put_ms'])}개, 쓰기 {len(plain['writes_ms'])}건")
+    print(f"  {'saver':<6} {'file':>10} {'checkpoints':>12} {'writes':>10} {'blobs':>10} "
+          f"{'aput p50/p95':>16} {'writes p50/p95':>16} {'session':>9} {'restore':>9}")
+    for r in results:
+        tables = r["tables"]
+        blobs = tables.get("checkpoint_blobs", (0, 0))
+        print(f"  {r['name']:<6} {r['file_bytes']:>9}B {tables['checkpoints'][1]:>11}B {tables['writes'][1]:>9}B {blobs[1]:>9}B "
+              f"{percentile(r['put_ms'], 50):>7.2f}/{percentile(r['put_ms'], 95):<6.2f}ms "
+              f"{percentile(r['writes_ms'], 50):>7.2f}/{percentile(r['writes_ms'], 95):<6.2f}ms "
+              f"{r['session_s']:>8.2f}s {r['restore_ms']:>7.1f}ms")
+
+    plain_stored = sum(size for _, size in plain["tables"].values())
+    for r in results[1:]:
+        stored = sum(size for _, size in r["tables"].values())
+        print(f"  {r['name']}: 저장 바이트 {plain_stored}B -> {stored}B ({stored / plain_stored:.1%}), "
+              f"파일 {plain['file_bytes']}B -> {r['file_bytes']}B ({r['file_bytes'] / plain['file_bytes']:.1%})")
+    for r in results:
+        print(f"  [restore] {r['name']}: 체크포인트 {r['restored']}개 중 저장 시점과 다른 값 {r['mismatched']}개 (정리한 blob {r['pruned']}개)")
+    delta = results[-1]
+    if delta["mismatched"] or delta["restored"] != len(delta["put_ms"]):
+        print("FAIL delta 체크포인터가 저장 시점의 상태를 그대로 복원하지 못했습니다.")
+        return 1
+    print(f"OK: 빈 캐시에서 복원한 delta 체크포인트 {delta['restored']}개가 모두 저장 시점 값과 같습니다.")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=30)
+    parser.add_argument("--sessions", type=int, default=1)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.steps, args.sessions)))
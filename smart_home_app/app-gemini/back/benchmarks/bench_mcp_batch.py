@@ -0,0 +1,120 @@
+# cooking_agent/benchmarks/bench_mcp_batch.py
+"""
+MCP 도구 호출 벤치마크: 하나씩 await(이전) vs call_mcp_tools 동시 호출(현재)
+
+MultiServerMCPClient 대신 도구마다 고정 지연(--latency-ms)을 두는 가짜 클라이언트를 넣어,
+서버별 동시 호출 상한(get_server_semaphore)과 메트릭 기록을 포함한 실제 call_mcp_tool 경로를 그대로 탑니다.
+- device_control : 서로 다른 기기 4건 (device_control_node의 pending_mcp_calls)
+- same_server    : 한 서버로 8건 (MCP_SERVER_CONCURRENCY 상한만큼만 동시에 실행되는지 확인)
+- with_error     : 4건 중 1건 실패 (나머지 결과와 순서가 그대로인지 확인)
+- planner_flow   : cooking_planner -> ingredient_check 노드 실행 (검색 후 단계/재고를 함께 조회)
+
+실행 (back 디렉토리에서): python benchmarks/bench_mcp_batch.py [--latency-ms 50] [--rounds 20]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import HumanMessage
+
+from mcp_utils.mcp_client import DEFAULT_SERVER_CONCURRENCY, MCPClientManager, call_mcp_tool, call_mcp_tools
+from nodes import cooking_planner_node, ingredient_check_node
+
+RESULTS = {
+    ("cooking", "search_recipes"): [{"id": "kimchi-stew", "name": "김치찌개"}],
+    ("cooking", "get_recipe_steps"): [{"instruction": "김치와 돼지고기를 볶아주세요.", "ingredients": ["김치", "돼지고기"]}],
+    ("refrigerator", "get_contents"): ["김치", "돼지고기", "물", "대파"],
+}
+
+SCENARIOS = {
+    "device_control": [
+        ("induction", "set_power", {"power": 7}),
+        ("microwave", "start", {"seconds": 60}),
+        ("refrigerator", "get_contents", {}),
+        ("mobile", "send_message", {"text": "요리 시작"}),
+    ],
+    "same_server": [("induction", "get_status", {})] * 8,
+    "with_error": [
+        ("induction", "set_power", {"power": 7}),
+        ("microwave", "explode", {}),
+        ("refrigerator", "get_contents", {}),
+        ("mobile", "send_message", {"text": "요리 시작"}),
+    ],
+}
+
+
+class FakeMCPClient:
+    """도구마다 latency 초 뒤에 응답하는 MultiServerMCPClient 대역 (explode 도구는 실패)"""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.calls = 0
+
+    async def call_tool(self, server_name: str, tool_name: str, input_args: dict):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if tool_name == "explode":
+            raise RuntimeError(f"{server_name}.{tool_name} failed")
+        return RESULTS.get((server_name, tool_name), {"status": "ok"})
+
+
+async def run_serial(calls: list) -> list:
+    results = []
+    for server, tool, args in calls:
+        try:
+            results.append(await call_mcp_tool(server, tool, args))
+        except Exception as e:
+            results.append({"error": str(e)})
+    return results
+
+
+async def run_batch(calls: list) -> list:
+    return [outcome["result"] if outcome["ok"] else {"error": outcome["error"]} for outcome in await call_mcp_tools(calls)]
+
+
+async def run_planner_flow() -> dict:
+    state = {"messages": [HumanMessage(content="김치찌개 레시피 알려줘")], "recipe_query": "김치찌개"}
+    state = await cooking_planner_node(state)
+    return await ingredient_check_node(state)
+
+
+async def timed(function, *args, rounds: int) -> tuple:
+    elapsed, result = [], None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = await function(*args)
+        elapsed.append((time.perf_counter() - start) * 1000)
+    return statistics.mean(elapsed), result
+
+
+async def main(latency_ms: float, rounds: int) -> None:
+    logging.disable(logging.CRITICAL)
+    client = FakeMCPClient(latency_ms / 1000)
+    MCPClientManager._instance = client
+
+    print(f"tool latency {latency_ms}ms, {rounds} rounds, MCP_SERVER_CONCURRENCY={DEFAULT_SERVER_CONCURRENCY}")
+    print(f"{'scenario':16} {'calls':>5} {'serial':>10} {'batch':>10} {'speedup':>8}  same results")
+    for name, calls in SCENARIOS.items():
+        serial_ms, serial_results = await timed(run_serial, calls, rounds=rounds)
+        batch_ms, batch_results = await timed(run_batch, calls, rounds=rounds)
+        print(f"{name:16} {len(calls):5d} {serial_ms:8.1f}ms {batch_ms:8.1f}ms {serial_ms / batch_ms:7.2f}x  "
+              f"{serial_results == batch_results}")
+
+    client.calls = 0
+    flow_ms, state = await timed(run_planner_flow, rounds=rounds)
+    print(f"\nplanner_flow: {flow_ms:.1f}ms/run, MCP 호출 {client.calls / rounds:.0f}건/run "
+          f"(이전: 3건 순차 = {3 * latency_ms:.0f}ms 이상), missing={state.get('missing_ingredients')}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.latency_ms, args.rounds))
@@ -0,0 +1,107 @@
+# cooking_agent/benchmarks/bench_model_registry.py
+"""
+LLM 모델 레지스트리 벤치마크 (네트워크/인증 없이 실행)
+
+1. construct : 호출마다 ChatVertexAI 생성(이전 general_chat_node) vs 레지스트리 재사용(get_model)
+               project를 명시해 인증 정보 탐색 없이 생성 비용만 잽니다. (실제 환경에서는 생성마다
+               google.auth.default 탐색과 첫 호출의 채널/토큰 준비가 더해짐)
+2. budget    : replay 모델(--llm-latency-ms)로 --calls 건을 한꺼번에 호출하며
+               공용 예산(LLM_MAX_CONCURRENCY) 적용 전/후의 최대 동시 호출 수와 전체 시간을 비교합니다.
+
+실행 (back 디렉토리에서): python benchmarks/bench_model_registry.py [--calls 64] [--max-concurrency 8] [--llm-latency-ms 200]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import HumanMessage
+
+import utils.llm_provider as llm_provider
+from utils.llm_provider import ReplayScript, get_chat_model, set_llm_provider
+from utils.model_registry import LLMBudget, ModelRegistry
+
+VERTEX_ARGS = {"project": "bench-project", "location": "us-central1"}
+
+
+def bench_construct(iterations: int) -> None:
+    set_llm_provider("vertex")
+    registry = ModelRegistry()
+    config = registry.config_for("chat", **VERTEX_ARGS)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        get_chat_model("chat", **config)
+    per_call_us = (time.perf_counter() - start) / iterations * 1e6
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        registry.get("chat", **VERTEX_ARGS)
+    registry_us = (time.perf_counter() - start) / iterations * 1e6
+
+    print(f"[construct] {iterations}회: 호출마다 생성 {per_call_us:.1f}us/회, 레지스트리 {registry_us:.2f}us/회 "
+          f"(클라이언트 {registry.stats()['clients']}개)")
+
+
+class PeakCounter:
+    def __init__(self) -> None:
+        self.current = 0
+        self.peak = 0
+
+
+async def bench_budget(calls: int, max_concurrency: int, latency_ms: float) -> None:
+    llm_provider.LLM_REPLAY_LATENCY_MS = latency_ms
+    set_llm_provider("replay", ReplayScript())
+    messages = [HumanMessage(content="안녕")]
+
+    # 이전: 노드마다 모델을 만들고 제한 없이 호출
+    counter = PeakCounter()
+
+    async def unbounded_call():
+        model = get_chat_model("chat")
+        counter.current += 1
+        counter.peak = max(counter.peak, counter.current)
+        try:
+            await model.ainvoke(messages)
+        finally:
+            counter.current -= 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(unbounded_call() for _ in range(calls)))
+    unbounded_s = time.perf_counter() - start
+
+    # 현재: 역할이 달라도 하나의 예산을 공유
+    registry = ModelRegistry(budget=LLMBudget(max_concurrency=max_concurrency))
+    roles = ["chat", "planner", "intent"]
+    start = time.perf_counter()
+    await asyncio.gather(*(registry.get(roles[i % len(roles)]).ainvoke(messages) for i in range(calls)))
+    budget_s = time.perf_counter() - start
+    stats = registry.stats()
+
+    print(f"[budget] {calls}건 동시 요청, 호출당 {latency_ms:.0f}ms")
+    print(f"  제한 없음 : 최대 동시 {counter.peak:3d}건, 전체 {unbounded_s:.2f}s")
+    print(f"  공용 예산 : 최대 동시 {stats['budget']['peak_in_flight']:3d}건 (상한 {max_concurrency}), 전체 {budget_s:.2f}s, "
+          f"평균 대기 {stats['budget']['avg_wait_ms']:.1f}ms, 클라이언트 {stats['clients']}개 / 재사용 {stats['reused']}회")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--calls", type=int, default=64)
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter("ignore")
+    bench_construct(args.iterations)
+    asyncio.run(bench_budget(args.calls, args.max_concurrency, args.llm_latency_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# cooking_agent/benchmarks/bench_node_overhead.py
+"""
+쿠킹 에이전트 그래프의 노드별 오버헤드 벤치마크 (replay LLM + 스텁 MCP, 완전 오프라인)
+
+benchmarks/replay_script.json 으로 LLM 응답을 재생하고, MCP 호출은 고정 응답으로 대체한 뒤
+시나리오(일상 대화 / 레시피 검색 / 요리 단계 진행)별로 노드 실행 시간을 집계합니다.
+체크포인터는 인메모리 saver를 사용해 SQLite 파일을 건드리지 않습니다.
+
+실행 (back 디렉토리에서): python benchmarks/bench_node_overhead.py [--requests 100] [--llm-latency-ms 0]
+"""
+import argparse
+import asyncio
+import importlib
+import logging
+import os
+import statistics
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+import utils.llm_provider as llm_provider
+from graph_builder import create_cooking_agent_graph
+from utils.llm_provider import ReplayScript, set_llm_provider
+
+SCRIPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "replay_script.json")
+
+# 스텁 MCP 응답 (서버, 도구) -> 결과
+STUB_RESULTS = {
+    ("cooking", "search_recipes"): [{"id": "kimchi-stew", "name": "김치찌개"}],
+    ("cooking", "get_recipe_steps"): [
+        {"instruction": "김치와 돼지고기를 볶아주세요.", "ingredients": ["김치", "돼지고기"],
+         "mcp_needed": "induction", "mcp_tool": "start_induction_cooking", "mcp_args": {"power": 7}},
+        {"instruction": "물을 붓고 10분간 끓여주세요.", "ingredients": ["물"]},
+        {"instruction": "두부와 대파를 넣고 5분 더 끓여주세요.", "ingredients": ["두부", "대파"]},
+    ],
+    ("refrigerator", "get_contents"): ["김치", "돼지고기", "물", "대파"],
+    ("cooking", "suggest_alternatives"): {"두부": "계란"},
+}
+
+# 같은 대화(thread)에서 이어서 보내는 메시지 목록
+SCENARIOS = {
+    "general_chat": ["안녕, 오늘 기분 어때?"],
+    "recipe_search": ["김치찌개 레시피 알려줘"],
+    "cooking_steps": ["김치찌개 레시피 알려줘", "요리 계속 진행해줘"],
+}
+
+
+async def stub_call_mcp_tool(mcp_server_name: str, tool_name: str, tool_args: Optional[Dict[str, Any]] = None) -> Any:
+    return STUB_RESULTS[(mcp_server_name, tool_name)]
+
+
+class NodeTimer(BaseCallbackHandler):
+    """그래프 노드별 실행 시간을 모읍니다."""
+
+    run_inline = True
+
+    def __init__(self) -> None:
+        self._started: Dict[UUID, tuple] = {}
+        self.durations = defaultdict(list)
+
+    def on_chain_start(self, serialized, inputs, *, run_id: UUID, parent_run_id: Optional[UUID] = None,
+                       metadata: Optional[dict] = None, **kwargs: Any) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        if node and kwargs.get("name") == node:
+            self._started[run_id] = (node, time.perf_counter())
+
+    def on_chain_end(self, outputs, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            node, start = started
+            self.durations[node].append((time.perf_counter() - start) * 1000)
+
+    def on_chain_error(self, error, *, run_id: UUID, **kwargs: Any) -> None:
+        self.on_chain_end(None, run_id=run_id)
+
+
+def install_offline_stubs(llm_latency_ms: float) -> None:
+    llm_provider.LLM_REPLAY_LATENCY_MS = llm_latency_ms
+    set_llm_provider("replay", ReplayScript.load(SCRIPT_PATH))
+    # nodes 패키지가 같은 이름의 함수를 export 하므로 모듈은 importlib으로 가져옴
+    for name in ("cooking_planner_node", "ingredient_check_node", "replanning_or_guidance_node"):
+        importlib.import_module(f"nodes.{name}").call_mcp_tool = stub_call_mcp_tool
+    # call_mcp_tools(동시 호출)는 mcp_client 모듈의 call_mcp_tool을 통해 호출함
+    importlib.import_module("mcp_utils.mcp_client").call_mcp_tool = stub_call_mcp_tool
+
+
+def p95(values: list) -> float:
+    ordered = sorted(values)
+    return ordered[max(int(len(ordered) * 0.95) - 1, 0)]
+
+
+async def run_scenario(graph, name: str, messages: list, requests: int, timer: NodeTimer) -> list:
+    latencies = []
+    for i in range(requests):
+        config = {"callbacks": [timer], "configurable": {"thread_id": f"bench-{name}-{i}"}}
+        start = time.perf_counter()
+        for message in messages:
+            await graph.ainvoke({"messages": [HumanMessage(content=message)]}, config=config)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+async def main(requests: int, llm_latency_ms: float) -> None:
+    logging.disable(logging.CRITICAL)
+    install_offline_stubs(llm_latency_ms)
+    graph = create_cooking_agent_graph(checkpointer=MemorySaver())
+
+    print(f"requests per scenario: {requests} (replay LLM latency {llm_latency_ms}ms, stub MCP)")
+    for name, messages in SCENARIOS.items():
+        timer = NodeTimer()
+        latencies = await run_scenario(graph, name, messages, requests, timer)
+        print(f"\n[{name}] {len(messages)} turn(s)  mean={statistics.mean(latencies):.2f}ms p95={p95(latencies):.2f}ms")
+        print(f"  {'node':26} {'calls':>6} {'mean':>9} {'p95':>9}")
+        for node, durations in sorted(timer.durations.items()):
+            print(f"  {node:26} {len(durations):6d} {statistics.mean(durations):7.2f}ms {p95(durations):7.2f}ms")
+    print(f"\nreplay stats: {llm_provider.get_llm_provider_stats()['replay']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.llm_latency_ms))
@@ -0,0 +1,159 @@
+# cooking_agent/benchmarks/check_checkpoint_payload.py
+"""
+체크포인트 데이터 검사 + 슈퍼스텝별 크기 보고 (replay LLM + 스텁 MCP, 완전 오프라인)
+
+실제 체크포인터(ReportingAsyncSqliteSaver)를 임시 SQLite 파일로 열고 strict 모드로 시나리오를 실행합니다.
+- MCP 클라이언트는 main.py와 같이 config(configurable.mcp_clients)로만 전달합니다.
+- 어떤 슈퍼스텝이든 상태에 데이터가 아닌 값(어댑터, LLM 등)이 들어가면 저장 전에 NonDataCheckpointError로 실패합니다.
+- plain(ReportingAsyncSqliteSaver)과 delta(DeltaAsyncSqliteSaver) 체크포인터 모두 모든 체크포인트가 기록되고
+  크기가 0보다 커야 합니다. (delta는 저장용으로 만든 바이트로 크기를 잼)
+- 끝나면 스레드별 슈퍼스텝 크기(채널별 상위 3개)를 출력하고, 문제가 있으면 종료 코드 1을 반환합니다.
+
+실행 (back 디렉토리에서): python benchmarks/check_checkpoint_payload.py [--turns 3]
+      (pytest benchmarks/check_checkpoint_payload.py 로도 실행 가능)
+"""
+import argparse
+import asyncio
+import importlib
+import logging
+import os
+import sys
+import tempfile
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiosqlite
+import pytest
+from langchain_core.messages import HumanMessage
+
+from bench_node_overhead import SCRIPT_PATH, STUB_RESULTS, stub_call_mcp_tool
+from graph_builder import ReportingAsyncSqliteSaver, create_cooking_agent_graph
+from utils.checkpoint_report import CheckpointSizeReport, NonDataCheckpointError, find_non_data
+from utils.delta_checkpoint import DeltaAsyncSqliteSaver
+from utils.llm_provider import ReplayScript, set_llm_provider
+
+SCENARIOS = {
+    "general_chat": ["안녕, 오늘 기분 어때?"],
+    "cooking": ["김치찌개 레시피 알려줘", "요리 계속 진행해줘"],
+    "fridge_query": ["냉장고에 뭐 있어?"],
+}
+SAVERS = {"plain": ReportingAsyncSqliteSaver, "delta": DeltaAsyncSqliteSaver}
+
+
+class FakeRefrigeratorAdapter:
+    """config로 주입되는 런타임 의존성 대역 (직렬화할 수 없는 객체)"""
+
+    base_url = "http://fake-refrigerator"
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def get_contents(self):
+        self.calls += 1
+        return STUB_RESULTS[("refrigerator", "get_contents")]
+
+
+def setup_offline() -> None:
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter("ignore")
+    set_llm_provider("replay", ReplayScript.load(SCRIPT_PATH))
+    for name in ("cooking_planner_node", "ingredient_check_node", "replanning_or_guidance_node"):
+        importlib.import_module(f"nodes.{name}").call_mcp_tool = stub_call_mcp_tool
+    importlib.import_module("mcp_utils.mcp_client").call_mcp_tool = stub_call_mcp_tool
+
+
+async def run(saver_name: str, turns: int) -> dict:
+    """saver_name 체크포인터로 모든 시나리오를 strict + 전수 기록(sample_rate=1)으로 실행하고 결과를 모읍니다."""
+    adapter = FakeRefrigeratorAdapter()
+    mcp_clients = {"refrigerator": adapter}
+    report = CheckpointSizeReport(enabled=True, strict=True, sample_rate=1.0)
+    failures, puts = [], 0
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "check.sqlite")
+        saver = SAVERS[saver_name](aiosqlite.connect(path))
+        saver.checkpoint_report = report
+        aput = saver.aput
+
+        async def counting_aput(*args, **kwargs):
+            nonlocal puts
+            puts += 1
+            return await aput(*args, **kwargs)
+
+        saver.aput = counting_aput
+        graph = create_cooking_agent_graph(checkpointer=saver)
+        for name, messages in SCENARIOS.items():
+            config = {"configurable": {"thread_id": f"check-{name}", "mcp_clients": mcp_clients}}
+            try:
+                for _ in range(turns):
+                    for message in messages:
+                        await graph.ainvoke({"messages": [HumanMessage(content=message)]}, config=config)
+            except Exception as e:
+                failures.append(f"{name}: {type(e).__name__}: {e}")
+        await saver.conn.close()
+        db_bytes = os.path.getsize(path)
+    return {"report": report, "failures": failures, "puts": puts, "adapter_calls": adapter.calls, "db_bytes": db_bytes}
+
+
+def check(result: dict) -> None:
+    summary = result["report"].summary()
+    assert not result["failures"], result["failures"]
+    assert result["adapter_calls"] > 0, "config로 주입한 MCP 클라이언트가 호출되지 않았습니다."
+    assert summary["non_data_checkpoints"] == 0, summary
+    assert summary["checkpoints"] == result["puts"] > 0, (summary, result["puts"])
+    for entry in result["report"].recent(limit=1000):
+        assert entry["bytes"] > 0 and all(size >= 0 for size in entry["channels"].values()), entry
+
+
+def test_find_non_data_catches_adapter() -> None:
+    adapter = FakeRefrigeratorAdapter()
+    assert find_non_data({"mcp_clients": {"refrigerator": adapter}}) == ["mcp_clients.refrigerator (FakeRefrigeratorAdapter)"]
+    report = CheckpointSizeReport(enabled=False, strict=True)
+    checkpoint = {"id": "c1", "channel_values": {"messages": [], "mcp_clients": {"refrigerator": adapter}}}
+    with pytest.raises(NonDataCheckpointError):
+        report.record(None, {}, checkpoint, {})
+
+
+def test_report_is_off_by_default() -> None:
+    report = CheckpointSizeReport(enabled=False, strict=False)
+    checkpoint = {"id": "c1", "channel_values": {"mcp_clients": {"refrigerator": FakeRefrigeratorAdapter()}}}
+    assert not report.active
+    assert report.record(None, {}, checkpoint, {}) is None
+    assert report.summary()["checkpoints"] == 0
+
+
+@pytest.mark.parametrize("saver_name", list(SAVERS))
+def test_checkpoints_hold_only_data(saver_name: str, turns: int = 1) -> None:
+    setup_offline()
+    check(asyncio.run(run(saver_name, turns)))
+
+
+def main(turns: int) -> int:
+    setup_offline()
+    status = 0
+    for saver_name in SAVERS:
+        result = asyncio.run(run(saver_name, turns))
+        report = result["report"]
+        for name in SCENARIOS:
+            entries = report.recent(limit=1000, thread_id=f"check-{name}")
+            print(f"\n[{saver_name}/{name}] {len(entries)} checkpoints")
+            print(f"  {'step':>4} {'bytes':>8}  top channels")
+            for entry in entries:
+                top = ", ".join(f"{channel}={size}B" for channel, size in list(entry["channels"].items())[:3])
+                print(f"  {entry['step']:>4} {entry['bytes']:>8}  {top}")
+        print(f"\n[{saver_name}] summary: {report.summary()}, sqlite file {result['db_bytes']}B, "
+              f"adapter calls via config: {result['adapter_calls']}")
+        try:
+            check(result)
+        except AssertionError as e:
+            print(f"FAIL {saver_name}: {e}")
+            status = 1
+    print("OK: 모든 체크포인트가 데이터만 담고 있습니다." if not status else "")
+    return status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=3)
+    args = parser.parse_args()
+    sys.exit(main(args.turns))
@@ -1,11 +1,11 @@
 # cooking_agent/graph_builder.py
 import os
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.sqlite import SqliteSaver
-from langchain_core.messages import AIMessage
+import aiosqlite
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 
-from .state import AgentState
-from .nodes import (
+from state import AgentState
+from nodes import (
     supervisor_node,
     general_chat_node,
     cooking_planner_node,
@@ -17,7 +17,9 @@ from .nodes import (
     parse_intent_node,
     execute_tool_node
 )
-from .utils.logger import setup_logger
+from utils.logger import setup_logger
+from utils.checkpoint_report import CheckpointReportMixin
+from utils.delta_checkpoint import DeltaAsyncSqliteSaver
 import logging
 
 logger = logging.getLogger(__name__)
@@ -25,10 +27,28 @@ logger = logging.getLogger(__name__)
 # --- 체크포인터 설정 (main.py에서 DB 경로를 주입받거나 여기서 직접 설정) ---
 # 여기서는 DB 경로를 직접 설정하는 예시
 db_path = os.path.join(os.path.dirname(__file__), "langgraph_cooking_agent.sqlite")
-memory = SqliteSaver.from_conn_string(db_path)
 logger.info(f"LangGraph 체크포인터 DB 경로 (graph_builder): {db_path}")
+# delta: 메시지 델타 + 값 중복 제거 + 압축 (utils/delta_checkpoint.py), plain: 슈퍼스텝마다 전체 상태 저장
+CHECKPOINT_ENCODING = os.environ.get("CHECKPOINT_ENCODING", "delta")
 
-def create_cooking_agent_graph():
+
+class ReportingAsyncSqliteSaver(CheckpointReportMixin, AsyncSqliteSaver):
+    """슈퍼스텝마다 체크포인트 크기를 기록하고, 상태에 데이터가 아닌 값이 없는지 검사하는 SQLite 체크포인터"""
+
+
+def create_sqlite_checkpointer() -> AsyncSqliteSaver:
+    """
+    SQLite 체크포인터를 생성합니다. 그래프를 astream/aget_state로 비동기 실행하므로 비동기 saver를 사용하며,
+    실행 중인 이벤트 루프 안에서 호출해야 합니다. (DB 연결은 첫 사용 시 열림)
+    CHECKPOINT_ENCODING=plain이면 기존처럼 전체 상태를 저장하며, 어느 쪽이든 기존 형식의 행은 그대로 읽습니다.
+    """
+    if CHECKPOINT_ENCODING == "plain":
+        return ReportingAsyncSqliteSaver(aiosqlite.connect(db_path))
+    return DeltaAsyncSqliteSaver(aiosqlite.connect(db_path))
+
+
+def create_cooking_agent_graph(checkpointer=None):
+    """쿠킹 에이전트 그래프를 컴파일합니다. checkpointer를 주지 않으면 SQLite 체크포인터를 새로 만듭니다."""
     logger.info("쿠킹 에이전트 그래프 생성 시작 (from graph_builder.py)")
     builder = StateGraph(AgentState)
 
@@ -53,8 +73,7 @@ def create_cooking_agent_graph():
         logger.debug(f"Supervisor 라우팅: 의도='{intent}'")
 
         if state.get("error_message"):
-            state["error_message"] = None
-            return "handle_other"
+            return "handle_other"  # handle_other가 오류를 알리고 error_message를 비움
 
         if intent == "general_chat":
             return "general_chat"
@@ -159,23 +178,8 @@ def create_cooking_agent_graph():
     # 2. MCP 도구 실행 후 다음 행동 결정
     def decide_after_tool_execution(state: AgentState):
         logger.debug(f"Tool Execution 후 라우팅: tool_results='{state.get('tool_call_results')}'")
-        tool_results = state.get("tool_call_results")
-        if tool_results:
-            first_res = tool_results[0]
-            if first_res.get("error"):
-                response_content = f"도구 '{first_res.get('tool_name')}' 실행 중 오류: {first_res.get('error')}"
-            elif first_res.get("result") is not None:
-                response_content = f"'{first_res.get('tool_name')}' 실행 결과: {str(first_res.get('result'))[:200]}"
-                if len(str(first_res.get('result'))) > 200: response_content += "..."
-            else:
-                response_content = f"'{first_res.get('tool_name')}' 실행 완료."
-            
-            state["response_to_user"] = response_content
-            if state.get("messages"):
-                state["messages"].append(AIMessage(content=response_content))
-            else:
-                state["messages"] = [AIMessage(content=response_content)]
-            logger.info(f"도구 실행 결과 기반 응답: {response_content}")
+        # 결과 기반 응답(response_to_user, messages)은 execute_tool_node가 만들어 반환함 (라우터는 상태를 고치지 않음)
+        if state.get("tool_call_results"):
             return END
         
         logger.warning("도구 실행 후 처리 로직에서 명확한 응답 생성 안됨. Supervisor로 복귀.")
@@ -191,7 +195,7 @@ def create_cooking_agent_graph():
     )
 
     # 그래프 컴파일 (체크포인터 포함)
-    graph = builder.compile(checkpointer=memory)
+    graph = builder.compile(checkpointer=checkpointer if checkpointer is not None else create_sqlite_checkpointer())
     logger.info("쿠킹 에이전트 그래프 생성 완료 (from graph_builder.py)")
     return graph
 
@@ -7,6 +7,8 @@ from langchain_core.messages import HumanMessage, AIMessage
 import uuid
 from fastapi import FastAPI, HTTPException, Body
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from langgraph.graph import END
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any, Tuple
 
@@ -27,7 +29,7 @@ logger = logging.getLogger(__name__)
 # logger = setup_logger(__name__)
 
 # --- 그래프 빌더 임포트 ---
-from .graph_builder import create_cooking_agent_graph, memory as graph_memory
+from graph_builder import create_cooking_agent_graph
 
 # --- MCP 설정 (여전히 main.py 또는 별도 config.py에서 관리 가능) ---
 MCP_BASE_URL = os.environ.get("MCP_BASE_URL", "http://localhost")
@@ -39,8 +41,15 @@ MCP_CONFIG = {
 logger.info(f"MCP 설정 로드 완료 (main.py): {json.dumps(MCP_CONFIG, indent=2)}")
 
 # --- 기타 임포트 ---
-from .state import AgentState, MCPClients # AgentState 사용
-from .mcp_utils import get_mcp_clients # MCP 클라이언트 초기화 함수
+from state import AgentState, MCPClients # AgentState 사용
+from mcp_utils import get_mcp_clients, close_http_client # MCP 클라이언트 초기화 함수, 공용 HTTP 연결 풀 종료
+from utils.metrics import CONTENT_TYPE_LATEST, REGISTRY, MetricsMiddleware, metrics_handler
+from utils.model_registry import get_model_registry # 역할별 공용 LLM 클라이언트
+from utils.checkpoint_report import get_checkpoint_report # 슈퍼스텝별 체크포인트 크기
+
+GRAPH_IN_FLIGHT = REGISTRY.gauge("graph_runs_in_flight", "Graph runs currently executing")
+# 참조되지 않는 delta 체크포인트 blob을 정리하는 주기(초, 0이면 주기 정리 없이 종료 시에만 정리)
+CHECKPOINT_PRUNE_INTERVAL = float(os.environ.get("CHECKPOINT_PRUNE_INTERVAL", "3600"))
 
 # FastAPI 앱 생성
 app = FastAPI(
@@ -57,18 +66,48 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# 요청 수/처리 중인 요청 수 메트릭
+app.add_middleware(MetricsMiddleware, paths=("/chat", "/metrics"))
 
-# LangGraph 애플리케이션 인스턴스 생성
+# LangGraph 애플리케이션 인스턴스 (비동기 SQLite 체크포인터가 이벤트 루프를 필요로 하므로 startup에서 생성)
 # 이 시점에서 DB 파일이 없다면 생성됩니다.
-langgraph_app = create_cooking_agent_graph()
-logger.info("LangGraph 애플리케이션 인스턴스 생성 완료.")
+langgraph_app = None
 
 # MCP 클라이언트 초기화 (애플리케이션 시작 시 한 번만)
 mcp_clients_instance: Optional[MCPClients] = None
+# 체크포인트 blob 주기 정리 태스크 (종료 시 진행 중인 정리를 끊지 않도록 취소 대신 이벤트로 멈춤)
+_prune_task: Optional[asyncio.Task] = None
+_prune_stop: Optional[asyncio.Event] = None
+
+
+async def prune_checkpoint_blobs() -> None:
+    """delta 체크포인터(aprune_blobs가 있는 경우)에서 어떤 체크포인트/쓰기도 참조하지 않는 blob을 지웁니다."""
+    checkpointer = getattr(langgraph_app, "checkpointer", None)
+    if not hasattr(checkpointer, "aprune_blobs"):
+        return
+    try:
+        await checkpointer.aprune_blobs()
+    except Exception as e:
+        logger.error(f"체크포인트 blob 정리 실패: {e}")
+
+
+async def _prune_checkpoint_blobs_periodically(interval: float, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            await prune_checkpoint_blobs()
 
 @app.on_event("startup")
 async def startup_event():
-    global mcp_clients_instance
+    global mcp_clients_instance, langgraph_app, _prune_task, _prune_stop
+    langgraph_app = create_cooking_agent_graph()
+    logger.info("LangGraph 애플리케이션 인스턴스 생성 완료.")
+    if CHECKPOINT_PRUNE_INTERVAL > 0 and hasattr(langgraph_app.checkpointer, "aprune_blobs"):
+        _prune_stop = asyncio.Event()
+        _prune_task = asyncio.create_task(_prune_checkpoint_blobs_periodically(CHECKPOINT_PRUNE_INTERVAL, _prune_stop))
+    # 역할별 LLM 클라이언트를 미리 만들어 첫 요청에서 생성/연결 비용을 내지 않도록 함
+    await get_model_registry().warm_up()
     logger.info("애플리케이션 시작 이벤트: MCP 클라이언트 초기화 시도")
     mcp_clients_instance = await get_mcp_clients()
     if mcp_clients_instance:
@@ -81,6 +120,17 @@ async def startup_event():
     else:
         logger.error("MCP 클라이언트 초기화 실패.")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    # blob 주기 정리를 멈추고 마지막으로 한 번 정리
+    if _prune_task is not None:
+        _prune_stop.set()
+        await _prune_task
+    await prune_checkpoint_blobs()
+    # MCP 어댑터가 함께 쓰는 keep-alive 연결 풀 종료
+    await close_http_client()
+    logger.info("MCP HTTP 연결 풀 종료.")
+
 # --- 요청 및 응답 모델 정의 ---
 class ChatInput(BaseModel):
     conversation_id: Optional[str] = Field(None, description="기존 대화 ID, 없으면 새로 생성")
@@ -108,7 +158,11 @@ async def chat_with_agent(payload: ChatInput = Body(...)):
 
     # 이전 대화 상태 로드 또는 새 상태 초기화
     # LangGraph는 config 객체를 통해 스레드(대화)를 관리합니다.
-    config = {"configurable": {"thread_id": conversation_id}}
+    # MCP 클라이언트 같은 런타임 의존성은 config로 전달 (상태에 넣으면 슈퍼스텝마다 체크포인트로 직렬화됨)
+    config = {
+        "callbacks": metrics_handler.callbacks(),
+        "configurable": {"thread_id": conversation_id, "mcp_clients": mcp_clients_instance},
+    }
     
     # 현재 상태를 가져오거나, 첫번째 메시지인 경우 초기 상태 구성
     # (주의: LangGraph의 SqliteSaver는 이전 상태를 자동으로 로드하므로, 명시적 로드는 필요 없을 수 있음
@@ -120,10 +174,9 @@ async def chat_with_agent(payload: ChatInput = Body(...)):
     current_messages: List[AIMessage] = [HumanMessage(content=payload.message)]
 
     # AgentState 구성
-    # supervisor_node가 current_intent를 설정하므로, 여기서는 messages와 mcp_clients만 전달.
+    # supervisor_node가 current_intent를 설정하므로, 여기서는 messages만 전달. (MCP 클라이언트는 config로 전달)
     input_state = AgentState(
         messages=current_messages,
-        mcp_clients=mcp_clients_instance,
         # 나머지 필드들은 그래프 실행 중 동적으로 채워짐
         current_intent=None, # supervisor가 입력 메시지를 보고 첫 의도를 결정
         response_to_user=None,
@@ -134,6 +187,7 @@ async def chat_with_agent(payload: ChatInput = Body(...)):
     final_state = None
     agent_response_content = "죄송합니다. 현재 요청을 처리할 수 없습니다."
 
+    GRAPH_IN_FLIGHT.inc()
     try:
         # 비동기 스트림으로 LangGraph 실행
         # astream_events 대신 astream을 사용하여 최종 상태만 받거나, 특정 이벤트만 처리 가능
@@ -163,7 +217,7 @@ async def chat_with_agent(payload: ChatInput = Body(...)):
 
         # astream의 가장 마지막 요소가 최종 상태 업데이트를 포함한다고 가정
         # 또는, config를 사용하여 get_state로 최종 상태를 가져올 수 도 있음.
-        current_graph_state = langgraph_app.get_state(config)
+        current_graph_state = await langgraph_app.aget_state(config)
         if current_graph_state:
             final_state_values = current_graph_state.values
             logger.info(f"LangGraph 최종 상태 (get_state): {final_state_values}")
@@ -183,9 +237,22 @@ async def chat_with_agent(payload: ChatInput = Body(...)):
         import traceback
         logger.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"에이전트 처리 중 오류: {str(e)}")
+    finally:
+        GRAPH_IN_FLIGHT.dec()
 
     return ChatResponse(conversation_id=conversation_id, response=agent_response_content)
 
+@app.get("/checkpoints/report", summary="Checkpoint size per superstep")
+async def checkpoint_report(conversation_id: Optional[str] = None, limit: int = 20):
+    report = get_checkpoint_report()
+    checkpointer = getattr(langgraph_app, "checkpointer", None)
+    storage = checkpointer.stats() if hasattr(checkpointer, "stats") else None # delta 체크포인터의 실제 기록량
+    return {"summary": report.summary(), "recent": report.recent(limit, conversation_id), "storage": storage}
+
+@app.get("/metrics", summary="Prometheus metrics (text exposition format)")
+async def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE_LATEST)
+
 if __name__ == "__main__":
     import uvicorn
     # .env 파일에서 HOST, PORT 가져오기 (기본값 설정)
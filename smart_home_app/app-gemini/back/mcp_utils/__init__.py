@@ -1,4 +1,4 @@
-from .adapters import RefrigeratorMCPAdapter, InductionMCPAdapter, MicrowaveMCPAdapter, MobileMCPAdapter, CookingMCPAdapter, get_mcp_clients
+from .adapters import RefrigeratorMCPAdapter, InductionMCPAdapter, MicrowaveMCPAdapter, MobileMCPAdapter, CookingMCPAdapter, get_mcp_clients, get_http_client, close_http_client
 
 __all__ = [
     "RefrigeratorMCPAdapter",
@@ -7,4 +7,6 @@ __all__ = [
     "MobileMCPAdapter",
     "CookingMCPAdapter",
     "get_mcp_clients",
+    "get_http_client",
+    "close_http_client",
 ] 
\ No newline at end of file
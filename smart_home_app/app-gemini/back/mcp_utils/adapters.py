@@ -1,7 +1,12 @@
+import asyncio
 import os
+import time
+from typing import Optional
 from dotenv import load_dotenv
 import httpx # HTTP 요청을 위한 라이브러리, requirements.txt에 추가 필요
 
+from utils.metrics import observe_tool_call
+
 load_dotenv()
 
 # MCP 서버 URL 환경 변수 이름과 기본값
@@ -14,26 +19,93 @@ MCP_URL_ENV_VARS = {
     "personalization": "PERSONALIZATION_MCP_URL",
 }
 
+# 프로세스 공용 HTTP 연결 풀 설정
+MCP_HTTP_MAX_CONNECTIONS = int(os.getenv("MCP_HTTP_MAX_CONNECTIONS", "20"))
+MCP_HTTP_MAX_KEEPALIVE = int(os.getenv("MCP_HTTP_MAX_KEEPALIVE", "20"))
+MCP_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("MCP_HTTP_KEEPALIVE_EXPIRY", "30"))
+# 기본 요청 타임아웃(초). 어댑터별로 <TYPE>_MCP_TIMEOUT (예: COOKING_MCP_TIMEOUT) 으로 덮어쓸 수 있음
+MCP_HTTP_TIMEOUT = float(os.getenv("MCP_HTTP_TIMEOUT", "10"))
+MCP_HTTP_CONNECT_TIMEOUT = float(os.getenv("MCP_HTTP_CONNECT_TIMEOUT", "3"))
+# 연결이 모두 사용 중일 때 빈 연결을 기다리는 최대 시간(초)
+MCP_HTTP_POOL_TIMEOUT = float(os.getenv("MCP_HTTP_POOL_TIMEOUT", "10"))
+
+_http_client: Optional[httpx.AsyncClient] = None
+# 연결 수만큼만 요청을 풀에 들여보냄.
+# httpx(httpcore) 풀은 대기 요청이 많으면 이벤트마다 대기열 전체를 훑으므로, 대기는 세마포어에서 하도록 함
+_http_slots: Optional[asyncio.Semaphore] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    모든 어댑터가 함께 쓰는 keep-alive 연결 풀을 반환합니다. (첫 호출 시 생성)
+    요청마다 클라이언트를 만들면 호출마다 TCP 연결을 새로 맺으므로 하나를 재사용합니다.
+    """
+    global _http_client, _http_slots
+    if _http_client is None or _http_client.is_closed:
+        _http_slots = asyncio.Semaphore(MCP_HTTP_MAX_CONNECTIONS)
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=MCP_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=MCP_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=MCP_HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(MCP_HTTP_TIMEOUT, connect=MCP_HTTP_CONNECT_TIMEOUT),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """공용 연결 풀을 닫습니다. (FastAPI shutdown 시 호출)"""
+    global _http_client, _http_slots
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client, _http_slots = None, None
+
+
 class BaseMCPAdapter:
-    def __init__(self, mcp_type: str, base_url: str):
+    # 어댑터 기본 타임아웃(초). None이면 MCP_HTTP_TIMEOUT
+    default_timeout: Optional[float] = None
+
+    def __init__(self, mcp_type: str, base_url: str, timeout: Optional[float] = None):
         self.mcp_type = mcp_type
         self.base_url = base_url
         if not self.base_url:
             raise ValueError(f"{mcp_type} MCP URL이 설정되지 않았습니다.")
+        env_timeout = os.getenv(f"{mcp_type.upper()}_MCP_TIMEOUT")
+        if timeout is None:
+            timeout = float(env_timeout) if env_timeout else self.default_timeout
+        # 연결 타임아웃은 공용 설정을 유지하고, 응답 대기 시간만 어댑터별로 조정
+        self.timeout = httpx.Timeout(timeout or MCP_HTTP_TIMEOUT, connect=MCP_HTTP_CONNECT_TIMEOUT)
 
     async def _request(self, method: str, endpoint: str, params: dict = None, data: dict = None) -> dict:
-        async with httpx.AsyncClient() as client:
+        # 메트릭 라벨은 경로의 첫 구간만 사용 (/recipes/<id> 같은 경로로 라벨이 늘어나지 않도록)
+        tool = f"{method} /{endpoint.strip('/').split('/')[0]}"
+        started = time.perf_counter()
+        client = get_http_client()
+        slots = _http_slots
+        try:
+            try:
+                await asyncio.wait_for(slots.acquire(), MCP_HTTP_POOL_TIMEOUT)
+            except asyncio.TimeoutError:
+                raise httpx.PoolTimeout(f"{self.mcp_type} MCP 연결 대기 시간 초과") from None
             try:
-                response = await client.request(method, f"{self.base_url}{endpoint}", params=params, json=data)
-                response.raise_for_status() # 오류 발생 시 예외 처리
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                # 실제로는 로깅 등을 통해 더 자세한 오류 처리 필요
-                print(f"{self.mcp_type} MCP 요청 오류: {e.response.status_code} - {e.response.text}")
-                raise
-            except httpx.RequestError as e:
-                print(f"{self.mcp_type} MCP 연결 오류: {e}")
-                raise
+                response = await client.request(
+                    method, f"{self.base_url}{endpoint}", params=params, json=data, timeout=self.timeout
+                )
+            finally:
+                slots.release()
+            response.raise_for_status() # 오류 발생 시 예외 처리
+            observe_tool_call(self.mcp_type, tool, started)
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            # 실제로는 로깅 등을 통해 더 자세한 오류 처리 필요
+            print(f"{self.mcp_type} MCP 요청 오류: {e.response.status_code} - {e.response.text}")
+            observe_tool_call(self.mcp_type, tool, started, error=True)
+            raise
+        except httpx.RequestError as e:
+            print(f"{self.mcp_type} MCP 연결 오류: {e}")
+            observe_tool_call(self.mcp_type, tool, started, error=True)
+            raise
 
     async def get_status(self) -> dict:
         """MCP 서버의 기본 상태를 조회합니다."""
@@ -99,6 +171,9 @@ class MobileMCPAdapter(BaseMCPAdapter):
         return await self._request("POST", "/send_message", data={"recipient": recipient, "message": message})
 
 class CookingMCPAdapter(BaseMCPAdapter):
+    # 레시피 검색은 기기 제어보다 응답이 느림
+    default_timeout = 20.0
+
     def __init__(self):
         url = os.getenv(MCP_URL_ENV_VARS["cooking"])
         super().__init__("cooking", url)
@@ -1,7 +1,8 @@
 # cooking_agent/mcp_utils/mcp_client.py
 import asyncio
 import os
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 
 from langchain_mcp_adapters.client import MultiServerMCPClient
 # main.py에서 MCP_CONFIG를 직접 가져오거나, config.py를 통해 가져옵니다.
@@ -18,10 +19,29 @@ else:
     print(f"경고 (mcp_client.py): .env 파일을 찾을 수 없습니다 ({dotenv_path}).")
 
 
-from ..utils.logger import setup_logger # utils.logger.py 가정
+from utils.logger import setup_logger # utils.logger.py 가정
+from utils.metrics import REGISTRY, observe_tool_call
 
 logger = setup_logger(__name__)
 
+# 서버(기기)별 동시 도구 호출 상한. 느린 기기는 <NAME>_MCP_CONCURRENCY 로 따로 줄일 수 있습니다.
+DEFAULT_SERVER_CONCURRENCY = int(os.environ.get("MCP_SERVER_CONCURRENCY", "4"))
+_server_semaphores: Dict[str, asyncio.Semaphore] = {}
+MCP_IN_FLIGHT = REGISTRY.gauge("mcp_tool_calls_in_flight", "MCP tool calls currently executing", ["server"])
+MCP_BATCH_DURATION = REGISTRY.histogram("mcp_tool_batch_duration_seconds", "Wall time of concurrent MCP tool call batches")
+MCP_BATCH_CALLS = REGISTRY.counter("mcp_tool_batch_calls_total", "MCP tool calls issued through call_mcp_tools", ["outcome"])
+
+
+def get_server_semaphore(mcp_server_name: str) -> asyncio.Semaphore:
+    """MCP 서버별 동시 호출을 제한하는 세마포어를 반환합니다."""
+    semaphore = _server_semaphores.get(mcp_server_name)
+    if semaphore is None:
+        limit = int(os.environ.get(f"{mcp_server_name.upper()}_MCP_CONCURRENCY", DEFAULT_SERVER_CONCURRENCY))
+        semaphore = asyncio.Semaphore(limit)
+        _server_semaphores[mcp_server_name] = semaphore
+    return semaphore
+
+
 class MCPClientManager:
     _instance: Optional[MultiServerMCPClient] = None
     _lock = asyncio.Lock() # 비동기 초기화 시 동시성 문제 방지
@@ -149,14 +169,24 @@ async def call_mcp_tool(
             # result = await server_client.call_tool(tool_name, **tool_args)
             raise NotImplementedError("MultiServerMCPClient에 'call_tool' 메소드가 없습니다. langchain-mcp-adapters 버전을 확인하세요.")
 
-        result = await client.call_tool(
-            server_name=mcp_server_name,
-            tool_name=tool_name,
-            input_args=tool_args # input_args 파라미터 명칭 확인 필요 (라이브러리 버전에 따라 다를 수 있음)
-                                 # langchain_mcp_adapters의 MultiServerMCPClient.call_tool 시그니처 확인
-                                 # 보통은 **tool_args 또는 tool_input=tool_args 형태일 수 있음
-                                 # langchain_mcp_adapters v0.0.6 기준으로는 server_name, tool_name, input_args가 맞음
-        )
+        # 같은 서버로 가는 동시 호출 수 제한 (느린 기기 보호)
+        async with get_server_semaphore(mcp_server_name):
+            MCP_IN_FLIGHT.inc(1, mcp_server_name)
+            started = time.perf_counter()
+            failed = True
+            try:
+                result = await client.call_tool(
+                    server_name=mcp_server_name,
+                    tool_name=tool_name,
+                    input_args=tool_args # input_args 파라미터 명칭 확인 필요 (라이브러리 버전에 따라 다를 수 있음)
+                                         # langchain_mcp_adapters의 MultiServerMCPClient.call_tool 시그니처 확인
+                                         # 보통은 **tool_args 또는 tool_input=tool_args 형태일 수 있음
+                                         # langchain_mcp_adapters v0.0.6 기준으로는 server_name, tool_name, input_args가 맞음
+                )
+                failed = False
+            finally:
+                MCP_IN_FLIGHT.dec(1, mcp_server_name)
+                observe_tool_call(mcp_server_name, tool_name, started, error=failed)
         logger.info(f"MCP 도구 호출 성공: 서버='{mcp_server_name}', 도구='{tool_name}', 결과='{str(result)[:200]}...'") # 결과가 길 수 있으므로 일부만 로깅
         return result
     except ValueError as ve: # 서버/도구 이름 오류 등
@@ -166,6 +196,53 @@ async def call_mcp_tool(
         logger.error(f"MCP 도구 '{mcp_server_name}.{tool_name}' 호출 중 예기치 않은 오류 발생: {e}", exc_info=True)
         raise # 예외를 다시 발생시켜 호출한 노드에서 처리하도록 함
 
+async def _call_isolated(mcp_server_name: str, tool_name: str, tool_args: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """call_mcp_tool 하나를 실행하고 결과 또는 오류를 dict로 담아 반환합니다. (예외를 밖으로 내보내지 않음)"""
+    outcome = {"server": mcp_server_name, "tool": tool_name, "ok": False, "result": None, "error": None}
+    started = time.perf_counter()
+    try:
+        outcome["result"] = await call_mcp_tool(mcp_server_name, tool_name, tool_args)
+        outcome["ok"] = True
+    except Exception as e:
+        outcome["error"] = str(e) or type(e).__name__
+    # 서버 세마포어 대기 시간 포함
+    outcome["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    MCP_BATCH_CALLS.inc(1, "ok" if outcome["ok"] else "error")
+    return outcome
+
+
+async def call_mcp_tools(
+    calls: Sequence[Tuple[str, str, Optional[Dict[str, Any]]]]
+) -> List[Dict[str, Any]]:
+    """
+    서로 독립적인 MCP 도구 호출 여러 개를 동시에 실행합니다.
+
+    Args:
+        calls: (MCP 서버 이름, 도구 이름, 도구 인자) 목록.
+
+    Returns:
+        List[Dict[str, Any]]: 요청 순서와 같은 순서의 결과 목록.
+            각 항목은 {"server", "tool", "ok", "result", "error", "latency_ms"} 입니다.
+            한 호출이 실패해도 다른 호출에는 영향이 없으며, 실패한 항목은 ok=False와 error 메시지를 가집니다.
+
+    서버별 동시 호출 상한(get_server_semaphore)은 call_mcp_tool과 똑같이 적용되므로,
+    같은 서버로 가는 호출이 상한보다 많으면 그 서버 몫만 차례를 기다립니다.
+    """
+    if not calls:
+        return []
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(*(_call_isolated(server, tool, args) for server, tool, args in calls))
+    wall = time.perf_counter() - started
+    MCP_BATCH_DURATION.observe(wall)
+    serial_ms = sum(outcome["latency_ms"] for outcome in outcomes)
+    failed = sum(1 for outcome in outcomes if not outcome["ok"])
+    logger.info(
+        f"MCP 도구 {len(outcomes)}건 동시 호출 (실패 {failed}건): wall {wall * 1000:.1f}ms / "
+        f"호출별 합계 {serial_ms:.1f}ms"
+    )
+    return list(outcomes)
+
+
 # 애플리케이션 종료 시 호출될 수 있도록 함수 제공
 async def shutdown_mcp_client():
     await MCPClientManager.close_client()
@@ -1,3 +1,12 @@
+from .supervisor_node import supervisor_node
+from .general_chat_node import general_chat_node
+from .cooking_planner_node import cooking_planner_node
+from .ingredient_check_node import ingredient_check_node
+from .replanning_or_guidance_node import replanning_or_guidance_node
+from .execute_cooking_step_node import execute_cooking_step_node
+from .final_cooking_summary_node import final_cooking_summary_node
+from .handle_other_node import handle_other_node
+from .device_control_node import device_control_node
 from .intent_parser_node import parse_intent_node
 from .tool_executor_node import execute_tool_node
 # 앞으로 추가될 다른 노드들도 여기에 추가합니다.
@@ -7,9 +16,18 @@ from .tool_executor_node import execute_tool_node
 # from .response_generator_node import generate_response_node
 
 __all__ = [
+    "supervisor_node",
+    "general_chat_node",
+    "cooking_planner_node",
+    "ingredient_check_node",
+    "replanning_or_guidance_node",
+    "execute_cooking_step_node",
+    "final_cooking_summary_node",
+    "handle_other_node",
+    "device_control_node",
     "parse_intent_node",
     "execute_tool_node",
     # "recommend_recipe_node",
     # "handle_cooking_step_node",
     # "generate_response_node",
-] 
\ No newline at end of file
+]
@@ -1,40 +1,32 @@
 # cooking_agent/nodes/device_control_node.py
-from typing import List
+from typing import Any, Dict, List
 from langchain_core.messages import AIMessage
 from state import State, ToolCall
 from utils.logger import setup_logger
-from mcp_utils.mcp_client import call_mcp_tool  # MCP 호출 래퍼 함수
+from mcp_utils.mcp_client import call_mcp_tools  # 여러 MCP 호출을 동시에 실행 (서버별 동시 호출 제한, 호출별 오류 격리)
 
 logger = setup_logger(__name__)
 
-async def device_control_node(state: State) -> State:
+
+async def device_control_node(state: State) -> Dict[str, Any]:
     pending_calls: List[ToolCall] = state.get("pending_mcp_calls", [])
     if not pending_calls:
-        state["error_message"] = "실행할 MCP 명령이 없습니다."
-        return state
-
-    results = []
-    for call in pending_calls:
-        try:
-            logger.info(f"MCP 호출: 서버={call['mcp_server_name']}, 도구={call['tool_name']}, 인자={call['tool_args']}")
-            result = await call_mcp_tool(
-                mcp_server=call["mcp_server_name"],
-                tool_name=call["tool_name"],
-                tool_args=call["tool_args"]
-            )
-            results.append(result)
-        except Exception as e:
-            logger.error(f"MCP 호출 실패: {e}")
-            results.append({"error": str(e)})
+        return {"error_message": "실행할 MCP 명령이 없습니다."}
 
-    state["mcp_call_results"] = results
-    state["pending_mcp_calls"] = []  # 호출 후 초기화
+    # 여러 장치 명령을 동시에 실행 (결과 순서는 요청 순서 유지, 실패는 결과에 담아 다른 호출에 영향을 주지 않음)
+    outcomes = await call_mcp_tools([
+        (call.get("mcp_server_name") or call.get("mcp_client_type"), call["tool_name"], call["tool_args"])
+        for call in pending_calls
+    ])
+    results = [outcome["result"] if outcome["ok"] else {"error": outcome["error"]} for outcome in outcomes]
 
     # 결과를 간단히 요약해 사용자에게 알림
     response_text = "장치 제어를 완료했습니다."
-    if any("error" in r for r in results):
+    if any(isinstance(r, dict) and "error" in r for r in results):
         response_text = "일부 장치 제어에 실패했습니다."
 
-    from langchain_core.messages import AIMessage
-    state["messages"].append(AIMessage(content=response_text))
-    return state
+    return {
+        "mcp_call_results": results,
+        "pending_mcp_calls": [],  # 호출 후 초기화
+        "messages": [AIMessage(content=response_text)],
+    }
@@ -1,5 +1,5 @@
 from typing import Dict, Any
-from ..state import AgentState
+from state import AgentState
 from langchain_core.messages import AIMessage, HumanMessage
 
 # 이 노드는 LLM을 사용하여 사용자의 의도를 파악하고, 상태를 업데이트합니다.
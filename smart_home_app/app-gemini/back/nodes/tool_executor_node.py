@@ -1,12 +1,26 @@
 from typing import Dict, Any, List
-from ..state import AgentState, ToolCall
-from ..mcp_utils.adapters import BaseMCPAdapter # MCPClients를 직접 사용하기보다, 여기서 필요에 따라 가져오는 방식
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableConfig
+from state import AgentState, ToolCall, get_mcp_clients_from_config
+from mcp_utils.adapters import BaseMCPAdapter # MCPClients를 직접 사용하기보다, 여기서 필요에 따라 가져오는 방식
+
+def summarize_tool_results(tool_call_results: List[Dict[str, Any]]) -> str:
+    """첫 번째 도구 결과로 사용자에게 보낼 응답을 만듭니다."""
+    first_res = tool_call_results[0]
+    if first_res.get("error"):
+        return f"도구 '{first_res.get('tool_name')}' 실행 중 오류: {first_res.get('error')}"
+    if first_res.get("result") is not None:
+        response_content = f"'{first_res.get('tool_name')}' 실행 결과: {str(first_res.get('result'))[:200]}"
+        if len(str(first_res.get('result'))) > 200: response_content += "..."
+        return response_content
+    return f"'{first_res.get('tool_name')}' 실행 완료."
+
 
 # 이 노드는 AgentState에 있는 pending_tool_calls를 실행합니다.
-async def execute_tool_node(state: AgentState) -> Dict[str, Any]:
+async def execute_tool_node(state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
     print("---MCP 도구 실행 노드---")
     pending_calls: List[ToolCall] = state.get("pending_tool_calls")
-    mcp_clients = state.get("mcp_clients") # main.py 등에서 미리 초기화되어 상태에 주입됨
+    mcp_clients = get_mcp_clients_from_config(config) # main.py에서 초기화해 config로 주입 (상태/체크포인트에는 없음)
     tool_call_results = []
     
     if not pending_calls or not mcp_clients:
@@ -55,5 +69,12 @@ async def execute_tool_node(state: AgentState) -> Dict[str, Any]:
             "error": error_message
         })
 
-    # 실행된 호출은 비워줍니다.
-    return {"tool_call_results": tool_call_results, "pending_tool_calls": [], "response_to_user": None} # 결과는 다음 노드에서 처리하여 응답 생성 
\ No newline at end of file
+    # 실행된 호출은 비워주고, 결과 기반 응답을 상태 업데이트로 반환합니다.
+    response_content = summarize_tool_results(tool_call_results)
+    print(f"도구 실행 결과 기반 응답: {response_content}")
+    return {
+        "tool_call_results": tool_call_results,
+        "pending_tool_calls": [],
+        "response_to_user": response_content,
+        "messages": [AIMessage(content=response_content)],
+    } 
\ No newline at end of file
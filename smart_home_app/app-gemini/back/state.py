@@ -1,6 +1,7 @@
 # cooking_agent/state.py
-from typing import TypedDict, List, Dict, Any, Literal, Optional
+from typing import Annotated, TypedDict, List, Dict, Any, Literal, Optional
 from langchain_core.messages import BaseMessage
+from langgraph.graph.message import add_messages
 
 # --- MCP 서버 클라이언트/어댑터 타입을 위한 플레이스홀더 ---
 # 실제 MCP 클라이언트 라이브러리가 있다면 해당 타입을 사용합니다.
@@ -43,10 +44,11 @@ class MCPClients(TypedDict):
     personalization: Optional[PersonalizationClient]
 
 
-class ToolCall(TypedDict):
+class ToolCall(TypedDict, total=False):
     tool_name: str  # 예: "refrigerator.get_contents" 또는 "induction.set_power"
     tool_args: Dict[str, Any]
-    # mcp_server_name: str # MCPClients 구조를 사용하므로 직접 지정보다 타입으로 구분
+    # MCPClients 구조(mcp_client_type) 또는 MCP 서버 이름(mcp_server_name) 중 하나로 대상 지정
+    mcp_server_name: str
     mcp_client_type: Literal[
         "refrigerator", "induction", "microwave", "mobile", "cooking", "personalization"
     ]
@@ -63,10 +65,13 @@ class Recipe(TypedDict):
 
 
 class AgentState(TypedDict):
-    """LangGraph 에이전트의 상태"""
+    """
+    LangGraph 에이전트의 상태
+    노드는 상태를 제자리에서 고치지 않고 바뀐 키만 담은 dict를 반환합니다. (messages는 새 메시지만 반환하면 뒤에 붙음)
+    """
 
     # --- 입력 및 대화 관리 ---
-    messages: List[BaseMessage]  # 전체 대화 기록
+    messages: Annotated[List[BaseMessage], add_messages]  # 전체 대화 기록 (노드가 반환한 메시지를 이어 붙임)
 
     # --- 의도 및 모드 관리 ---
     current_intent: Optional[
@@ -95,8 +100,11 @@ class AgentState(TypedDict):
     # --- 쿠킹 플로우 관련 상태 ---
     # 사용자의 원래 레시피 요청 (예: "토마토 스파게티", "냉장고 재료로 만들 수 있는 요리")
     recipe_query_input: Optional[str]
+    recipe_query: Optional[str] # supervisor가 추출한 레시피 검색어
     available_recipes: Optional[List[Recipe]] # 추천된 레시피 목록
+    selected_recipe_index: Optional[int]
     selected_recipe: Optional[Recipe] # 사용자가 선택한 레시피
+    cooking_plan: Optional[List[Dict[str, Any]]] # 단계별 요리 계획
     current_cooking_step_index: Optional[int] # 현재 진행중인 요리 단계 (0부터 시작)
     current_step_details: Optional[Dict[str, Any]] # 현재 단계 지침, 필요한 MCP 정보 등
 
@@ -107,17 +115,23 @@ class AgentState(TypedDict):
     required_ingredients_for_current_step: Optional[List[str]]
     # 냉장고 등에서 확인된 현재 보유 재료 (이름: 수량/정보)
     inventory: Optional[Dict[str, Any]]
+    # cooking_planner가 레시피 단계와 함께 미리 조회한 재고를 바로 다음 ingredient_check가 쓸 수 있는지 여부 (한 번 쓰면 해제)
+    inventory_prefetched: Optional[bool]
     missing_ingredients: Optional[List[str]] # 현재 단계에 부족한 재료
     # 대체 재료 제안 (예: {"original": "고구마", "substitute": "감자"})
     alternative_ingredient_suggestion: Optional[Dict[str, str]]
+    alternative_ingredients_suggestion: Optional[Any] # 대체 재료 추천 MCP 응답
 
     # --- MCP 및 장치 제어 관련 상태 ---
     # 실행해야 할 MCP 호출 목록 (실제 호출 전 상태)
     pending_tool_calls: Optional[List[ToolCall]]
     # 최근 MCP 호출 결과 (여러 개일 수 있음)
     tool_call_results: Optional[List[Dict[str, Any]]]
-    # 연결된 MCP 클라이언트 인스턴스
-    mcp_clients: Optional[MCPClients]
+    # 요리 단계에서 생성된 장치 제어 호출과 그 결과
+    pending_mcp_calls: Optional[List[ToolCall]]
+    mcp_call_results: Optional[List[Any]]
+    # 주의: MCP 클라이언트, LLM 같은 런타임 의존성은 상태에 넣지 않습니다. (슈퍼스텝마다 체크포인트로 직렬화됨)
+    # 그래프 실행 config의 configurable로 전달하고 get_mcp_clients_from_config()로 꺼내 씁니다.
 
     # --- 사용자에게 전달할 메시지 ---
     # 에이전트가 사용자에게 다음에 할 말
@@ -130,3 +144,12 @@ class AgentState(TypedDict):
     # --- 디버깅/오류 정보 ---
     error_message: Optional[str]
     debug_info: Optional[Dict[str, Any]]
+
+
+# 노드 모듈에서 사용하는 이름
+State = AgentState
+
+
+def get_mcp_clients_from_config(config: Optional[Dict[str, Any]]) -> Optional[MCPClients]:
+    """그래프 실행 config(configurable.mcp_clients)로 주입된 MCP 클라이언트를 반환합니다. (체크포인트에 저장되지 않음)"""
+    return ((config or {}).get("configurable") or {}).get("mcp_clients")
@@ -0,0 +1,213 @@
+# cooking_agent/utils/checkpoint_report.py
+import os
+import random
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.messages import BaseMessage
+
+from utils.logger import setup_logger
+from utils.metrics import REGISTRY
+
+logger = setup_logger(__name__)
+
+# 1이면 체크포인트 저장(슈퍼스텝) 중 일부를 골라 채널별 직렬화 크기와 데이터 여부를 기록 (기본은 꺼짐)
+CHECKPOINT_REPORT = os.environ.get("CHECKPOINT_REPORT", "0") == "1"
+# 기록할 체크포인트 비율 (CHECKPOINT_REPORT=1일 때, 1.0이면 전부)
+CHECKPOINT_REPORT_SAMPLE_RATE = float(os.environ.get("CHECKPOINT_REPORT_SAMPLE_RATE", "0.1"))
+# 1이면 모든 체크포인트를 검사해 데이터가 아닌 값(클라이언트, 연결 등)이 상태에 들어 있을 때 저장 전에 예외 발생
+CHECKPOINT_STRICT = os.environ.get("CHECKPOINT_STRICT", "0") == "1"
+# 최근 몇 개의 슈퍼스텝 기록을 보관할지
+CHECKPOINT_REPORT_MAX_ENTRIES = int(os.environ.get("CHECKPOINT_REPORT_MAX_ENTRIES", "1000"))
+
+CHECKPOINT_BYTES = REGISTRY.histogram(
+    "checkpoint_payload_bytes", "Serialized channel values per checkpoint (superstep)",
+    buckets=(1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216),
+)
+CHECKPOINT_NON_DATA = REGISTRY.counter("checkpoint_non_data_total", "Checkpoints whose state held non-data values")
+
+# 체크포인트에 들어가도 되는 값: 기본 타입과 그 컨테이너, LangChain 메시지
+DATA_TYPES = (type(None), bool, int, float, str, bytes)
+
+
+class NonDataCheckpointError(TypeError):
+    """체크포인트에 저장할 상태에 데이터가 아닌 값이 들어 있을 때 발생합니다. (CHECKPOINT_STRICT=1)"""
+
+    def __init__(self, paths: List[str]) -> None:
+        super().__init__(f"checkpoint state holds non-data values: {', '.join(paths)}")
+        self.paths = paths
+
+
+def find_non_data(value: Any, path: str = "", limit: int = 20) -> List[str]:
+    """
+    값 안에서 순수 데이터가 아닌 객체의 경로를 찾아 "경로 (타입)" 목록으로 반환합니다.
+    런타임 의존성(MCP 어댑터, LLM, HTTP 클라이언트 등)은 상태가 아니라 config로 전달해야 합니다.
+    """
+    found: List[str] = []
+    stack = [(path, value)]
+    while stack and len(found) < limit:
+        path, value = stack.pop()
+        if isinstance(value, DATA_TYPES):
+            continue
+        if isinstance(value, BaseMessage):
+            stack.append((f"{path}.content", value.content))
+        elif isinstance(value, dict):
+            for key, item in value.items():
+                if not isinstance(key, str):
+                    found.append(f"{path}[{key!r}] (key {type(key).__name__})")
+                stack.append((f"{path}.{key}" if path else str(key), item))
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            stack.extend((f"{path}[{i}]", item) for i, item in enumerate(value))
+        else:
+            found.append(f"{path or '<root>'} ({type(value).__name__})")
+    return found
+
+
+class CheckpointSizeReport:
+    """
+    체크포인트 저장(슈퍼스텝)마다 채널별 직렬화 크기와 데이터 검사 결과를 모읍니다.
+    체크포인터에 CheckpointReportMixin을 섞어 쓰면 저장 직전에 record()가 호출됩니다.
+    값 전체를 훑고 다시 직렬화하는 비용이 있으므로 enabled일 때 sample_rate 비율만 기록하고,
+    strict일 때는 모든 체크포인트의 데이터 여부만 검사합니다. 둘 다 꺼져 있으면 아무것도 하지 않습니다.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = CHECKPOINT_REPORT,
+        strict: bool = CHECKPOINT_STRICT,
+        max_entries: int = CHECKPOINT_REPORT_MAX_ENTRIES,
+        sample_rate: float = CHECKPOINT_REPORT_SAMPLE_RATE,
+    ) -> None:
+        self.enabled = enabled
+        self.strict = strict
+        self.sample_rate = sample_rate
+        self.entries: deque = deque(maxlen=max_entries)
+        # put <-> aput이 서로를 호출하는 체크포인터에서 같은 체크포인트를 두 번 세지 않도록 최근 ID 기억
+        self._recent_ids: deque = deque(maxlen=256)
+        self._lock = threading.Lock()
+        self.counters = {"checkpoints": 0, "non_data_checkpoints": 0, "bytes": 0, "max_bytes": 0}
+
+    @property
+    def active(self) -> bool:
+        return self.enabled or self.strict
+
+    def record(
+        self,
+        serde: Any,
+        config: Dict[str, Any],
+        checkpoint: Dict[str, Any],
+        metadata: Dict[str, Any],
+        sizes: Optional[Callable[[], Dict[str, int]]] = None,
+    ) -> Optional[dict]:
+        """
+        sizes를 주면 채널별 크기를 다시 직렬화하지 않고 그 결과를 씁니다. (체크포인터가 이미 만든 바이트 재사용)
+        기록하지 않은 체크포인트면 None을 반환합니다.
+        """
+        if not self.active:
+            return None
+        with self._lock:
+            if checkpoint.get("id") in self._recent_ids:
+                return None
+            self._recent_ids.append(checkpoint.get("id"))
+        sampled = self.enabled and (self.sample_rate >= 1 or random.random() < self.sample_rate)
+        if not (sampled or self.strict):
+            return None
+        values = checkpoint.get("channel_values") or {}
+        non_data = find_non_data(values)
+        if non_data:
+            CHECKPOINT_NON_DATA.inc()
+            with self._lock:
+                self.counters["non_data_checkpoints"] += 1
+            logger.error(f"체크포인트 상태에 데이터가 아닌 값이 있습니다: {non_data}")
+            if self.strict:
+                raise NonDataCheckpointError(non_data)
+        if not sampled:
+            return None
+
+        if sizes is not None:
+            channels = sizes()
+        else:
+            channels = {}
+            for channel, value in values.items():
+                try:
+                    channels[channel] = len(serde.dumps_typed(value)[1])
+                except Exception as e:
+                    # 직렬화할 수 없는 값은 저장 단계에서 그대로 실패하므로 여기서는 기록만 함
+                    channels[channel] = -1
+                    non_data.append(f"{channel} ({type(e).__name__})")
+        total = sum(size for size in channels.values() if size > 0)
+        entry = {
+            "thread_id": (config.get("configurable") or {}).get("thread_id"),
+            "step": metadata.get("step"),
+            "bytes": total,
+            "channels": dict(sorted(channels.items(), key=lambda item: -item[1])),
+            "non_data": non_data,
+        }
+        CHECKPOINT_BYTES.observe(total)
+        with self._lock:
+            self.entries.append(entry)
+            self.counters["checkpoints"] += 1
+            self.counters["bytes"] += total
+            self.counters["max_bytes"] = max(self.counters["max_bytes"], total)
+        logger.debug(f"체크포인트 크기: thread={entry['thread_id']} step={entry['step']} {total}B")
+        return entry
+
+    def recent(self, limit: int = 20, thread_id: Optional[str] = None) -> List[dict]:
+        with self._lock:
+            entries = [e for e in self.entries if thread_id is None or e["thread_id"] == thread_id]
+        return entries[-limit:]
+
+    def summary(self) -> dict:
+        with self._lock:
+            checkpoints = self.counters["checkpoints"]
+            return {
+                "enabled": self.enabled,
+                "strict": self.strict,
+                "sample_rate": self.sample_rate,
+                **self.counters,
+                "avg_bytes": round(self.counters["bytes"] / checkpoints) if checkpoints else 0,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self.entries.clear()
+            self._recent_ids.clear()
+            for key in self.counters:
+                self.counters[key] = 0
+
+
+# 프로세스 공용 보고서
+_report = CheckpointSizeReport()
+
+
+def get_checkpoint_report() -> CheckpointSizeReport:
+    return _report
+
+
+class CheckpointReportMixin:
+    """
+    체크포인터(BaseCheckpointSaver 하위 클래스)에 섞어 쓰면 저장 직전에 체크포인트 크기를 기록하고 데이터 여부를 검사합니다.
+    예: class ReportingAsyncSqliteSaver(CheckpointReportMixin, AsyncSqliteSaver)
+    """
+
+    checkpoint_report: Optional[CheckpointSizeReport] = None
+
+    def _size_report(self) -> CheckpointSizeReport:
+        return self.checkpoint_report or _report
+
+    def _record_checkpoint_size(self, config, checkpoint, metadata, sizes=None) -> None:
+        report = self._size_report()
+        if not report.active:
+            return
+        # 참조/압축을 쓰는 serde(DeltaSerializer)라도 크기는 원래 값 기준으로 잼
+        serde = getattr(self.serde, "plain_serde", self.serde)
+        report.record(serde, config, checkpoint, metadata, sizes)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        self._record_checkpoint_size(config, checkpoint, metadata)
+        return super().put(config, checkpoint, metadata, new_versions)
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        self._record_checkpoint_size(config, checkpoint, metadata)
+        return await super().aput(config, checkpoint, metadata, new_versions)
@@ -0,0 +1,588 @@
+# cooking_agent/utils/delta_checkpoint.py
+"""
+델타 인코딩 + 압축 체크포인트 저장
+
+AgentState 전체(messages, cooking_plan, inventory ...)를 슈퍼스텝마다 그대로 저장하면 긴 요리 세션에서
+SQLite 쓰기량이 대화 길이의 제곱으로 늘어납니다. 여기서는 체크포인트를 다음과 같이 나눠 저장합니다.
+
+- 체크포인트 행(checkpoints.checkpoint, type="delta")에는 채널 값 대신 작은 매니페스트만 저장
+  - 작은 값(CHECKPOINT_INLINE_MAX_BYTES 이하)은 매니페스트에 그대로 포함
+  - 큰 값은 내용 해시로 checkpoint_blobs 테이블에 한 번만 저장하고 해시로 참조 (바뀌지 않은 값은 다시 쓰지 않음)
+  - 메시지 리스트는 메시지별 blob + 연결 리스트 노드(prev, 메시지 해시)로 저장하고 마지막 노드(head)만 참조
+    → 메시지가 뒤에 붙기만 하면 새 메시지만 추가로 기록됨
+- 대기 중인 쓰기(writes.value)도 같은 방식 (type="delta-m" 메시지 리스트, "delta-b" 큰 값)
+- CHECKPOINT_COMPRESS_MIN_BYTES 이상인 blob/매니페스트는 zlib으로 압축
+
+읽을 때는 blob 캐시(LRU)에서 값을 복원하고, 캐시에 없는 blob은 체크포인터가 DB에서 한 번에 가져온 뒤 다시 읽습니다.
+이전 형식(msgpack 등)으로 저장된 행은 그대로 읽을 수 있습니다.
+"""
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from langchain_core.messages import BaseMessage
+from langgraph.checkpoint.base import WRITES_IDX_MAP, get_checkpoint_metadata
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from utils.checkpoint_report import CheckpointReportMixin
+from utils.logger import setup_logger
+from utils.metrics import REGISTRY
+
+logger = setup_logger(__name__)
+
+# 이 크기 이상인 blob/매니페스트는 zlib으로 압축
+CHECKPOINT_COMPRESS_MIN_BYTES = int(os.environ.get("CHECKPOINT_COMPRESS_MIN_BYTES", "256"))
+# 직렬화 크기가 이 이하인 채널 값은 blob으로 빼지 않고 매니페스트에 그대로 저장
+CHECKPOINT_INLINE_MAX_BYTES = int(os.environ.get("CHECKPOINT_INLINE_MAX_BYTES", "64"))
+# 복원용 blob 캐시 크기 (MB)
+CHECKPOINT_BLOB_CACHE_MB = int(os.environ.get("CHECKPOINT_BLOB_CACHE_MB", "64"))
+
+DELTA_TYPE = "delta"             # 체크포인트 매니페스트
+DELTA_MESSAGES_TYPE = "delta-m"  # 메시지 리스트 쓰기 (head 해시 + 길이)
+DELTA_BLOB_TYPE = "delta-b"      # 큰 값 쓰기 (blob 해시)
+
+BLOB_VALUE = 0  # 직렬화된 값
+BLOB_NODE = 1   # 메시지 연결 리스트 노드 (prev = 이전 노드, data = 메시지 blob 해시)
+
+_RAW = 0
+_ZLIB = 1
+_LENGTH = struct.Struct(">I")
+# 한 번의 blob 조회에 넣을 해시 수 (SQLite 변수 개수 제한 안쪽)
+_FETCH_CHUNK = 400
+
+CHECKPOINT_WRITE_SECONDS = REGISTRY.histogram(
+    "checkpoint_write_seconds", "Checkpoint store latency (encode + insert + commit)", ["kind"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+CHECKPOINT_WRITTEN_BYTES = REGISTRY.counter(
+    "checkpoint_written_bytes_total", "Bytes written by the delta checkpointer", ["table"]
+)
+CHECKPOINT_BLOB_FETCHES = REGISTRY.counter(
+    "checkpoint_blob_fetch_total", "Blob cache misses resolved from SQLite while restoring checkpoints"
+)
+
+_FETCH_SQL = """
+WITH RECURSIVE need(h) AS (
+    VALUES {seeds}
+    UNION
+    SELECT b.prev FROM checkpoint_blobs b JOIN need ON b.hash = need.h
+    WHERE b.kind = 1 AND b.prev IS NOT NULL
+)
+SELECT b.hash, b.kind, b.prev, b.data FROM checkpoint_blobs b WHERE b.hash IN (SELECT h FROM need)
+UNION ALL
+SELECT m.hash, m.kind, m.prev, m.data FROM checkpoint_blobs n JOIN need ON n.hash = need.h
+JOIN checkpoint_blobs m ON m.hash = n.data WHERE n.kind = 1
+"""
+
+_PRUNE_SQL = """
+DELETE FROM checkpoint_blobs WHERE hash NOT IN (
+    WITH RECURSIVE reach(h) AS (
+        SELECT h FROM temp.live_blobs
+        UNION
+        SELECT b.prev FROM checkpoint_blobs b JOIN reach ON b.hash = reach.h
+        WHERE b.kind = 1 AND b.prev IS NOT NULL
+    )
+    SELECT h FROM reach
+    UNION
+    SELECT n.data FROM checkpoint_blobs n JOIN reach ON n.hash = reach.h WHERE n.kind = 1
+)
+"""
+
+Blob = Tuple[bytes, int, Optional[bytes], bytes]  # (hash, kind, prev, data)
+
+
+class MissingBlobs(LookupError):
+    """복원에 필요한 blob이 캐시에 없을 때 발생합니다. 체크포인터가 hashes를 DB에서 읽어 캐시에 넣고 다시 시도합니다."""
+
+    def __init__(self, hashes: Set[bytes]) -> None:
+        super().__init__(f"{len(hashes)} checkpoint blobs not cached")
+        self.hashes = hashes
+
+
+def _hash(*parts: bytes) -> bytes:
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part)
+    return h.digest()
+
+
+def _pack(type_: str, payload: bytes, compress_min: int) -> bytes:
+    """flag(1) + type 길이(1) + type + payload (compress_min 이상이면 zlib 압축)"""
+    tag = type_.encode()
+    if len(payload) >= compress_min:
+        compressed = zlib.compress(payload, 6)
+        if len(compressed) < len(payload):
+            return bytes((_ZLIB, len(tag))) + tag + compressed
+    return bytes((_RAW, len(tag))) + tag + payload
+
+
+def _unpack(data: bytes) -> Tuple[str, bytes]:
+    flag, size = data[0], data[1]
+    type_ = data[2:2 + size].decode()
+    payload = data[2 + size:]
+    return type_, (zlib.decompress(payload) if flag == _ZLIB else payload)
+
+
+def _is_message_list(value: Any) -> bool:
+    return isinstance(value, list) and bool(value) and all(isinstance(item, BaseMessage) for item in value)
+
+
+class DeltaSerializer:
+    """
+    체크포인트와 쓰기 값을 델타/압축 형식으로 인코딩하고 복원합니다.
+
+    - dumps_typed/loads_typed: SerializerProtocol. dumps_typed는 기존 형식(plain_serde) 그대로 내보내고,
+      loads_typed는 delta 형식과 기존 형식을 모두 읽습니다.
+    - snapshot_*/encode_*: 저장할 (type, data, 새 blob 목록)을 만듭니다. blob은 DB에 커밋한 뒤 remember()로 캐시에 등록해야 함
+    """
+
+    def __init__(
+        self,
+        plain_serde: Optional[JsonPlusSerializer] = None,
+        compress_min_bytes: int = CHECKPOINT_COMPRESS_MIN_BYTES,
+        inline_max_bytes: int = CHECKPOINT_INLINE_MAX_BYTES,
+        cache_bytes: int = CHECKPOINT_BLOB_CACHE_MB * 1024 * 1024,
+    ) -> None:
+        self.plain_serde = plain_serde or JsonPlusSerializer()
+        self.compress_min_bytes = compress_min_bytes
+        self.inline_max_bytes = inline_max_bytes
+        self.cache_bytes = cache_bytes
+        self._cache: "OrderedDict[bytes, Tuple[int, Optional[bytes], bytes]]" = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+        self.counters = {"blobs_reused": 0, "cache_evictions": 0}
+
+    # --- SerializerProtocol ---
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        return self.plain_serde.dumps_typed(obj)
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_ == DELTA_TYPE:
+            return self._load_checkpoint(payload)
+        missing: Set[bytes] = set()
+        if type_ == DELTA_MESSAGES_TYPE:
+            value = self._resolve_messages(payload[:16], _LENGTH.unpack(payload[16:])[0], missing)
+        elif type_ == DELTA_BLOB_TYPE:
+            value = self._resolve_value(payload, missing)
+        else:
+            return self.plain_serde.loads_typed(data)
+        if missing:
+            raise MissingBlobs(missing)
+        return value
+
+    # --- 인코딩 ---
+
+    # 채널 값은 그래프와 같은 객체를 가리키므로(실행 중 누군가 고치면 함께 바뀜) 값은 체크포인터 호출 즉시, await 전에
+    # snapshot_*으로 바이트로 고정해 두고, 해시/캐시 조회/압축(encode_*)은 저장 잠금 안에서 수행합니다.
+
+    def snapshot_checkpoint(self, checkpoint: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "c": self.plain_serde.dumps_typed({**checkpoint, "channel_values": {}}),
+            "v": {channel: self.snapshot_value(value) for channel, value in (checkpoint.get("channel_values") or {}).items()},
+        }
+
+    def snapshot_value(self, value: Any) -> tuple:
+        if _is_message_list(value):
+            return ("m", [self.plain_serde.dumps_typed(message) for message in value])
+        return ("v", *self.plain_serde.dumps_typed(value))
+
+    @staticmethod
+    def snapshot_sizes(snapshot: Dict[str, Any]) -> Dict[str, int]:
+        """스냅샷에 이미 있는 기존 형식 바이트로 채널별 크기를 셉니다. (크기 보고용, 다시 직렬화하지 않음)"""
+        return {
+            channel: sum(len(payload) for _, payload in value[1]) if value[0] == "m" else len(value[2])
+            for channel, value in snapshot["v"].items()
+        }
+
+    def encode_checkpoint(self, snapshot: Dict[str, Any]) -> Tuple[str, bytes, List[Blob]]:
+        blobs: List[Blob] = []
+        refs = {channel: self._encode_ref(value, blobs) for channel, value in snapshot["v"].items()}
+        type_, payload = self.plain_serde.dumps_typed({"c": list(snapshot["c"]), "v": refs})
+        return DELTA_TYPE, _pack(type_, payload, self.compress_min_bytes), blobs
+
+    def encode_value(self, snapshot: tuple) -> Tuple[str, bytes, List[Blob]]:
+        """쓰기(writes) 값 하나를 인코딩합니다. 메시지 리스트와 큰 값만 blob으로 빼고 나머지는 기존 형식 그대로"""
+        blobs: List[Blob] = []
+        ref = self._encode_ref(snapshot, blobs)
+        if ref[0] == "m":
+            return DELTA_MESSAGES_TYPE, ref[1] + _LENGTH.pack(ref[2]), blobs
+        if ref[0] == "b":
+            return DELTA_BLOB_TYPE, ref[1], blobs
+        return ref[1], ref[2], blobs
+
+    def _encode_ref(self, snapshot: tuple, blobs: List[Blob]) -> list:
+        if snapshot[0] == "m":
+            head = None
+            for type_, payload in snapshot[1]:
+                message_hash = self._store_value(type_, payload, blobs)
+                node = _hash(head or b"", message_hash)
+                if not self._reuse(node):
+                    blobs.append((node, BLOB_NODE, head, message_hash))
+                head = node
+            return ["m", head, len(snapshot[1])]
+        _, type_, payload = snapshot
+        if len(payload) <= self.inline_max_bytes:
+            return ["i", type_, payload]
+        return ["b", self._store_value(type_, payload, blobs)]
+
+    def _store_value(self, type_: str, payload: bytes, blobs: List[Blob]) -> bytes:
+        value_hash = _hash(type_.encode(), b"\0", payload)
+        if not self._reuse(value_hash):
+            blobs.append((value_hash, BLOB_VALUE, None, _pack(type_, payload, self.compress_min_bytes)))
+        return value_hash
+
+    def _reuse(self, hash_: bytes) -> bool:
+        """캐시에 있는(= DB에 이미 있는) blob이면 다시 쓰지 않음"""
+        with self._lock:
+            if hash_ not in self._cache:
+                return False
+            self._cache.move_to_end(hash_)
+            self.counters["blobs_reused"] += 1
+            return True
+
+    # --- 캐시 ---
+
+    def remember(self, blobs: Iterable[Blob]) -> None:
+        """DB에 있는 것이 확실한 blob(커밋 후, 또는 DB에서 읽은 것)을 캐시에 등록합니다."""
+        with self._lock:
+            for hash_, kind, prev, data in blobs:
+                if hash_ in self._cache:
+                    self._cache.move_to_end(hash_)
+                    continue
+                self._cache[hash_] = (kind, prev, data)
+                self._cached_bytes += len(data) + 64
+            while self._cached_bytes > self.cache_bytes and self._cache:
+                _, (_, _, data) = self._cache.popitem(last=False)
+                self._cached_bytes -= len(data) + 64
+                self.counters["cache_evictions"] += 1
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._cached_bytes = 0
+
+    def uncached(self, hashes: Iterable[bytes]) -> Set[bytes]:
+        with self._lock:
+            return {hash_ for hash_ in hashes if hash_ not in self._cache}
+
+    def _get(self, hash_: bytes) -> Optional[Tuple[int, Optional[bytes], bytes]]:
+        with self._lock:
+            entry = self._cache.get(hash_)
+            if entry is not None:
+                self._cache.move_to_end(hash_)
+            return entry
+
+    # --- 복원 ---
+
+    def _load_checkpoint(self, data: bytes) -> Dict[str, Any]:
+        manifest = self.plain_serde.loads_typed(_unpack(data))
+        checkpoint = self.plain_serde.loads_typed(tuple(manifest["c"]))
+        missing: Set[bytes] = set()
+        values = {}
+        for channel, ref in manifest["v"].items():
+            if ref[0] == "i":
+                values[channel] = self.plain_serde.loads_typed((ref[1], ref[2]))
+            elif ref[0] == "b":
+                values[channel] = self._resolve_value(ref[1], missing)
+            else:
+                values[channel] = self._resolve_messages(ref[1], ref[2], missing)
+        if missing:
+            raise MissingBlobs(missing)
+        checkpoint["channel_values"] = values
+        return checkpoint
+
+    def _resolve_value(self, hash_: bytes, missing: Set[bytes]) -> Any:
+        entry = self._get(hash_)
+        if entry is None:
+            missing.add(hash_)
+            return None
+        return self.plain_serde.loads_typed(_unpack(entry[2]))
+
+    def _resolve_messages(self, head: bytes, length: int, missing: Set[bytes]) -> Any:
+        message_hashes = []
+        node = head
+        while node is not None:
+            entry = self._get(node)
+            if entry is None:
+                missing.add(node)
+                break
+            message_hashes.append(entry[2])
+            node = entry[1]
+        messages = [self._resolve_value(h, missing) for h in reversed(message_hashes)]
+        if missing:
+            return None
+        if len(messages) != length:
+            raise ValueError(f"message chain length mismatch: expected {length}, got {len(messages)}")
+        return messages
+
+    def references(self, type_: str, data: bytes) -> List[bytes]:
+        """저장된 행이 직접 참조하는 blob 해시 목록 (blob 정리용)"""
+        if type_ == DELTA_TYPE:
+            manifest = self.plain_serde.loads_typed(_unpack(data))
+            return [ref[1] for ref in manifest["v"].values() if ref[0] in ("b", "m")]
+        if type_ == DELTA_MESSAGES_TYPE:
+            return [data[:16]]
+        if type_ == DELTA_BLOB_TYPE:
+            return [data]
+        return []
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self.counters, "cached_blobs": len(self._cache), "cached_bytes": self._cached_bytes}
+
+
+
+_INSERT_BLOB = "INSERT OR IGNORE INTO checkpoint_blobs (hash, kind, prev, data) VALUES (?, ?, ?, ?)"
+
+
+def _unique(blobs: List[Blob]) -> List[Blob]:
+    return list({blob[0]: blob for blob in blobs}.values())
+
+
+def _blob_bytes(blobs: List[Blob]) -> int:
+    return sum(len(hash_) + len(prev or b"") + len(data) for hash_, _, prev, data in blobs)
+
+
+class DeltaAsyncSqliteSaver(CheckpointReportMixin, AsyncSqliteSaver):
+    """
+    DeltaSerializer로 체크포인트/쓰기를 저장하는 SQLite 체크포인터. (슈퍼스텝별 크기 보고 포함)
+    blob은 체크포인트 행과 같은 트랜잭션에서 기록하고, 커밋한 뒤에만 캐시에 등록합니다.
+    """
+
+    serde: DeltaSerializer
+
+    def __init__(self, conn, serde: Optional[DeltaSerializer] = None) -> None:
+        super().__init__(conn, serde=serde or DeltaSerializer())
+        self._blobs_ready = False
+        self.counters = {
+            "checkpoints": 0, "writes": 0, "row_bytes": 0, "blobs": 0, "blob_bytes": 0,
+            "write_seconds": 0.0, "blob_fetches": 0, "fetched_blobs": 0,
+        }
+
+    async def setup(self) -> None:
+        await super().setup()
+        if self._blobs_ready:
+            return
+        async with self.lock:
+            if self._blobs_ready:
+                return
+            await self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoint_blobs ("
+                "hash BLOB PRIMARY KEY, kind INTEGER NOT NULL, prev BLOB, data BLOB NOT NULL) WITHOUT ROWID"
+            )
+            await self.conn.commit()
+            self._blobs_ready = True
+
+    # --- 쓰기 ---
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        snapshot = self.serde.snapshot_checkpoint(checkpoint)
+        self._record_checkpoint_size(config, checkpoint, metadata, lambda: self.serde.snapshot_sizes(snapshot))
+        await self.setup()
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        serialized_metadata = json.dumps(
+            get_checkpoint_metadata(config, metadata), ensure_ascii=False
+        ).encode("utf-8", "ignore")
+        start = time.perf_counter()
+        # 캐시 조회부터 커밋까지 잠금 안에서 수행해야 aprune_blobs와 섞이지 않음
+        async with self.lock, self.conn.cursor() as cur:
+            type_, data, blobs = self.serde.encode_checkpoint(snapshot)
+            blobs = _unique(blobs)
+            try:
+                if blobs:
+                    await cur.executemany(_INSERT_BLOB, blobs)
+                await cur.execute(
+                    "INSERT OR REPLACE INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        str(thread_id),
+                        checkpoint_ns,
+                        checkpoint["id"],
+                        config["configurable"].get("checkpoint_id"),
+                        type_,
+                        data,
+                        serialized_metadata,
+                    ),
+                )
+                await self.conn.commit()
+            except Exception:
+                await self.conn.rollback()
+                raise
+            self.serde.remember(blobs)
+        self._observe("checkpoints", start, len(data) + len(serialized_metadata), blobs)
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    async def aput_writes(self, config, writes: Sequence[Tuple[str, Any]], task_id: str, task_path: str = "") -> None:
+        query = (
+            "INSERT OR REPLACE INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, task_path, idx, channel, type, value) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+            if all(w[0] in WRITES_IDX_MAP for w in writes)
+            else "INSERT OR IGNORE INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, task_path, idx, channel, type, value) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+        )
+        snapshots = [(channel, self.serde.snapshot_value(value)) for channel, value in writes]
+        await self.setup()
+        start = time.perf_counter()
+        async with self.lock, self.conn.cursor() as cur:
+            rows, blobs = [], []
+            for idx, (channel, snapshot) in enumerate(snapshots):
+                type_, data, value_blobs = self.serde.encode_value(snapshot)
+                blobs.extend(value_blobs)
+                rows.append((
+                    str(config["configurable"]["thread_id"]),
+                    str(config["configurable"]["checkpoint_ns"]),
+                    str(config["configurable"]["checkpoint_id"]),
+                    task_id,
+                    task_path,
+                    WRITES_IDX_MAP.get(channel, idx),
+                    channel,
+                    type_,
+                    data,
+                ))
+            blobs = _unique(blobs)
+            try:
+                if blobs:
+                    await cur.executemany(_INSERT_BLOB, blobs)
+                await cur.executemany(query, rows)
+                await self.conn.commit()
+            except Exception:
+                await self.conn.rollback()
+                raise
+            self.serde.remember(blobs)
+        self._observe("writes", start, sum(len(row[-1]) for row in rows), blobs)
+
+    def _observe(self, table: str, start: float, row_bytes: int, blobs: List[Blob]) -> None:
+        elapsed = time.perf_counter() - start
+        blob_bytes = _blob_bytes(blobs)
+        CHECKPOINT_WRITE_SECONDS.observe(elapsed, table)
+        CHECKPOINT_WRITTEN_BYTES.inc(row_bytes, table)
+        if blob_bytes:
+            CHECKPOINT_WRITTEN_BYTES.inc(blob_bytes, "checkpoint_blobs")
+        self.counters[table] += 1
+        self.counters["row_bytes"] += row_bytes
+        self.counters["blobs"] += len(blobs)
+        self.counters["blob_bytes"] += blob_bytes
+        self.counters["write_seconds"] += elapsed
+
+    # --- 읽기 (캐시에 없는 blob은 DB에서 가져와 다시 시도) ---
+
+    async def _with_blobs(self, read):
+        fetched: Set[bytes] = set()
+        while True:
+            try:
+                return await read()
+            except MissingBlobs as e:
+                new = e.hashes - fetched
+                if not new:
+                    logger.error(f"체크포인트 복원에 필요한 blob {len(e.hashes)}개를 DB에서 찾을 수 없습니다.")
+                    raise
+                fetched |= new
+                await self._fetch_blobs(new)
+
+    async def _fetch_blobs(self, hashes: Set[bytes]) -> None:
+        """hashes와 그 메시지 체인 전체(이전 노드 + 메시지 blob)를 한 번에 읽어 캐시에 넣습니다."""
+        seeds = list(hashes)
+        rows: List[Blob] = []
+        async with self.lock:
+            for i in range(0, len(seeds), _FETCH_CHUNK):
+                chunk = seeds[i:i + _FETCH_CHUNK]
+                sql = _FETCH_SQL.format(seeds=", ".join("(?)" for _ in chunk))
+                rows.extend(await self.conn.execute_fetchall(sql, chunk))
+        self.serde.remember(rows)
+        CHECKPOINT_BLOB_FETCHES.inc()
+        self.counters["blob_fetches"] += 1
+        self.counters["fetched_blobs"] += len(rows)
+
+    async def aget_tuple(self, config):
+        parent = super().aget_tuple
+        return await self._with_blobs(lambda: parent(config))
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        parent = super().alist
+        thread_id = ((config or {}).get("configurable") or {}).get("thread_id")
+
+        async def collect():
+            return [item async for item in parent(config, filter=filter, before=before, limit=limit)]
+
+        try:
+            items = await collect()
+        except MissingBlobs:
+            # 히스토리 조회는 체크포인트마다 다른 blob을 참조하므로, 스레드가 참조하는 blob을 한 번에 가져옴
+            if thread_id is not None:
+                await self._prefetch_thread(str(thread_id))
+            items = await self._with_blobs(collect)
+        for item in items:
+            yield item
+
+    async def _prefetch_thread(self, thread_id: str) -> None:
+        async with self.lock:
+            rows = await self.conn.execute_fetchall(
+                "SELECT type, checkpoint FROM checkpoints WHERE thread_id = ? AND type = ? "
+                "UNION ALL SELECT type, value FROM writes WHERE thread_id = ? AND type IN (?, ?)",
+                (thread_id, DELTA_TYPE, thread_id, DELTA_MESSAGES_TYPE, DELTA_BLOB_TYPE),
+            )
+        refs: Set[bytes] = set()
+        for type_, data in rows:
+            refs.update(self.serde.references(type_, data))
+        missing = self.serde.uncached(refs)
+        if missing:
+            await self._fetch_blobs(missing)
+
+    async def aget_delta_channel_history(self, *, config, channels):
+        parent = super().aget_delta_channel_history
+        return await self._with_blobs(lambda: parent(config=config, channels=channels))
+
+    # --- 정리 ---
+
+    async def aprune_blobs(self) -> int:
+        """
+        어떤 체크포인트/쓰기에서도 참조하지 않는 blob을 지우고 지운 개수를 반환합니다.
+        blob은 스레드 사이에서도 공유되므로 adelete_thread는 blob을 남기며, 이 메서드로 따로 정리합니다.
+        """
+        await self.setup()
+        async with self.lock:
+            live: Set[bytes] = set()
+            async with self.conn.execute("SELECT type, checkpoint FROM checkpoints WHERE type = ?", (DELTA_TYPE,)) as cur:
+                async for type_, data in cur:
+                    live.update(self.serde.references(type_, data))
+            async with self.conn.execute(
+                "SELECT type, value FROM writes WHERE type IN (?, ?)", (DELTA_MESSAGES_TYPE, DELTA_BLOB_TYPE)
+            ) as cur:
+                async for type_, data in cur:
+                    live.update(self.serde.references(type_, data))
+            try:
+                await self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS live_blobs (h BLOB PRIMARY KEY)")
+                await self.conn.execute("DELETE FROM temp.live_blobs")
+                await self.conn.executemany("INSERT INTO temp.live_blobs (h) VALUES (?)", [(h,) for h in live])
+                async with self.conn.execute(_PRUNE_SQL) as cur:
+                    removed = cur.rowcount
+                await self.conn.execute("DELETE FROM temp.live_blobs")
+                await self.conn.commit()
+            except Exception:
+                await self.conn.rollback()
+                raise
+            # 지운 blob이 캐시에 남아 있으면 다음 쓰기가 그 blob을 다시 기록하지 않으므로 캐시를 비움
+            self.serde.clear_cache()
+        logger.info(f"참조되지 않는 체크포인트 blob {removed}개를 정리했습니다. (참조 중 {len(live)}개 기준)")
+        return removed
+
+    def stats(self) -> dict:
+        checkpoints = self.counters["checkpoints"] + self.counters["writes"]
+        return {
+            **self.counters,
+            "avg_write_ms": round(self.counters["write_seconds"] / checkpoints * 1000, 3) if checkpoints else 0.0,
+            "serde": self.serde.stats(),
+        }
@@ -0,0 +1,227 @@
+# cooking_agent/utils/llm_provider.py
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# vertex : 실제 Vertex AI (기본값)
+# replay : LLM_REPLAY_FILE 스크립트로 응답 (네트워크/쿼터 불필요)
+# record : 실제 Vertex AI로 호출하면서 응답을 LLM_REPLAY_FILE에 기록
+LLM_PROVIDER = os.environ.get("LLM_PROVIDER", "vertex").lower()
+LLM_REPLAY_FILE = os.environ.get("LLM_REPLAY_FILE") or None
+# replay 응답마다 넣을 모의 지연(ms)
+LLM_REPLAY_LATENCY_MS = float(os.environ.get("LLM_REPLAY_LATENCY_MS", "0"))
+
+DEFAULT_REPLAY_RESPONSE = {"content": "(replay) 준비된 응답이 없습니다."}
+
+
+def prompt_hash(messages: List[BaseMessage]) -> str:
+    """메시지 id 등 실행마다 바뀌는 값을 제외하고 프롬프트 내용으로 sha256을 계산합니다."""
+    entries = []
+    for message in messages:
+        entries.append([
+            message.type,
+            message.content,
+            [[call.get("name"), call.get("args")] for call in getattr(message, "tool_calls", None) or []],
+        ])
+    payload = json.dumps(entries, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def conversation_position(messages: List[BaseMessage]) -> Tuple[int, int]:
+    """(턴 번호, 턴 안에서의 LLM 호출 순서)를 반환합니다. 턴은 사용자 메시지 수로 셉니다."""
+    turn = 0
+    step = 0
+    for message in messages:
+        if isinstance(message, HumanMessage):
+            turn += 1
+            step = 0
+        elif isinstance(message, AIMessage):
+            step += 1
+    return turn, step
+
+
+class ReplayScript:
+    """
+    replay LLM이 돌려줄 응답 스크립트입니다. 아래 순서로 응답을 찾습니다.
+    1. prompts   : 프롬프트 해시(prompt_hash) -> 응답
+    2. positions : "역할:턴:스텝" -> 응답 (턴/스텝 자리에 "*" 사용 가능, 역할 자리의 "*"는 모든 역할)
+    3. default   : 기본 응답
+    응답 형식: {"content": "...", "tool_calls": [{"name": "...", "args": {...}}]}
+    """
+
+    def __init__(self, prompts: Optional[dict] = None, positions: Optional[dict] = None, default: Optional[dict] = None) -> None:
+        self.prompts: Dict[str, dict] = dict(prompts or {})
+        self.positions: Dict[str, dict] = dict(positions or {})
+        self.default = default if default is not None else DEFAULT_REPLAY_RESPONSE
+        self._lock = threading.Lock()
+        self.counters = {"calls": 0, "prompt_hits": 0, "position_hits": 0, "default_hits": 0, "recorded": 0}
+
+    @classmethod
+    def load(cls, path: Optional[str]) -> "ReplayScript":
+        if not path or not os.path.exists(path):
+            if path:
+                logger.warning(f"replay 스크립트가 없습니다: {path} (기본 응답만 사용)")
+            return cls()
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("prompts"), data.get("positions"), data.get("default"))
+
+    def lookup(self, role: str, messages: List[BaseMessage]) -> dict:
+        with self._lock:
+            self.counters["calls"] += 1
+            response = self.prompts.get(prompt_hash(messages))
+            if response is not None:
+                self.counters["prompt_hits"] += 1
+                return response
+            turn, step = conversation_position(messages)
+            for key in (f"{role}:{turn}:{step}", f"{role}:*:{step}", f"{role}:*:*", f"*:{turn}:{step}", f"*:*:{step}"):
+                response = self.positions.get(key)
+                if response is not None:
+                    self.counters["position_hits"] += 1
+                    return response
+            self.counters["default_hits"] += 1
+            return self.default
+
+    def record(self, messages: List[BaseMessage], message: AIMessage) -> None:
+        with self._lock:
+            self.prompts[prompt_hash(messages)] = message_to_response(message)
+            self.counters["recorded"] += 1
+
+    def save(self, path: str) -> None:
+        with self._lock:
+            data = {"default": self.default, "positions": self.positions, "prompts": self.prompts}
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.counters)
+
+
+def message_to_response(message: AIMessage) -> dict:
+    response: Dict[str, Any] = {"content": message.content}
+    if message.tool_calls:
+        response["tool_calls"] = [{"name": call["name"], "args": call["args"]} for call in message.tool_calls]
+    return response
+
+
+def response_to_message(response: dict, position: Tuple[int, int]) -> AIMessage:
+    turn, step = position
+    tool_calls = [
+        {"name": call["name"], "args": call.get("args", {}), "id": f"replay_{turn}_{step}_{i}", "type": "tool_call"}
+        for i, call in enumerate(response.get("tool_calls") or [])
+    ]
+    return AIMessage(content=response.get("content", ""), tool_calls=tool_calls)
+
+
+class ReplayChatModel(BaseChatModel):
+    """스크립트에 적힌 응답(도구 호출 포함)을 그대로 돌려주는 오프라인 LLM 입니다."""
+
+    role: str = "default"
+    script: Any = None
+    latency_ms: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    def bind_tools(self, tools, **kwargs):
+        # 도구 스키마는 응답에 영향을 주지 않음
+        return self
+
+    def _respond(self, messages: List[BaseMessage]) -> ChatResult:
+        response = self.script.lookup(self.role, messages)
+        message = response_to_message(response, conversation_position(messages))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return self._respond(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return self._respond(messages)
+
+
+class RecordingChatModel(BaseChatModel):
+    """실제 LLM을 호출하고, 프롬프트 해시별 응답을 replay 스크립트 파일에 기록합니다."""
+
+    inner: Any = None
+    script: Any = None
+    path: Optional[str] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "recording"
+
+    def bind_tools(self, tools, **kwargs):
+        return RecordingChatModel(inner=self.inner.bind_tools(tools, **kwargs), script=self.script, path=self.path)
+
+    def _save(self, messages: List[BaseMessage], message: AIMessage) -> ChatResult:
+        self.script.record(messages, message)
+        if self.path:
+            self.script.save(self.path)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        return self._save(messages, self.inner.invoke(messages))
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        return self._save(messages, await self.inner.ainvoke(messages))
+
+
+# 프로세스 공용 설정 (set_llm_provider로 교체 가능)
+_provider = LLM_PROVIDER
+_script: Optional[ReplayScript] = None
+
+
+def set_llm_provider(provider: str, script: Optional[ReplayScript] = None) -> None:
+    """LLM 공급자를 바꿉니다. (벤치마크/오프라인 실행용, 이후 생성되는 모델부터 적용)"""
+    global _provider, _script
+    _provider = provider.lower()
+    _script = script
+
+
+def get_llm_provider() -> str:
+    return _provider
+
+
+def get_replay_script() -> ReplayScript:
+    global _script
+    if _script is None:
+        _script = ReplayScript.load(LLM_REPLAY_FILE)
+    return _script
+
+
+def get_chat_model(role: str, **model_kwargs: Any) -> BaseChatModel:
+    """
+    역할(role)에 맞는 채팅 모델을 반환합니다. model_kwargs는 Vertex AI 모델 생성 인자입니다.
+    replay 모드에서는 역할이 응답 스크립트의 키("역할:턴:스텝")로 쓰입니다.
+    """
+    if _provider == "replay":
+        return ReplayChatModel(role=role, script=get_replay_script(), latency_ms=LLM_REPLAY_LATENCY_MS)
+
+    from langchain_google_vertexai import ChatVertexAI
+
+    llm = ChatVertexAI(**model_kwargs)
+    if _provider == "record":
+        return RecordingChatModel(inner=llm, script=get_replay_script(), path=LLM_REPLAY_FILE)
+    return llm
+
+
+def get_llm_provider_stats() -> dict:
+    return {"provider": _provider, "replay": _script.stats() if _script is not None else None}
@@ -0,0 +1,398 @@
+import abc
+import bisect
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Prometheus 텍스트 노출 형식(0.0.4) 응답의 Content-Type
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+# 메트릭 콜백을 붙일 요청 비율 (1.0 = 모든 요청). 샘플된 요청의 관측값은 1/비율 가중치로 집계합니다.
+METRICS_SAMPLE_RATE = float(os.environ.get("METRICS_SAMPLE_RATE", "1.0"))
+
+# 기본 지연 버킷(초): 노드/도구(수 ms)부터 LLM 호출(수십 초)까지
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(abc.ABC):
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+    @abc.abstractmethod
+    def render(self) -> List[str]:
+        """Prometheus 텍스트 형식의 줄 목록 (HELP/TYPE 헤더 포함)"""
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, *labelvalues: str) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(labelvalues, 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = self._header()
+        lines.extend(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(v)}" for labels, v in items)
+        return lines
+
+
+class Gauge(_Metric):
+    """값을 직접 설정하거나(set/inc/dec), 수집 시점에 함수로 계산하는(set_function) 게이지입니다."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._function: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None
+
+    def inc(self, amount: float = 1.0, *labelvalues: str) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, *labelvalues: str) -> None:
+        self.inc(-amount, *labelvalues)
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        with self._lock:
+            self._values[labelvalues] = value
+
+    def set_function(self, function: Callable[[], Dict[Tuple[str, ...], float]]) -> None:
+        """수집 시점에 {라벨 값 튜플: 값}을 돌려주는 함수를 등록합니다."""
+        self._function = function
+
+    def render(self) -> List[str]:
+        if self._function is not None:
+            try:
+                items = sorted(self._function().items())
+            except Exception:
+                items = []
+        else:
+            with self._lock:
+                items = sorted(self._values.items())
+        lines = self._header()
+        lines.extend(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(v)}" for labels, v in items)
+        return lines
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 라벨 값 -> [버킷별 개수(누적 아님) + 초과분, 합계, 개수]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labelvalues: str, weight: float = 1) -> None:
+        """값 하나를 기록합니다. weight는 샘플링된 관측값이 대표하는 건수입니다."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labelvalues)
+            if entry is None:
+                entry = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._values[labelvalues] = entry
+            entry[0][index] += weight
+            entry[1] += value * weight
+            entry[2] += weight
+
+    def count(self, *labelvalues: str) -> float:
+        entry = self._values.get(labelvalues)
+        return entry[2] if entry else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((labels, (list(e[0]), e[1], e[2])) for labels, e in self._values.items())
+        lines = self._header()
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {_format_value(cumulative)}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {_format_value(count)}")
+        return lines
+
+
+class MetricsRegistry:
+    """외부 의존성 없이 Prometheus 텍스트 형식으로 내보내는 메트릭 저장소입니다."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        # 렌더링 직전에 호출할 함수 (콜백이 쌓아 둔 관측값을 메트릭에 반영)
+        self._flushes: List[Callable[[], None]] = []
+
+    def _register(self, metric: _Metric) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_flush(self, function: Callable[[], None]) -> None:
+        """render() 직전에 호출할 함수를 등록합니다."""
+        with self._lock:
+            self._flushes.append(function)
+
+    def flush(self) -> None:
+        with self._lock:
+            flushes = list(self._flushes)
+        for function in flushes:
+            function()
+
+    def render(self) -> str:
+        self.flush()
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# 프로세스 공용 레지스트리와 공통 메트릭
+REGISTRY = MetricsRegistry()
+
+NODE_DURATION = REGISTRY.histogram(
+    "graph_node_duration_seconds", "LangGraph node execution time (node path, e.g. cooking.init)", ["node"])
+NODE_ERRORS = REGISTRY.counter("graph_node_errors_total", "LangGraph node executions that raised", ["node"])
+TOOL_DURATION = REGISTRY.histogram(
+    "mcp_tool_call_duration_seconds", "MCP tool call latency (cache hits excluded)", ["server", "tool"])
+TOOL_ERRORS = REGISTRY.counter("mcp_tool_call_errors_total", "Failed MCP tool calls", ["server", "tool"])
+LLM_DURATION = REGISTRY.histogram("llm_call_duration_seconds", "LLM call latency", ["model", "node"])
+LLM_ERRORS = REGISTRY.counter("llm_call_errors_total", "Failed LLM calls", ["model", "node"])
+LLM_TOKENS = REGISTRY.counter("llm_tokens_total", "LLM tokens by direction (input/output)", ["model", "node", "type"])
+HTTP_IN_FLIGHT = REGISTRY.gauge("http_requests_in_flight", "HTTP requests currently being handled", ["path"])
+HTTP_REQUESTS = REGISTRY.counter("http_requests_total", "Handled HTTP requests", ["path", "status"])
+
+
+def node_path(metadata: Dict[str, Any]) -> str:
+    """체크포인트 네임스페이스("cooking:<id>|init:<id>")와 노드 이름으로 "cooking.init" 같은 경로를 만듭니다."""
+    ns = metadata.get("langgraph_checkpoint_ns") or ""
+    parts = [part.split(":", 1)[0] for part in ns.split("|") if part]
+    return ".".join(parts) if parts else metadata.get("langgraph_node", "")
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """
+    LangGraph 노드 실행 시간과 LLM 호출 지연/토큰 수를 메트릭으로 수집하는 콜백 핸들러입니다.
+    콜백은 요청 경로에서 실행되므로 시작 시각과 원본 값(네임스페이스, 메타데이터, 응답)만 큐에 넣고,
+    라벨(노드 경로, 모델 이름) 계산과 락을 잡는 히스토그램/카운터 갱신은 flush()에서 몰아서 합니다.
+    flush()는 /metrics 렌더링 때, 또는 큐가 FLUSH_THRESHOLD개를 넘을 때 호출됩니다.
+    핸들러가 붙어 있기만 해도 LangChain이 모든 Runnable 이벤트를 전달하므로, 요청마다 callbacks()로
+    sample_rate 비율의 요청에만 붙이고 관측값은 1/sample_rate 가중치로 집계합니다.
+    (가중치는 핸들러 단위이므로, 샘플링 없이 항상 붙일 핸들러는 sample_rate=1.0인 인스턴스를 따로 씁니다)
+    (MCP 도구 지연은 캐시 적중을 빼고 측정하기 위해 MCP 호출 지점에서 직접 기록합니다)
+    """
+
+    run_inline = True
+    FLUSH_THRESHOLD = 2048
+
+    def __init__(self, sample_rate: float = METRICS_SAMPLE_RATE) -> None:
+        self.sample_rate = sample_rate
+        # run_id -> (체크포인트 네임스페이스, 노드 이름, 시작 시각)
+        self._nodes: Dict[UUID, Tuple[str, str, float]] = {}
+        # run_id -> (메타데이터, 호출 인자, 시작 시각)
+        self._llm_runs: Dict[UUID, Tuple[Dict[str, Any], Dict[str, Any], float]] = {}
+        # 아직 메트릭에 반영하지 않은 관측값: ("node", 시작 정보, 소요 시간, 오류 여부) / ("llm", 시작 정보, 소요 시간, 응답)
+        self._pending: deque = deque()
+
+    def callbacks(self) -> List["MetricsCallbackHandler"]:
+        """이번 요청에 붙일 콜백 목록을 반환합니다. (샘플되지 않은 요청이면 빈 목록)"""
+        if self.sample_rate >= 1 or random.random() < self.sample_rate:
+            return [self]
+        return []
+
+    def _push(self, item: tuple) -> None:
+        self._pending.append(item)
+        if len(self._pending) > self.FLUSH_THRESHOLD:
+            self.flush()
+
+    def flush(self) -> None:
+        """쌓아 둔 관측값을 메트릭에 반영합니다."""
+        pending = self._pending
+        weight = 1 / self.sample_rate if 0 < self.sample_rate < 1 else 1
+        while pending:
+            try:
+                kind, started, elapsed, extra = pending.popleft()
+            except IndexError:
+                break
+            if kind == "node":
+                ns, node, _ = started
+                path = node_path({"langgraph_checkpoint_ns": ns, "langgraph_node": node})
+                NODE_DURATION.observe(elapsed, path, weight=weight)
+                if extra:
+                    NODE_ERRORS.inc(weight, path)
+                continue
+            metadata, params, _ = started
+            model = str(metadata.get("ls_model_name") or params.get("model_name") or params.get("model")
+                        or params.get("_type") or "unknown")
+            node = node_path(metadata)
+            LLM_DURATION.observe(elapsed, model, node, weight=weight)
+            if isinstance(extra, BaseException):
+                LLM_ERRORS.inc(weight, model, node)
+                continue
+            input_tokens, output_tokens = _token_usage(extra)
+            if input_tokens:
+                LLM_TOKENS.inc(input_tokens * weight, model, node, "input")
+            if output_tokens:
+                LLM_TOKENS.inc(output_tokens * weight, model, node, "output")
+
+    # --- 그래프 노드 ---
+    def on_chain_start(self, serialized: Dict[str, Any], inputs: Any, *, run_id: UUID,
+                       metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        if metadata:
+            node = metadata.get("langgraph_node")
+            if node and kwargs.get("name") == node:
+                self._nodes[run_id] = (metadata.get("langgraph_checkpoint_ns") or "", node, time.perf_counter())
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._nodes.pop(run_id, None)
+        if started is not None:
+            self._push(("node", started, time.perf_counter() - started[2], False))
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._nodes.pop(run_id, None)
+        if started is not None:
+            self._push(("node", started, time.perf_counter() - started[2], True))
+
+    # --- LLM ---
+    # 다른 모델을 감싸는 모델(예: 예산 래퍼)은 안쪽 모델을 자식 실행으로 호출하므로, 가장 바깥 호출만 셉니다.
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: Any, *, run_id: UUID,
+                            parent_run_id: Optional[UUID] = None, metadata: Optional[Dict[str, Any]] = None,
+                            **kwargs: Any) -> None:
+        if parent_run_id not in self._llm_runs:
+            self._llm_runs[run_id] = (metadata or {}, kwargs.get("invocation_params") or {}, time.perf_counter())
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: Any, *, run_id: UUID,
+                     parent_run_id: Optional[UUID] = None, metadata: Optional[Dict[str, Any]] = None,
+                     **kwargs: Any) -> None:
+        if parent_run_id not in self._llm_runs:
+            self._llm_runs[run_id] = (metadata or {}, kwargs.get("invocation_params") or {}, time.perf_counter())
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._llm_runs.pop(run_id, None)
+        if started is not None:
+            self._push(("llm", started, time.perf_counter() - started[2], response))
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._llm_runs.pop(run_id, None)
+        if started is not None:
+            self._push(("llm", started, time.perf_counter() - started[2], error))
+
+
+def _token_usage(response: Any) -> Tuple[int, int]:
+    """LLMResult에서 (입력, 출력) 토큰 수를 꺼냅니다. (usage_metadata 우선, 없으면 llm_output)"""
+    input_tokens = output_tokens = 0
+    for generations in getattr(response, "generations", None) or []:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                input_tokens += usage.get("input_tokens", 0)
+                output_tokens += usage.get("output_tokens", 0)
+    if not (input_tokens or output_tokens):
+        usage = (getattr(response, "llm_output", None) or {}).get("usage_metadata") or {}
+        input_tokens = usage.get("prompt_token_count", 0)
+        output_tokens = usage.get("candidates_token_count", 0)
+    return input_tokens, output_tokens
+
+
+def observe_tool_call(server: str, tool: str, started: float, error: bool = False) -> None:
+    """MCP 도구 호출 한 건의 지연/오류를 기록합니다. (started: time.perf_counter() 값)"""
+    TOOL_DURATION.observe(time.perf_counter() - started, server, tool)
+    if error:
+        TOOL_ERRORS.inc(1, server, tool)
+
+
+class MetricsMiddleware:
+    """
+    HTTP 요청 수와 처리 중인 요청 수를 기록하는 ASGI 미들웨어입니다.
+    응답 본문 전송이 끝날 때까지 in-flight로 세므로 SSE 스트리밍도 끝까지 집계됩니다.
+    paths에 없는 경로는 라벨 개수가 늘지 않도록 "other"로 묶습니다.
+    """
+
+    def __init__(self, app: Any, paths: Sequence[str] = ()) -> None:
+        self.app = app
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        path = scope.get("path", "")
+        if path not in self.paths:
+            path = "other"
+        status = {"code": 500}
+
+        async def _send(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc(1, path)
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            HTTP_IN_FLIGHT.dec(1, path)
+            HTTP_REQUESTS.inc(1, path, str(status["code"]))
+
+
+# 프로세스 공용 핸들러
+metrics_handler = MetricsCallbackHandler()
+REGISTRY.add_flush(metrics_handler.flush)
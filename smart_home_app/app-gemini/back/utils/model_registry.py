@@ -0,0 +1,356 @@
+# cooking_agent/utils/model_registry.py
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from langchain_core.callbacks import AsyncCallbackManager, AsyncCallbackManagerForLLMRun, CallbackManager
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.rate_limiters import InMemoryRateLimiter
+
+from utils.llm_provider import get_chat_model, get_llm_provider
+from utils.logger import setup_logger
+from utils.metrics import REGISTRY
+
+logger = setup_logger(__name__)
+
+# 모든 노드가 함께 쓰는 LLM 동시 호출 상한
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "8"))
+# 초당 LLM 호출 상한 (0이면 제한 없음). Vertex AI 쿼터(RPM)에 맞춰 설정
+LLM_REQUESTS_PER_SECOND = float(os.environ.get("LLM_REQUESTS_PER_SECOND", "0"))
+# 시작 시 미리 만들어 둘 역할 목록
+LLM_WARMUP_ROLES = [role.strip() for role in os.environ.get("LLM_WARMUP_ROLES", "chat,planner,intent").split(",") if role.strip()]
+# 1이면 warm-up 때 짧은 호출을 한 번 보내 인증/연결 설정까지 끝내 둠 (첫 사용자 요청의 지연 제거, 호출 비용 발생)
+LLM_WARMUP_INVOKE = os.environ.get("LLM_WARMUP_INVOKE", "0") == "1"
+
+# 역할별 기본 생성 설정. <ROLE>_LLM_MODEL, <ROLE>_LLM_TEMPERATURE 환경 변수로 바꿀 수 있음
+DEFAULT_ROLE_CONFIGS: Dict[str, Dict[str, Any]] = {
+    "chat": {"model": "gemini-1.5-pro-preview-0409", "temperature": 0.7},
+    "planner": {"model": "gemini-1.5-pro-preview-0409", "temperature": 0.2},
+    "intent": {"model": "gemini-1.5-flash-001", "temperature": 0.0},
+}
+
+LLM_IN_FLIGHT = REGISTRY.gauge("llm_calls_in_flight", "LLM calls holding a shared budget slot")
+LLM_BUDGET_WAIT = REGISTRY.histogram(
+    "llm_budget_wait_seconds", "Time LLM calls waited for the shared concurrency/rate budget",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+
+def _role_config(role: str, defaults: Dict[str, Any]) -> Dict[str, Any]:
+    config = dict(defaults)
+    model = os.environ.get(f"{role.upper()}_LLM_MODEL")
+    if model:
+        config["model"] = model
+    temperature = os.environ.get(f"{role.upper()}_LLM_TEMPERATURE")
+    if temperature:
+        config["temperature"] = float(temperature)
+    return config
+
+
+class _SharedSlots:
+    """
+    동기 호출(스레드)과 비동기 호출(이벤트 루프)이 함께 세는 동시 실행 슬롯입니다.
+    기다리는 호출은 도착 순서대로 줄을 서고, 슬롯이 반납되면 맨 앞 호출에 바로 넘겨줍니다.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.used = 0
+        self._lock = threading.Lock()
+        # threading.Event(동기) 또는 (loop, future)(비동기)
+        self._waiters: deque = deque()
+
+    def _try_acquire(self) -> bool:
+        if self.used < self.limit and not self._waiters:
+            self.used += 1
+            return True
+        return False
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self._try_acquire():
+                return
+            event = threading.Event()
+            self._waiters.append(event)
+        event.wait()
+
+    async def aacquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._try_acquire():
+                return
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    raise
+            # 취소되기 직전에 슬롯을 넘겨받았으면 돌려줌
+            self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            if not self._waiters:
+                self.used -= 1
+                return
+            waiter = self._waiters.popleft()
+        # 사용 중인 슬롯 수는 그대로 두고 기다리던 호출에 넘김
+        if isinstance(waiter, threading.Event):
+            waiter.set()
+        else:
+            loop, future = waiter
+            loop.call_soon_threadsafe(_resolve, future)
+
+
+def _as_chunk(message) -> BaseMessageChunk:
+    # 스트리밍을 구현하지 않은 모델은 astream/stream에서 완성된 AIMessage 하나를 돌려줌
+    if isinstance(message, BaseMessageChunk) or not isinstance(message, AIMessage):
+        return message
+    return AIMessageChunk(
+        content=message.content, additional_kwargs=message.additional_kwargs, response_metadata=message.response_metadata,
+        tool_calls=message.tool_calls, usage_metadata=message.usage_metadata, id=message.id,
+    )
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class LLMBudget:
+    """
+    프로세스 안의 모든 LLM 호출이 함께 쓰는 동시 호출/초당 호출 상한입니다.
+    노드마다 따로 제한하면 합계가 쿼터를 넘을 수 있으므로, 역할과 모델에 관계없이 하나의 예산을 나눠 씁니다.
+    동기 호출과 비동기 호출도 같은 max_concurrency를 함께 셉니다.
+    """
+
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY, requests_per_second: float = LLM_REQUESTS_PER_SECOND) -> None:
+        self.max_concurrency = max(max_concurrency, 1)
+        self.requests_per_second = requests_per_second
+        # 동기(invoke)/비동기(ainvoke) 호출이 같은 상한을 함께 씀
+        self._slots = _SharedSlots(self.max_concurrency)
+        self._rate_limiter = (
+            InMemoryRateLimiter(requests_per_second=requests_per_second, check_every_n_seconds=0.01)
+            if requests_per_second > 0 else None
+        )
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.counters = {"calls": 0, "wait_seconds": 0.0}
+
+    def _enter(self, waited: float) -> None:
+        LLM_BUDGET_WAIT.observe(waited)
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            self.counters["calls"] += 1
+            self.counters["wait_seconds"] += waited
+        LLM_IN_FLIGHT.inc()
+
+    def _exit(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+        LLM_IN_FLIGHT.dec()
+
+    @asynccontextmanager
+    async def aslot(self):
+        started = time.perf_counter()
+        if self._rate_limiter is not None:
+            await self._rate_limiter.aacquire()
+        await self._slots.aacquire()
+        try:
+            self._enter(time.perf_counter() - started)
+            try:
+                yield
+            finally:
+                self._exit()
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def slot(self):
+        started = time.perf_counter()
+        if self._rate_limiter is not None:
+            self._rate_limiter.acquire()
+        self._slots.acquire()
+        try:
+            self._enter(time.perf_counter() - started)
+            try:
+                yield
+            finally:
+                self._exit()
+        finally:
+            self._slots.release()
+
+    def stats(self) -> dict:
+        calls = self.counters["calls"]
+        return {
+            "max_concurrency": self.max_concurrency,
+            "requests_per_second": self.requests_per_second,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "calls": calls,
+            "avg_wait_ms": round(self.counters["wait_seconds"] / calls * 1000, 2) if calls else 0.0,
+        }
+
+
+class BudgetedChatModel(BaseChatModel):
+    """
+    실제 모델(inner)을 호출하기 전에 공용 예산(LLMBudget) 슬롯을 얻는 래퍼입니다.
+    호출 인자(kwargs)는 그대로 넘기고, 콜백은 이 모델 실행의 자식 실행으로 전달합니다.
+    스트리밍은 마지막 청크를 받을 때까지 슬롯을 잡고 있습니다.
+    """
+
+    inner: Any = None
+    budget: Any = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "budgeted"
+
+    def _get_ls_params(self, stop=None, **kwargs):
+        # 메트릭/트레이스의 모델 이름은 감싼 모델 기준 (bind_tools 결과는 RunnableBinding)
+        model = getattr(self.inner, "bound", self.inner)
+        if isinstance(model, BaseChatModel):
+            return model._get_ls_params(stop=stop, **kwargs)
+        return super()._get_ls_params(stop=stop, **kwargs)
+
+    def bind_tools(self, tools, **kwargs):
+        return BudgetedChatModel(inner=self.inner.bind_tools(tools, **kwargs), budget=self.budget)
+
+    @staticmethod
+    def _child_config(run_manager) -> Optional[dict]:
+        # LLM 실행 관리자에는 get_child()가 없으므로 ParentRunManager.get_child()와 같은 방식으로 자식 관리자를 만듦
+        if run_manager is None:
+            return None
+        manager_cls = AsyncCallbackManager if isinstance(run_manager, AsyncCallbackManagerForLLMRun) else CallbackManager
+        manager = manager_cls(handlers=[], parent_run_id=run_manager.run_id)
+        manager.set_handlers(run_manager.inheritable_handlers)
+        manager.add_tags(run_manager.inheritable_tags)
+        manager.add_metadata(run_manager.inheritable_metadata)
+        return {"callbacks": manager}
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        with self.budget.slot():
+            message = self.inner.invoke(messages, self._child_config(run_manager), stop=stop, **kwargs)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        async with self.budget.aslot():
+            message = await self.inner.ainvoke(messages, self._child_config(run_manager), stop=stop, **kwargs)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        with self.budget.slot():
+            for chunk in self.inner.stream(messages, self._child_config(run_manager), stop=stop, **kwargs):
+                yield ChatGenerationChunk(message=_as_chunk(chunk))
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        async with self.budget.aslot():
+            async for chunk in self.inner.astream(messages, self._child_config(run_manager), stop=stop, **kwargs):
+                yield ChatGenerationChunk(message=_as_chunk(chunk))
+
+
+class ModelRegistry:
+    """
+    노드가 역할("chat", "planner", "intent")로 모델을 요청하면 (모델 이름, 생성 설정)이 같은 클라이언트를 재사용해 돌려줍니다.
+    - 클라이언트는 처음 요청될 때 만들고(utils/llm_provider.get_chat_model), 이후 같은 키로는 같은 인스턴스를 반환합니다.
+    - 모든 클라이언트는 하나의 LLMBudget을 공유합니다.
+    - replay 모드에서는 역할이 응답 스크립트의 키이므로 역할도 키에 포함합니다.
+    """
+
+    def __init__(self, role_configs: Optional[Dict[str, Dict[str, Any]]] = None, budget: Optional[LLMBudget] = None) -> None:
+        configs = role_configs if role_configs is not None else DEFAULT_ROLE_CONFIGS
+        self._roles = {role: _role_config(role, config) for role, config in configs.items()}
+        self.budget = budget or LLMBudget()
+        self._models: Dict[Tuple[str, ...], BaseChatModel] = {}
+        self._lock = threading.Lock()
+        self.counters = {"created": 0, "reused": 0}
+
+    def register_role(self, role: str, **config: Any) -> None:
+        """역할의 생성 설정을 등록하거나 바꿉니다. (이미 만든 클라이언트는 설정이 같을 때만 계속 쓰임)"""
+        self._roles[role] = _role_config(role, config)
+
+    def config_for(self, role: str, **overrides: Any) -> Dict[str, Any]:
+        if role not in self._roles:
+            raise ValueError(f"등록되지 않은 LLM 역할입니다: '{role}' (등록된 역할: {', '.join(self._roles)})")
+        return {**self._roles[role], **overrides}
+
+    def _key(self, role: str, config: Dict[str, Any]) -> Tuple[str, ...]:
+        provider = get_llm_provider()
+        key = (provider, json.dumps(config, sort_keys=True, default=str))
+        return key + (role,) if provider == "replay" else key
+
+    def get(self, role: str, **overrides: Any) -> BaseChatModel:
+        """역할에 맞는 모델을 반환합니다. overrides는 역할 설정 위에 덮어쓸 생성 설정입니다. (다른 키가 됨)"""
+        config = self.config_for(role, **overrides)
+        key = self._key(role, config)
+        model = self._models.get(key)
+        if model is not None:
+            self.counters["reused"] += 1
+            return model
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                model = BudgetedChatModel(inner=get_chat_model(role, **config), budget=self.budget)
+                self._models[key] = model
+                self.counters["created"] += 1
+                logger.info(f"LLM 클라이언트 생성: 역할={role}, 설정={config}")
+            else:
+                self.counters["reused"] += 1
+        return model
+
+    async def warm_up(self, roles: Optional[Iterable[str]] = None, invoke: bool = LLM_WARMUP_INVOKE) -> Dict[str, float]:
+        """
+        역할별 클라이언트를 미리 만들어 둡니다. invoke=True면 짧은 호출을 한 번 보내 인증/연결까지 준비합니다.
+        실패한 역할은 로그만 남기고 건너뜁니다. 반환값은 역할별 소요 시간(ms)입니다.
+        """
+        elapsed = {}
+        for role in roles or LLM_WARMUP_ROLES:
+            started = time.perf_counter()
+            try:
+                model = self.get(role)
+                if invoke:
+                    await model.ainvoke("ping")
+            except Exception as e:
+                logger.error(f"LLM warm-up 실패 (역할={role}): {e}")
+                continue
+            elapsed[role] = round((time.perf_counter() - started) * 1000, 2)
+        logger.info(f"LLM warm-up 완료: {elapsed}")
+        return elapsed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+
+    def stats(self) -> dict:
+        return {"roles": list(self._roles), "clients": len(self._models), **self.counters, "budget": self.budget.stats()}
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry()
+    return _registry
+
+
+def get_model(role: str, **overrides: Any) -> BaseChatModel:
+    """노드에서 쓰는 진입점: 역할에 맞는 공용 LLM 클라이언트를 반환합니다."""
+    return get_model_registry().get(role, **overrides)
@@ -1,149 +1,53 @@
 import os
 import asyncio
+import hashlib
 import signal
 from typing import Dict, List, Any
 import contextlib
 import aiofiles
 
-from langchain_google_vertexai import ChatVertexAI
 from dotenv import load_dotenv
-from langchain_mcp_adapters.client import MultiServerMCPClient
+from utils.llm_provider import get_chat_model
+from utils.mcp_pool import MCP_SERVERS as _pool_mcp_servers, get_mcp_manager, close_mcp_manager, tools_fingerprint
+from utils.tool_selector import TOOL_SELECTOR_ENABLED, ToolSelector
 from langgraph.prebuilt import create_react_agent
-from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.runnables import RunnableLambda
 
 # 환경 변수 로드
 load_dotenv()
 
 # 싱글톤 인스턴스
 _llm_instance = None
-_mcp_client = None
-_mcp_tools_cache = None
-
-from langfuse.callback import CallbackHandler
-langfuse_handler = CallbackHandler(
-    public_key="",
-    secret_key="",
-    host=""
-)
-# MCP 서버 URL 설정
-MCP_SERVERS = {
-    "refrigerator": {
-        "url": os.environ.get("REFRIGERATOR_MCP_URL", "http://localhost:10001/sse"),
-        "transport": "sse",
-    },
-    "induction": {
-        "url": os.environ.get("INDUCTION_MCP_URL", "http://localhost:10002/sse"),
-        "transport": "sse",
-    },
-    "microwave": {
-        "url": os.environ.get("MICROWAVE_MCP_URL", "http://localhost:10003/sse"),
-        "transport": "sse",
-    },
-    "mobile": {
-        "url": os.environ.get("MOBILE_MCP_URL", "http://localhost:10004/sse"),
-        "transport": "sse",
-    },
-    "cooking": {
-        "url": os.environ.get("COOKING_MCP_URL", "http://localhost:10005/sse"),
-        "transport": "sse",
-    },
-    "personalization": {
-        "url": os.environ.get("PERSONALIZATION_MCP_URL", "http://localhost:10006/sse"),
-        "transport": "sse",
-    },
-    "tv": {
-        "url": os.environ.get("TV_MCP_URL", "http://localhost:10007/sse"),
-        "transport": "sse",
-    },
-    "audio": {
-        "url": os.environ.get("AUDIO_MCP_URL", "http://localhost:10008/sse"),
-        "transport": "sse",
-    },
-    "light": {
-        "url": os.environ.get("LIGHT_MCP_URL", "http://localhost:10009/sse"),
-        "transport": "sse",
-    },
-    "curtain": {
-        "url": os.environ.get("CURTAIN_MCP_URL", "http://localhost:10010/sse"),
-        "transport": "sse",
-    },
-}
+
+# 컴파일된 ReAct 에이전트 캐시 (도구 구성 + 프롬프트 파일이 바뀔 때만 재생성)
+PROMPT_PATH = os.path.join(os.path.dirname(__file__), '../prompts/react_agent_prompt.txt')
+_agent_instance = None
+_agent_cache_key = None
+_agent_cache_stats = {"hits": 0, "misses": 0}
+# (mtime_ns, size) -> (템플릿 내용, sha256)
+_prompt_template_cache = None
+
+# MCP 서버 URL 설정 (공용 세션 매니저에서 관리)
+MCP_SERVERS = _pool_mcp_servers
 
 # MCP 클라이언트 초기화 함수
 async def init_mcp_client():
-    """MCP 클라이언트를 초기화합니다."""
-    global _mcp_client
-    if _mcp_client is None:
-        print("MCP 클라이언트 초기화 시작")
-        
-        try:
-            # MCP 클라이언트 생성
-            print("MCP 클라이언트 생성 중...")
-            client = MultiServerMCPClient(MCP_SERVERS)
-            print("MCP 클라이언트 인스턴스 생성 완료")
-            
-            # MCP 클라이언트 연결
-            print("MCP 서버에 연결 시도 중...")
-            await client.__aenter__()
-            print("MCP 서버 연결 성공")
-            
-            _mcp_client = client
-            print("MCP 클라이언트 초기화 완료")
-        except Exception as e:
-            print(f"MCP 클라이언트 초기화 중 오류 발생: {str(e)}")
-            if client:
-                try:
-                    await client.__aexit__(None, None, None)
-                except Exception as close_error:
-                    print(f"클라이언트 종료 중 오류: {str(close_error)}")
-            raise
-    
-    return _mcp_client
+    """공용 MCP 세션 매니저를 반환합니다. (서버 연결은 도구가 필요할 때 이루어집니다)"""
+    return get_mcp_manager()
 
 # MCP 클라이언트 종료 함수
 async def close_mcp_client():
     """MCP 클라이언트 연결을 안전하게 종료합니다."""
-    global _mcp_client
-    
-    if _mcp_client is not None:
-        print("MCP 클라이언트 연결 종료 중...")
-        try:
-            await _mcp_client.__aexit__(None, None, None)
-            print("MCP 클라이언트 연결 종료 완료")
-        except Exception as e:
-            print(f"MCP 클라이언트 연결 종료 중 오류 발생: {str(e)}")
-        finally:
-            _mcp_client = None
+    await close_mcp_manager()
 
 # MCP 도구 가져오기 함수
 async def get_mcp_tools() -> List:
-    """MCP 도구를 가져오고 상세 정보를 출력합니다."""
-    global _mcp_tools_cache
-    
-    # 캐시된 도구가 있으면 반환
-    if _mcp_tools_cache is not None:
-        return _mcp_tools_cache
-    
+    """공용 MCP 세션 매니저에서 도구를 가져옵니다. 연결은 재사용되며 끊긴 서버만 재연결합니다."""
     try:
-        client = await init_mcp_client()
-        
-        print("MCP 도구 가져오는 중...")
-        tools = client.get_tools()
-        
-        # 도구 정보 출력
-        print(f"총 {len(tools)}개의 MCP 도구를 가져왔습니다")
-        # for i, tool in enumerate(tools, 1):
-        #     try:
-        #         tool_name = getattr(tool, "name", f"Tool-{i}")
-        #         tool_desc = getattr(tool, "description", "설명 없음")
-        #         # print(f"  도구 {i}: {tool_name} - {tool_desc}")
-        #     except Exception as e:
-        #         print(f"  도구 {i}의 정보를 가져오는 중 오류: {str(e)}")
-        
-        # 캐시에 저장
-        _mcp_tools_cache = tools
-        return tools
+        manager = await init_mcp_client()
+        return await manager.get_tools()
     except Exception as e:
         print(f"도구 가져오기 중 오류 발생: {str(e)}")
         # 오류 발생 시 빈 목록 반환
@@ -185,7 +89,8 @@ async def get_llm():
         model_name = os.environ.get("VERTEX_MODEL", "gemini-2.0-flash")
         print(f"LLM 모델 초기화: {model_name}")
         
-        _llm_instance = ChatVertexAI(
+        _llm_instance = get_chat_model(
+            "chat",
             model=model_name,
             temperature=0.1,
             max_output_tokens=8190
@@ -193,6 +98,22 @@ async def get_llm():
     
     return _llm_instance
 
+# 프롬프트 템플릿 로드 함수
+async def load_prompt_template() -> tuple:
+    """프롬프트 파일을 읽어 (템플릿, 해시)를 반환합니다. 파일의 mtime/크기가 바뀔 때만 다시 읽습니다."""
+    global _prompt_template_cache
+
+    stat = os.stat(PROMPT_PATH)
+    stat_key = (stat.st_mtime_ns, stat.st_size)
+    if _prompt_template_cache is not None and _prompt_template_cache[0] == stat_key:
+        return _prompt_template_cache[1], _prompt_template_cache[2]
+
+    async with aiofiles.open(PROMPT_PATH, mode='r', encoding='utf-8') as f:
+        prompt_template = await f.read()
+    digest = hashlib.sha256(prompt_template.encode("utf-8")).hexdigest()
+    _prompt_template_cache = (stat_key, prompt_template, digest)
+    return prompt_template, digest
+
 # 프롬프트 생성 함수s
 async def generate_prompt() -> str:
     """사용자 요청에 따른 프롬프트를 생성합니다."""
@@ -214,10 +135,8 @@ async def generate_prompt() -> str:
         print(f"도구 정보 가져오기 중 오류 발생: {str(e)}")
         tools_text = "도구 정보를 가져오는 중 오류가 발생했습니다. MCP 서버 연결을 확인하세요."
     
-    # 프롬프트 파일에서 템플릿 읽기
-    prompt_path = os.path.join(os.path.dirname(__file__), '../prompts/react_agent_prompt.txt')
-    async with aiofiles.open(prompt_path, mode='r', encoding='utf-8') as f:
-        prompt_template = await f.read()
+    # 프롬프트 파일에서 템플릿 읽기 (변경 시에만 실제 파일 IO)
+    prompt_template, _ = await load_prompt_template()
     
     # 프롬프트 완성
     prompt = prompt_template.format(tools=tools_text)
@@ -226,11 +145,61 @@ async def generate_prompt() -> str:
 
     return f"{prompt}"
 
+# 도구 목록 텍스트 생성 함수
+def format_tools_text(tools: List) -> str:
+    """프롬프트의 {tools} 자리에 들어갈 도구 목록을 만듭니다."""
+    return "\n".join(
+        f"{i+1}. {getattr(tool, 'name', 'Unknown')}: {getattr(tool, 'description', '설명 없음')}"
+        for i, tool in enumerate(tools)
+    )
+
+# 턴별 도구 선택 에이전트 생성 함수
+def create_selecting_agent(llm, tools: List, prompt_template: str):
+    """
+    사용자 메시지마다 관련 도구 top-K만 골라 시스템 프롬프트에 설명하고 모델에 바인딩하는 ReAct 에이전트를 만듭니다.
+    도구 실행 노드에는 전체 도구를 등록해 두므로, 선택되지 않은 도구를 호출해도 실행은 됩니다.
+    """
+    selector = ToolSelector(tools)
+
+    def model(state, runtime):
+        # 스텝마다 한 번만 골라서 시스템 프롬프트와 바인딩 모델에 같은 선택 결과를 씁니다.
+        selected = selector.select_for_messages(state["messages"])
+        system = SystemMessage(content=prompt_template.format(tools=format_tools_text(selected)))
+        prompt = RunnableLambda(lambda messages: [system, *messages], name="Prompt")
+        return prompt | selector.bind(llm, selected)
+
+    return create_react_agent(
+            model,
+            tools,
+            debug=True  # 디버그 모드 활성화
+        )
+
+# 에이전트 캐시 통계
+def get_agent_cache_stats() -> Dict[str, int]:
+    """에이전트 캐시 hit/miss 횟수를 반환합니다."""
+    return dict(_agent_cache_stats)
+
 # 계획 생성 함수
 async def get_chat_agent() -> str:
-    """사용자 요청에 대한 계획을 생성합니다."""
-    global _agent_instance
-    
+    """사용자 요청에 대한 계획을 생성합니다. 도구 구성과 프롬프트가 같으면 캐시된 에이전트를 재사용합니다."""
+    global _agent_instance, _agent_cache_key
+
+    tools = await get_mcp_tools()
+    _, prompt_digest = await load_prompt_template()
+    cache_key = f"{tools_fingerprint(tools)}:{prompt_digest}"
+
+    if _agent_instance is not None and cache_key == _agent_cache_key:
+        _agent_cache_stats["hits"] += 1
+        return _agent_instance
+
+    _agent_cache_stats["misses"] += 1
+    print(f"ReAct 에이전트 (재)생성: 캐시 키 {cache_key[:12]}... (통계: {_agent_cache_stats})")
+
+    if TOOL_SELECTOR_ENABLED and tools:
+        prompt_template, _ = await load_prompt_template()
+        _agent_instance = create_selecting_agent(await get_llm(), tools, prompt_template)
+        _agent_cache_key = cache_key
+        return _agent_instance
 
     # 프롬프트 생성
     prompt = await generate_prompt()
@@ -242,14 +211,12 @@ async def get_chat_agent() -> str:
     # LLM 모델 가져오기
     llm = await get_llm()
 
-    tools = await get_mcp_tools()
-
     _agent_instance = create_react_agent(
             llm, 
             tools, 
             prompt=system_prompt,
             debug=True  # 디버그 모드 활성화
         )
+    _agent_cache_key = cache_key
 
-    
     return _agent_instance
@@ -1,34 +1,18 @@
 import os
 import logging
-from langchain_mcp_adapters.client import MultiServerMCPClient
-from langchain_google_vertexai import ChatVertexAI
+from utils.llm_provider import get_chat_model
+from typing import Optional
 from langgraph.prebuilt import create_react_agent
+from langgraph.prebuilt.chat_agent_executor import AgentState
+from utils.mcp_pool import COOKING_MCP_SERVERS, get_mcp_manager, tools_fingerprint
+from utils.prefetch import format_cooking_context
 
 logger = logging.getLogger("init_cooking_agent")
 logging.basicConfig(level=logging.INFO)
 
-MCP_CONFIG = {
-    "refrigerator": {
-        "url": os.environ.get("REFRIGERATOR_MCP_URL", "http://localhost:8001/sse"),
-        "transport": "sse",
-    },
-    "induction": {
-        "url": os.environ.get("INDUCTION_MCP_URL", "http://localhost:8002/sse"),
-        "transport": "sse",
-    },
-    "microwave": {
-        "url": os.environ.get("MICROWAVE_MCP_URL", "http://localhost:8003/sse"),
-        "transport": "sse",
-    },
-    "mobile": {
-        "url": os.environ.get("MOBILE_MCP_URL", "http://localhost:8004/sse"),
-        "transport": "sse",
-    },
-    "cooking": {
-        "url": os.environ.get("COOKING_MCP_URL", "http://localhost:8005/sse"),
-        "transport": "sse",
-    },
-}
+# 도구 구성이 바뀔 때만 에이전트를 다시 생성 (요청마다 그래프 컴파일 방지)
+_agent_instance = None
+_agent_cache_key = None
 
 INIT_PROMPT = """당신은 스마트홈 쿠킹 도우미입니다. 아래 정보를 반드시 파악해야 합니다:
 - 사용자의 음식/재료 선호도
@@ -37,6 +21,10 @@ INIT_PROMPT = """당신은 스마트홈 쿠킹 도우미입니다. 아래 정보
 필요한 정보를 tools를 통해 계속 확인하고, 레시피를 사용자 맞춤으로 리플랜하세요.
 """
 
+class InitAgentState(AgentState):
+    # 프리패치한 냉장고/주방기기/선호도 정보 (없으면 에이전트가 도구로 직접 조회)
+    cooking_context: Optional[dict]
+
 def build_tools_info_text(tools):
     logger.info(f"MCP 도구 {len(tools)}개 정보 변환 시작")
     lines = []
@@ -61,20 +49,26 @@ def make_dynamic_prompt(tools):
     SYSTEM_PROMPT = f"""{INIT_PROMPT}\n\n아래는 현재 연결된 MCP 도구 목록입니다:\n\n{tools_info}\n\n사용자의 요청에 따라 적절한 도구를 선택해 작업을 수행하세요.\n"""
     logger.info("동적 system 프롬프트 생성 완료")
     def prompt(state):
+        context_block = format_cooking_context(state.get("cooking_context"))
+        content = f"{SYSTEM_PROMPT}\n{context_block}\n" if context_block else SYSTEM_PROMPT
         return [
-            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "system", "content": content},
             *state["messages"]
         ]
     return prompt
 
 async def get_init_cooking_agent():
-    logger.info("MCP 클라이언트 연결 및 도구 정보 수집 시작")
-    async with MultiServerMCPClient(MCP_CONFIG) as client:
-        tools = client.get_tools()
-        logger.info(f"MCP 도구 {len(tools)}개 수집 완료")
-        llm = ChatVertexAI(model="gemini-2.0-flash", temperature=0.1, max_output_tokens=2048)
-        logger.info("LLM 인스턴스 생성 완료")
-        prompt = make_dynamic_prompt(tools)
-        agent = create_react_agent(model=llm, tools=tools, prompt=prompt)
-        logger.info("ReAct 에이전트 생성 완료")
-        return agent
+    global _agent_instance, _agent_cache_key
+    tools = await get_mcp_manager().get_tools(COOKING_MCP_SERVERS)
+    cache_key = tools_fingerprint(tools)
+    if _agent_instance is not None and cache_key == _agent_cache_key:
+        return _agent_instance
+
+    logger.info(f"MCP 도구 {len(tools)}개로 에이전트 생성 시작")
+    llm = get_chat_model("cooking.init", model="gemini-2.0-flash", temperature=0.1, max_output_tokens=2048)
+    logger.info("LLM 인스턴스 생성 완료")
+    prompt = make_dynamic_prompt(tools)
+    _agent_instance = create_react_agent(model=llm, tools=tools, prompt=prompt, state_schema=InitAgentState)
+    _agent_cache_key = cache_key
+    logger.info("ReAct 에이전트 생성 완료")
+    return _agent_instance
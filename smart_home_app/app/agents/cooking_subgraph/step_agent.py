@@ -1,34 +1,15 @@
 import os
 import logging
-from langchain_mcp_adapters.client import MultiServerMCPClient
-from langchain_google_vertexai import ChatVertexAI
+from utils.llm_provider import get_chat_model
 from langgraph.prebuilt import create_react_agent
+from utils.mcp_pool import COOKING_MCP_SERVERS, get_mcp_manager, tools_fingerprint
 
 logger = logging.getLogger("step_cooking_agent")
 logging.basicConfig(level=logging.INFO)
 
-MCP_CONFIG = {
-    "refrigerator": {
-        "url": os.environ.get("REFRIGERATOR_MCP_URL", "http://localhost:8001/sse"),
-        "transport": "sse",
-    },
-    "induction": {
-        "url": os.environ.get("INDUCTION_MCP_URL", "http://localhost:8002/sse"),
-        "transport": "sse",
-    },
-    "microwave": {
-        "url": os.environ.get("MICROWAVE_MCP_URL", "http://localhost:8003/sse"),
-        "transport": "sse",
-    },
-    "mobile": {
-        "url": os.environ.get("MOBILE_MCP_URL", "http://localhost:8004/sse"),
-        "transport": "sse",
-    },
-    "cooking": {
-        "url": os.environ.get("COOKING_MCP_URL", "http://localhost:8005/sse"),
-        "transport": "sse",
-    },
-}
+# 도구 구성이 바뀔 때만 에이전트를 다시 생성 (요청마다 그래프 컴파일 방지)
+_agent_instance = None
+_agent_cache_key = None
 
 STEP_PROMPT = """당신은 스마트홈 쿠킹 단계 실행 도우미입니다. 현재 레시피의 특정 단계를 사용자와 상호작용하며 진행하세요.
 - 단계별 필요한 작업을 파악하고, 필요한 주방기기 사용을 안내하세요.
@@ -67,13 +48,17 @@ def make_dynamic_prompt(tools):
     return prompt
 
 async def get_step_cooking_agent():
-    logger.info("MCP 클라이언트 연결 및 도구 정보 수집 시작")
-    async with MultiServerMCPClient(MCP_CONFIG) as client:
-        tools = client.get_tools()
-        logger.info(f"MCP 도구 {len(tools)}개 수집 완료")
-        llm = ChatVertexAI(model="gemini-2.0-flash", temperature=0.1, max_output_tokens=2048)
-        logger.info("LLM 인스턴스 생성 완료")
-        prompt = make_dynamic_prompt(tools)
-        agent = create_react_agent(model=llm, tools=tools, prompt=prompt)
-        logger.info("ReAct 에이전트 생성 완료")
-        return agent
+    global _agent_instance, _agent_cache_key
+    tools = await get_mcp_manager().get_tools(COOKING_MCP_SERVERS)
+    cache_key = tools_fingerprint(tools)
+    if _agent_instance is not None and cache_key == _agent_cache_key:
+        return _agent_instance
+
+    logger.info(f"MCP 도구 {len(tools)}개로 에이전트 생성 시작")
+    llm = get_chat_model("cooking.step", model="gemini-2.0-flash", temperature=0.1, max_output_tokens=2048)
+    logger.info("LLM 인스턴스 생성 완료")
+    prompt = make_dynamic_prompt(tools)
+    _agent_instance = create_react_agent(model=llm, tools=tools, prompt=prompt)
+    _agent_cache_key = cache_key
+    logger.info("ReAct 에이전트 생성 완료")
+    return _agent_instance
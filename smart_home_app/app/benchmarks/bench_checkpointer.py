@@ -0,0 +1,127 @@
+"""
+체크포인터 쓰기 지연 비교: BoundedMemorySaver vs SQLiteCheckpointSaver(WAL)
+
+동시 스레드(대화) 1/10/100개가 각각 --steps 슈퍼스텝을 실행한다고 보고,
+슈퍼스텝마다 태스크 쓰기 2건(aput_writes)과 체크포인트 1건(aput)을 저장합니다. 메시지는 스텝마다 2개씩 늘어납니다.
+- memory          : BoundedMemorySaver (현재 기본값, 재시작 시 유실)
+- sqlite          : SQLiteCheckpointSaver (쓰기를 슈퍼스텝 끝에 묶고, 동시 세션의 쓰기를 한 트랜잭션으로 커밋)
+- sqlite-unbatched: 같은 저장소에서 put_writes도 바로 커밋
+- langgraph-sqlite: langgraph AsyncSqliteSaver (설치되어 있을 때만, 참고용)
+
+출력: 슈퍼스텝당 저장 지연 p50/p95(ms), 초당 체크포인트 수, 커밋당 평균 작업 수
+실행: python benchmarks/bench_checkpointer.py [--threads 1,10,100] [--steps 20]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.base.id import uuid6
+
+from utils.checkpointer import BoundedMemorySaver
+from utils.sqlite_checkpointer import SQLiteCheckpointSaver
+
+logging.disable(logging.CRITICAL)
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct), len(ordered) - 1)]
+
+
+async def run_thread(saver, thread_id: str, steps: int, latencies: list) -> None:
+    config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    messages = []
+    versions = {}
+    for step in range(steps):
+        messages = messages + [
+            HumanMessage(content=f"{step}번째 질문: 김치찌개 다음 단계 알려줘"),
+            AIMessage(content=f"{step}번째 답변: 냄비에 물 500ml를 붓고 중불에서 10분간 끓여주세요. " * 3),
+        ]
+        versions = {channel: saver.get_next_version(versions.get(channel), None) for channel in ("messages", "system_mode")}
+        checkpoint = {
+            **empty_checkpoint(),
+            "id": str(uuid6(clock_seq=step)),
+            "channel_values": {"messages": messages, "system_mode": "cooking"},
+            "channel_versions": versions,
+        }
+        metadata = {"source": "loop", "step": step, "parents": {}}
+
+        start = time.perf_counter()
+        if "checkpoint_id" in config["configurable"]:
+            for task in range(2):
+                await saver.aput_writes(config, [("messages", messages[-2:]), ("system_mode", "cooking")],
+                                        f"task-{step}-{task}")
+        config = await saver.aput(config, checkpoint, metadata, versions)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def run_case(saver, threads: int, steps: int) -> dict:
+    latencies: list = []
+    start = time.perf_counter()
+    await asyncio.gather(*(run_thread(saver, f"bench-{threads}-{i}", steps, latencies) for i in range(threads)))
+    elapsed = time.perf_counter() - start
+    result = {
+        "p50_ms": round(percentile(latencies, 0.5), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "mean_ms": round(statistics.mean(latencies), 3),
+        "checkpoints_per_s": round(len(latencies) / elapsed),
+    }
+    stats = saver.stats() if hasattr(saver, "stats") else {}
+    if "avg_batch" in stats:
+        result["ops_per_commit"] = stats["avg_batch"]
+    return result
+
+
+def make_savers(workdir: str):
+    yield "memory", lambda: BoundedMemorySaver(max_threads=100_000, ttl_seconds=None)
+    yield "sqlite", lambda: SQLiteCheckpointSaver(os.path.join(workdir, f"batched-{uuid6()}.sqlite"))
+    yield "sqlite-unbatched", lambda: SQLiteCheckpointSaver(
+        os.path.join(workdir, f"unbatched-{uuid6()}.sqlite"), batch_writes=False)
+
+
+async def run_langgraph_sqlite(workdir: str, threads: int, steps: int) -> dict:
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+    async with AsyncSqliteSaver.from_conn_string(os.path.join(workdir, f"langgraph-{uuid6()}.sqlite")) as saver:
+        return await run_case(saver, threads, steps)
+
+
+async def main(thread_counts: list, steps: int) -> None:
+    workdir = tempfile.mkdtemp(prefix="bench-checkpointer-")
+    try:
+        print(f"steps per thread: {steps} (2 task writes + 1 checkpoint per step)")
+        print(f"{'threads':>7} | {'saver':16} | {'p50':>8} | {'p95':>8} | {'ckpt/s':>7} | {'ops/commit':>10}")
+        for threads in thread_counts:
+            results = {}
+            for name, factory in make_savers(workdir):
+                saver = factory()
+                results[name] = await run_case(saver, threads, steps)
+                if hasattr(saver, "close"):
+                    saver.close()
+            try:
+                results["langgraph-sqlite"] = await run_langgraph_sqlite(workdir, threads, steps)
+            except ImportError:
+                pass
+            for name, result in results.items():
+                print(f"{threads:>7} | {name:16} | {result['p50_ms']:>6.2f}ms | {result['p95_ms']:>6.2f}ms | "
+                      f"{result['checkpoints_per_s']:>7} | {result.get('ops_per_commit', '-'):>10}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", default="1,10,100")
+    parser.add_argument("--steps", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main([int(n) for n in args.threads.split(",")], args.steps))
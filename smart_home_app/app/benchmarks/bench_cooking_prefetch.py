@@ -0,0 +1,137 @@
+"""
+쿠킹 모드 프리패치(utils/prefetch.py) 효과 측정: 쿠킹 세션당 init 에이전트 LLM 왕복 수와 지연
+
+- off : 프리패치 없이 init 에이전트가 냉장고 식재료 -> 주방기기 -> 선호도를 한 번에 하나씩 조회한 뒤 계획
+- on  : 라우터가 쿠킹 의도를 감지하면 세 정보를 동시에 조회해 프롬프트에 넣고, init 에이전트는 바로 계획
+
+기본값(--provider replay)은 위 동작을 재현하는 replay 스크립트를 사용합니다.
+--provider vertex 로 실행하면 실제 모델이 만드는 왕복 수를 그대로 셉니다. (MCP 도구는 항상 스텁)
+
+실행: python benchmarks/bench_cooking_prefetch.py [--sessions 20] [--llm-latency-ms 300] [--mcp-latency-ms 50]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import HumanMessage
+
+import agents.chat_agent as chat_agent
+import agents.cooking_subgraph.init_agent as init_agent
+import agents.cooking_subgraph.step_agent as step_agent
+import utils.llm_provider as llm_provider
+import utils.prefetch as prefetch
+from benchmarks.bench_node_overhead import StubMCPManager
+from graph import registry
+from utils.llm_provider import ReplayScript, set_llm_provider
+
+PLAN = {"content": "냉장고 재료와 주방기기, 선호도를 반영해 김치찌개로 진행할게요. 인덕션을 사용합니다."}
+STEP = {"content": "1단계: 냄비에 김치와 돼지고기를 넣고 중불로 볶아주세요."}
+
+# 프리패치가 없을 때 init 에이전트가 정보를 하나씩 조회하는 흐름
+SCRIPT_OFF = {
+    "cooking.init:*:0": {"content": "", "tool_calls": [{"name": "get_food_items", "args": {}}]},
+    "cooking.init:*:1": {"content": "", "tool_calls": [{"name": "get_appliances", "args": {}}]},
+    "cooking.init:*:2": {"content": "", "tool_calls": [{"name": "get_preferences", "args": {}}]},
+    "cooking.init:*:3": PLAN,
+    "cooking.step:*:*": STEP,
+}
+# 프롬프트에 정보가 들어 있으므로 첫 호출에서 바로 계획
+SCRIPT_ON = {
+    "cooking.init:*:0": PLAN,
+    "cooking.step:*:*": STEP,
+}
+
+
+class SlowStubMCPManager(StubMCPManager):
+    """도구 호출마다 고정 지연을 넣는 스텁 MCP 매니저"""
+
+    def __init__(self, latency_ms: float) -> None:
+        super().__init__()
+        self.latency = latency_ms / 1000
+        for tool in self.tools:
+            original = tool.coroutine
+
+            async def _slow(_original=original, **kwargs):
+                await asyncio.sleep(self.latency)
+                return await _original(**kwargs)
+
+            tool.coroutine = _slow
+
+    async def call_tool(self, server_name: str, tool_name: str, args: dict):
+        await asyncio.sleep(self.latency)
+        return await super().call_tool(server_name, tool_name, args)
+
+
+def install(provider: str, enabled: bool, llm_latency_ms: float, mcp_latency_ms: float) -> None:
+    llm_provider.LLM_REPLAY_LATENCY_MS = llm_latency_ms
+    if provider == "replay":
+        set_llm_provider("replay", ReplayScript(positions=SCRIPT_ON if enabled else SCRIPT_OFF))
+    else:
+        set_llm_provider(provider)
+    manager = SlowStubMCPManager(mcp_latency_ms)
+    for module in (chat_agent, init_agent, step_agent, prefetch):
+        module.get_mcp_manager = lambda: manager
+    prefetch.COOKING_PREFETCH_ENABLED = enabled
+    # 모델/에이전트를 새 설정으로 다시 만들도록 캐시 초기화
+    init_agent._agent_instance = None
+    step_agent._agent_instance = None
+    for key in prefetch._stats:
+        prefetch._stats[key] = 0
+
+
+async def run_mode(provider: str, enabled: bool, sessions: int, llm_latency_ms: float, mcp_latency_ms: float) -> dict:
+    install(provider, enabled, llm_latency_ms, mcp_latency_ms)
+    graph = registry.get_graph("main")
+    latencies = []
+    for i in range(sessions):
+        state = {"messages": [HumanMessage(content="김치찌개 요리 도와줘")], "system_mode": "normal",
+                 "recipe": None, "current_step": None}
+        config = {"configurable": {"thread_id": f"bench-prefetch-{enabled}-{i}"}}
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            await graph.ainvoke(state, config=config)
+        latencies.append((time.perf_counter() - start) * 1000)
+    stats = prefetch.get_prefetch_stats()
+    return {
+        "prefetch": enabled,
+        "sessions": sessions,
+        "init_llm_calls_per_session": stats["avg_init_llm_calls"],
+        "init_tool_calls_per_session": round(stats["init_tool_calls"] / sessions, 2),
+        "redundant_tool_calls": stats["redundant_tool_calls"],
+        "prefetch_ms_mean": round(stats["prefetch_ms"] / stats["prefetches"], 1) if stats["prefetches"] else None,
+        "session_ms_mean": round(statistics.mean(latencies), 1),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    import logging
+    logging.disable(logging.CRITICAL)
+    off = await run_mode(args.provider, False, args.sessions, args.llm_latency_ms, args.mcp_latency_ms)
+    on = await run_mode(args.provider, True, args.sessions, args.llm_latency_ms, args.mcp_latency_ms)
+    report = {
+        "provider": args.provider,
+        "llm_latency_ms": args.llm_latency_ms,
+        "mcp_latency_ms": args.mcp_latency_ms,
+        "off": off,
+        "on": on,
+        "llm_round_trips_saved_per_session": round(off["init_llm_calls_per_session"] - on["init_llm_calls_per_session"], 2),
+        "session_ms_saved": round(off["session_ms_mean"] - on["session_ms_mean"], 1),
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--provider", default="replay", choices=["replay", "vertex"])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0, help="replay 응답 지연(ms)")
+    parser.add_argument("--mcp-latency-ms", type=float, default=50.0, help="스텁 MCP 도구 지연(ms)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,118 @@
+"""
+요청당 그래프 오버헤드 벤치마크 (before / after)
+
+LLM과 MCP를 즉시 응답하는 스텁으로 바꿔서, 순수하게 그래프/에이전트 구성 비용만 측정합니다.
+- before : 요청마다 쿠킹 서브그래프 compile + ReAct 에이전트 생성 (기존 방식)
+- after  : 그래프 레지스트리 + 에이전트 캐시 사용
+
+실행: python benchmarks/bench_graph_overhead.py [--requests 200]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import HumanMessage
+
+import agents.chat_agent as chat_agent
+import agents.cooking_subgraph.init_agent as init_agent
+import agents.cooking_subgraph.step_agent as step_agent
+import graph.supervisor as supervisor
+from graph import registry
+from graph.subgraphs import get_cooking_subgraph
+from utils.llm_provider import ReplayScript, set_llm_provider
+
+logging.disable(logging.CRITICAL)
+
+
+class StubMCPManager:
+    async def get_tools(self, server_names=None):
+        return []
+
+
+def install_stubs() -> None:
+    manager = StubMCPManager()
+    # 도구 호출 없이 즉시 답하는 replay LLM
+    set_llm_provider("replay", ReplayScript(default={"content": "ok"}))
+
+    chat_agent.get_mcp_manager = lambda: manager
+    chat_agent.print = lambda *args, **kwargs: None
+    for module in (init_agent, step_agent):
+        module.get_mcp_manager = lambda: manager
+
+
+def use_legacy_path() -> None:
+    """요청마다 서브그래프를 compile하고 에이전트를 새로 만드는 기존 동작을 재현합니다."""
+    supervisor.get_graph = lambda name: get_cooking_subgraph().compile()
+    for module in (chat_agent, init_agent, step_agent):
+        module._agent_instance = None
+
+    for module, fn_name in ((init_agent, "get_init_cooking_agent"), (step_agent, "get_step_cooking_agent")):
+        original = getattr(module, fn_name)
+
+        async def uncached(module=module, original=original):
+            module._agent_instance = None
+            return await original()
+
+        # subgraphs 모듈이 import한 이름을 교체
+        import graph.subgraphs as subgraphs
+        setattr(subgraphs, fn_name, uncached)
+
+    original_chat = chat_agent.get_chat_agent
+
+    async def uncached_chat():
+        chat_agent._agent_instance = None
+        return await original_chat()
+
+    supervisor.get_chat_agent = uncached_chat
+
+
+async def measure(graph, message: str, requests: int) -> list:
+    latencies = []
+    for i in range(requests):
+        state = {"messages": [HumanMessage(content=message)], "system_mode": "normal", "recipe": None, "current_step": None}
+        start = time.perf_counter()
+        # chat 에이전트의 debug 출력은 버림
+        with contextlib.redirect_stdout(io.StringIO()):
+            await graph.ainvoke(state, config={"configurable": {"thread_id": f"bench-{message}-{i}"}})
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def summary(latencies: list) -> str:
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    return f"mean={statistics.mean(ordered):7.2f}ms  p50={statistics.median(ordered):7.2f}ms  p95={p95:7.2f}ms"
+
+
+async def main(requests: int) -> None:
+    install_stubs()
+    graph = registry.get_graph("main")
+    cases = {"chat": "오늘 날씨 어때?", "cooking": "김치찌개 요리 도와줘"}
+
+    # 워밍업 후 after 측정 (레지스트리 + 캐시)
+    with contextlib.redirect_stdout(io.StringIO()):
+        await registry.warm_up()
+    after = {name: await measure(graph, msg, requests) for name, msg in cases.items()}
+
+    use_legacy_path()
+    before = {name: await measure(graph, msg, requests) for name, msg in cases.items()}
+
+    print(f"requests per case: {requests} (stub LLM, stub MCP)")
+    for name in cases:
+        print(f"[{name:7}] before: {summary(before[name])}")
+        print(f"[{name:7}] after : {summary(after[name])}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,116 @@
+"""
+로그 파이프라인 처리량 비교: 세션마다 loguru sink 추가(이전 get_logger) vs 공용 sink 하나(utils/logging.py)
+
+세션 N개가 번갈아 가며 레코드를 남긴다고 보고 다음을 측정합니다.
+- legacy: 세션마다 logger.add(파일, enqueue=True, diagnose=True). 모든 레코드가 모든 세션 파일로 복제됩니다.
+- shared: setup_logging() 한 번 + logger.bind(session_id). 큐 스레드 하나가 세션 파일로 나눠 씁니다.
+출력: 호출 측 레코드당 시간(us), 큐를 비울 때까지의 처리량(records/s), sink/스레드 수, 실제로 쓴 줄 수
+--exception-every N 이면 N번째마다 예외 로그(logger.exception)를 남겨 diagnose 비용도 포함합니다.
+
+실행: python benchmarks/bench_logging.py [--sessions 10,100] [--records 100]
+"""
+import argparse
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loguru import logger
+
+import utils.logging as app_logging
+
+
+def emit(log_for, sessions: int, records: int, exception_every: int) -> float:
+    """세션을 번갈아 가며 레코드를 남기고 호출 측 소요 시간(초)을 돌려줍니다."""
+    start = time.perf_counter()
+    for i in range(records):
+        for s in range(sessions):
+            log = log_for(s)
+            if exception_every and i % exception_every == 0:
+                try:
+                    {"step": i}["missing"]
+                except KeyError:
+                    log.exception(f"레시피 단계 조회 실패 step={i}")
+            else:
+                log.info(f"단계 {i} 실행: 냄비에 물 500ml를 붓고 중불에서 끓입니다. tool=oven_control latency_ms=12.3")
+    return time.perf_counter() - start
+
+
+def count_lines(directory: str) -> int:
+    total = 0
+    for path in glob.glob(os.path.join(directory, "*.log")):
+        with open(path, "rb") as f:
+            total += sum(1 for _ in f)
+    return total
+
+
+def run_legacy(directory: str, sessions: int, records: int, exception_every: int) -> dict:
+    threads_before = threading.active_count()
+    sink_ids = [
+        logger.add(os.path.join(directory, f"session_{s}.log"), rotation="10 MB", retention="10 days",
+                   enqueue=True, backtrace=True, diagnose=True)
+        for s in range(sessions)
+    ]
+    threads = threading.active_count() - threads_before
+    emit_s = emit(lambda s: logger, sessions, records, exception_every)
+    # remove는 sink의 큐가 빌 때까지 기다림
+    for sink_id in sink_ids:
+        logger.remove(sink_id)
+    return {"sinks": len(sink_ids), "threads": threads, "emit_s": emit_s}
+
+
+def run_shared(directory: str, sessions: int, records: int, exception_every: int) -> dict:
+    threads_before = threading.active_count()
+    app_logging.setup_logging(directory)
+    threads = threading.active_count() - threads_before
+    loggers = [app_logging.get_logger(f"{s}") for s in range(sessions)]
+    emit_s = emit(lambda s: loggers[s], sessions, records, exception_every)
+    stats = app_logging.get_logging_stats()
+    app_logging.shutdown_logging()
+    return {"sinks": 1, "threads": threads, "emit_s": emit_s, "router": stats}
+
+
+def main(session_counts: list, records: int, exception_every: int, modes: list) -> None:
+    # 콘솔 sink는 측정에서 제외
+    logger.remove()
+    workdir = tempfile.mkdtemp(prefix="bench-logging-")
+    print(f"records per session: {records}, exception every: {exception_every or '-'}, "
+          f"shared diagnose={app_logging.LOG_DIAGNOSE} (APP_ENV={app_logging.APP_ENV})")
+    print(f"{'sessions':>8} | {'mode':6} | {'sinks':>5} | {'threads':>7} | {'emit us/rec':>11} | "
+          f"{'drained rec/s':>13} | {'lines written':>13} | open files")
+    try:
+        for sessions in session_counts:
+            for mode in modes:
+                directory = os.path.join(workdir, f"{mode}-{sessions}")
+                os.makedirs(directory)
+                runner = run_legacy if mode == "legacy" else run_shared
+                start = time.perf_counter()
+                result = runner(directory, sessions, records, exception_every)
+                # 두 경우 모두 sink를 제거하면서 큐가 빌 때까지 기다리므로 total_s는 파일에 다 쓴 시점까지
+                total_s = time.perf_counter() - start
+                emitted = sessions * records
+                if mode == "shared":
+                    router = result["router"]
+                    open_files = f"<= {router['max_open_files']} (opened {router['opened']}, evicted {router['evicted']})"
+                else:
+                    open_files = sessions
+                print(f"{sessions:>8} | {mode:6} | {result['sinks']:>5} | {result['threads']:>7} | "
+                      f"{result['emit_s'] / emitted * 1e6:>11.1f} | {emitted / total_s:>13.0f} | "
+                      f"{count_lines(directory):>13} | {open_files}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", default="10,100", help="세션 수 목록 (legacy는 세션 수만큼 sink/스레드를 만듦)")
+    parser.add_argument("--records", type=int, default=100, help="세션당 레코드 수")
+    parser.add_argument("--exception-every", type=int, default=0)
+    parser.add_argument("--modes", default="legacy,shared")
+    args = parser.parse_args()
+    main([int(n) for n in args.sessions.split(",")], args.records, args.exception_every, args.modes.split(","))
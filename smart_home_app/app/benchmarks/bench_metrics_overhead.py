@@ -0,0 +1,101 @@
+"""
+메트릭 수집(utils/metrics.py) 오버헤드 측정 (replay LLM + 스텁 MCP 도구, 완전 오프라인)
+
+같은 요청을 세 조건으로 번갈아 실행해 요청당 시간(중앙값)을 비교하고,
+수집된 노드 히스토그램과 /metrics 렌더링 시간을 출력합니다.
+- none : 콜백 없음
+- base : 서버가 원래 붙이는 콜백(tool_span_tracker)만
+- on   : base + MetricsCallbackHandler  (overhead = on - base)
+콜백이 하나라도 있으면 LangChain이 모든 Runnable 이벤트를 발생시키므로 none -> base 비용은 메트릭과 무관합니다.
+--llm-latency-ms 0 이면 프레임워크만 도는 최악 조건이고, 실제 LLM 지연(수백 ms)을 넣으면 운영 조건에 가깝습니다.
+METRICS_SAMPLE_RATE=r 이면 r 비율의 요청에만 핸들러를 붙이므로 요청당 평균 비용은 약 overhead x r 입니다.
+(샘플 여부 결정은 random() 한 번이라 따로 재지 않고 --sample-rate 값으로 계산해 보여줍니다)
+
+실행: python benchmarks/bench_metrics_overhead.py [--requests 200] [--llm-latency-ms 0] [--sample-rate 0.1]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import statistics
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import HumanMessage
+
+from benchmarks.bench_node_overhead import install_offline_stubs
+from graph import registry
+from utils.metrics import NODE_DURATION, REGISTRY, metrics_handler
+from utils.tool_spans import tool_span_tracker
+
+CASES = {"chat": "오늘 저녁 뭐 먹을까?", "cooking": "김치찌개 요리 도와줘"}
+
+
+async def run_once(graph, message: str, thread_id: str, callbacks: list) -> float:
+    state = {"messages": [HumanMessage(content=message)], "system_mode": "normal", "recipe": None, "current_step": None}
+    config = {"callbacks": callbacks, "configurable": {"thread_id": thread_id}}
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        await graph.ainvoke(state, config=config)
+    return (time.perf_counter() - start) * 1000
+
+
+CONDITIONS = {
+    "none": [],
+    "base": [tool_span_tracker],
+    "on": [tool_span_tracker, metrics_handler],
+}
+
+
+async def measure(graph, requests: int) -> dict:
+    results = {}
+    for name, message in CASES.items():
+        timings = {condition: [] for condition in CONDITIONS}
+        # 순서 효과(GC, 캐시 워밍)를 줄이기 위해 조건을 번갈아 실행
+        for i in range(requests):
+            for condition, callbacks in CONDITIONS.items():
+                timings[condition].append(
+                    await run_once(graph, message, f"bench-metrics-{condition}-{name}-{i}", callbacks))
+        medians = {condition: statistics.median(values) for condition, values in timings.items()}
+        overhead = medians["on"] - medians["base"]
+        results[name] = {
+            **{f"{condition}_ms": round(value, 3) for condition, value in medians.items()},
+            "overhead_ms": round(overhead, 3),
+            "overhead_pct": round(overhead / medians["base"] * 100, 2),
+        }
+    return results
+
+
+async def main(requests: int, llm_latency_ms: float, sample_rate: float) -> None:
+    install_offline_stubs(llm_latency_ms)
+    graph = registry.get_graph("main")
+    with contextlib.redirect_stdout(io.StringIO()):
+        await registry.warm_up()
+    # 첫 실행 비용(모델/에이전트 생성)을 측정에서 제외
+    for name, message in CASES.items():
+        await run_once(graph, message, f"bench-metrics-warmup-{name}", [metrics_handler])
+
+    print(f"requests per case: {requests} (median, replay LLM latency {llm_latency_ms}ms, stub MCP)")
+    print(f"{'case':8} | {'none':>9} | {'base':>9} | {'on':>9} | {'overhead':>9} | {'%':>6} | {'rate ' + str(sample_rate):>9}")
+    for name, result in (await measure(graph, requests)).items():
+        print(f"{name:8} | {result['none_ms']:>7.2f}ms | {result['base_ms']:>7.2f}ms | {result['on_ms']:>7.2f}ms | "
+              f"{result['overhead_ms']:>7.3f}ms | {result['overhead_pct']:>5.2f}% | {result['overhead_pct'] * sample_rate:>8.2f}%")
+
+    start = time.perf_counter()
+    text = REGISTRY.render()
+    render_ms = (time.perf_counter() - start) * 1000
+    nodes = sorted({labels[0] for labels in NODE_DURATION._values})
+    print(f"\n/metrics render: {render_ms:.2f}ms, {len(text.splitlines())} lines")
+    print("node histograms: " + ", ".join(f"{node}({NODE_DURATION.count(node):.0f})" for node in nodes))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="replay 응답 지연(ms)")
+    parser.add_argument("--sample-rate", type=float, default=0.1, help="METRICS_SAMPLE_RATE 예상 비용 계산용")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.llm_latency_ms, args.sample_rate))
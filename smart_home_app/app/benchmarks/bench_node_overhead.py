@@ -0,0 +1,173 @@
+"""
+노드별 오버헤드 벤치마크 (replay LLM + 스텁 MCP 도구, 완전 오프라인)
+
+benchmarks/replay_script.json 의 응답(도구 호출 포함)으로 슈퍼바이저 그래프를 실행하고,
+노드 경로(예: cooking/init/agent)별 실행 시간을 집계합니다.
+- total : 노드 전체 시간
+- self  : 하위 노드 시간을 뺀 시간 (해당 노드 자체의 오케스트레이션 비용)
+LLM 지연은 --llm-latency-ms 로 넣을 수 있으며, 기본값 0이면 측정값이 곧 프레임워크 오버헤드입니다.
+
+실행: python benchmarks/bench_node_overhead.py [--requests 100] [--llm-latency-ms 0]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import re
+import statistics
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import HumanMessage
+from langchain_core.tools import StructuredTool
+
+import agents.chat_agent as chat_agent
+import agents.cooking_subgraph.init_agent as init_agent
+import agents.cooking_subgraph.step_agent as step_agent
+import utils.prefetch as prefetch
+import utils.llm_provider as llm_provider
+from graph import registry
+from utils.llm_provider import ReplayScript, set_llm_provider
+
+logging.disable(logging.CRITICAL)
+
+SCRIPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "replay_script.json")
+
+# 스텁 MCP 도구가 돌려줄 고정 응답
+STUB_RESULTS = {
+    "get_food_items": {"items": ["김치", "돼지고기", "두부", "대파"]},
+    "get_preferences": {"likes": ["한식", "매운 음식"], "dislikes": ["오이"]},
+    "get_appliances": {"appliances": ["induction", "microwave"]},
+    "get_recipe": {"name": "김치찌개", "steps": ["김치와 돼지고기 볶기", "물 붓고 끓이기", "두부와 대파 넣기"]},
+}
+
+
+def make_stub_tool(name: str, result: dict) -> StructuredTool:
+    async def _call(**kwargs: Any) -> str:
+        return json.dumps(result, ensure_ascii=False)
+
+    # MCP 도구와 같이 JSON 스키마(dict)를 args_schema로 사용
+    schema = {"type": "object", "properties": {"food_name": {"type": "string"}} if name == "get_recipe" else {}}
+    return StructuredTool(name=name, description=f"{name} (stub)", args_schema=schema, coroutine=_call)
+
+
+class StubMCPManager:
+    def __init__(self) -> None:
+        self.tools = [make_stub_tool(name, result) for name, result in STUB_RESULTS.items()]
+
+    async def get_tools(self, server_names=None):
+        return self.tools
+
+    async def call_tool(self, server_name: str, tool_name: str, args: dict):
+        return json.dumps(STUB_RESULTS.get(tool_name, {}), ensure_ascii=False)
+
+
+class NodeTimer(BaseCallbackHandler):
+    """LangGraph 노드 실행 시간을 체크포인트 네임스페이스 경로별로 모읍니다."""
+
+    run_inline = True
+
+    def __init__(self) -> None:
+        self._parents: Dict[UUID, Optional[UUID]] = {}
+        # 노드 run_id -> [경로, 시작 시각, 하위 노드 시간 합]
+        self._nodes: Dict[UUID, list] = {}
+        self.total = defaultdict(list)
+        self.self_time = defaultdict(list)
+
+    @staticmethod
+    def _path(metadata: dict) -> str:
+        # "cooking:<id>|init:<id>" -> "cooking/init"
+        ns = metadata.get("langgraph_checkpoint_ns", "")
+        return "/".join(re.sub(r":.*$", "", part) for part in ns.split("|") if part)
+
+    def _node_ancestor(self, run_id: Optional[UUID]) -> Optional[UUID]:
+        while run_id is not None and run_id not in self._nodes:
+            run_id = self._parents.get(run_id)
+        return run_id
+
+    def on_chain_start(self, serialized, inputs, *, run_id: UUID, parent_run_id: Optional[UUID] = None,
+                       metadata: Optional[dict] = None, **kwargs: Any) -> None:
+        self._parents[run_id] = parent_run_id
+        metadata = metadata or {}
+        if metadata.get("langgraph_node") and kwargs.get("name") == metadata.get("langgraph_node"):
+            self._nodes[run_id] = [self._path(metadata), time.perf_counter(), 0.0]
+
+    def on_chain_end(self, outputs, *, run_id: UUID, **kwargs: Any) -> None:
+        node = self._nodes.pop(run_id, None)
+        if node is not None:
+            path, started, children = node
+            elapsed = (time.perf_counter() - started) * 1000
+            self.total[path].append(elapsed)
+            self.self_time[path].append(elapsed - children)
+            ancestor = self._node_ancestor(self._parents.get(run_id))
+            if ancestor is not None:
+                self._nodes[ancestor][2] += elapsed
+        self._parents.pop(run_id, None)
+
+    def on_chain_error(self, error, *, run_id: UUID, **kwargs: Any) -> None:
+        self.on_chain_end(None, run_id=run_id)
+
+
+def install_offline_stubs(llm_latency_ms: float) -> None:
+    script = ReplayScript.load(SCRIPT_PATH)
+    llm_provider.LLM_REPLAY_LATENCY_MS = llm_latency_ms
+    set_llm_provider("replay", script)
+    manager = StubMCPManager()
+    chat_agent.get_mcp_manager = lambda: manager
+    chat_agent.print = lambda *args, **kwargs: None
+    for module in (init_agent, step_agent, prefetch):
+        module.get_mcp_manager = lambda: manager
+
+
+def p95(values: list) -> float:
+    ordered = sorted(values)
+    return ordered[max(int(len(ordered) * 0.95) - 1, 0)]
+
+
+async def run_case(graph, message: str, requests: int, timer: NodeTimer) -> list:
+    latencies = []
+    for i in range(requests):
+        state = {"messages": [HumanMessage(content=message)], "system_mode": "normal", "recipe": None, "current_step": None}
+        config = {"callbacks": [timer], "configurable": {"thread_id": f"bench-node-{message}-{i}"}}
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            await graph.ainvoke(state, config=config)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+async def main(requests: int, llm_latency_ms: float) -> None:
+    install_offline_stubs(llm_latency_ms)
+    graph = registry.get_graph("main")
+    with contextlib.redirect_stdout(io.StringIO()):
+        await registry.warm_up()
+
+    cases = {"chat": "오늘 저녁 뭐 먹을까?", "cooking": "김치찌개 요리 도와줘"}
+    print(f"requests per case: {requests} (replay LLM latency {llm_latency_ms}ms, stub MCP)")
+    for name, message in cases.items():
+        timer = NodeTimer()
+        latencies = await run_case(graph, message, requests, timer)
+        print(f"\n[{name}] request mean={statistics.mean(latencies):.2f}ms p95={p95(latencies):.2f}ms")
+        print(f"  {'node':28} {'calls':>6} {'total mean':>11} {'self mean':>10} {'self p95':>9}")
+        for path in sorted(timer.total):
+            totals, selfs = timer.total[path], timer.self_time[path]
+            print(f"  {path:28} {len(totals):6d} {statistics.mean(totals):9.2f}ms "
+                  f"{statistics.mean(selfs):8.2f}ms {p95(selfs):7.2f}ms")
+    print(f"\nreplay stats: {llm_provider.get_llm_provider_stats()['replay']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.llm_latency_ms))
@@ -0,0 +1,80 @@
+"""
+GraphRunner 세션별 동시 실행 벤치마크
+
+가짜 LLM(고정 지연)을 사용하는 그래프로 세션 수에 따른 처리량을 측정합니다.
+- global_lock : 기존 방식과 동일하게 전체 동시 실행 수를 1로 제한
+- sharded     : 세션 단위 직렬화 + 전역 동시 실행 상한
+
+실행: python benchmarks/bench_session_concurrency.py [--latency 0.05] [--turns 4]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import StateGraph, START, END
+
+from utils.state import SmartHomeState
+from utils.graph_runner import GraphRunner
+
+logging.getLogger("runner").setLevel(logging.WARNING)
+
+
+class FakeLLM:
+    """고정 지연 후 응답하는 가짜 LLM (네트워크 왕복 시간 모사)"""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+
+    async def ainvoke(self, messages):
+        await asyncio.sleep(self.latency)
+        return AIMessage(content=f"echo: {messages[-1].content}")
+
+
+def build_fake_graph(llm: FakeLLM):
+    async def chat(state: SmartHomeState):
+        return {"messages": [await llm.ainvoke(state["messages"])]}
+
+    sg = StateGraph(SmartHomeState)
+    sg.add_node("chat", chat)
+    sg.add_edge(START, "chat")
+    sg.add_edge("chat", END)
+    return sg.compile(checkpointer=MemorySaver())
+
+
+async def run_case(runner: GraphRunner, sessions: int, turns: int) -> float:
+    async def session_worker(idx: int):
+        for turn in range(turns):
+            await runner.ask(session_id=f"bench-{idx}", user_input=f"turn {turn}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(session_worker(i) for i in range(sessions)))
+    elapsed = time.perf_counter() - start
+    return sessions * turns / elapsed
+
+
+async def main(latency: float, turns: int, max_concurrency: int) -> None:
+    llm = FakeLLM(latency)
+    print(f"fake LLM latency={latency * 1000:.0f}ms, turns/session={turns}, max_concurrency={max_concurrency}")
+    print(f"{'sessions':>8} | {'global_lock req/s':>18} | {'sharded req/s':>14} | {'speedup':>7}")
+    for sessions in (1, 5, 10, 25, 50):
+        baseline = GraphRunner(graph=build_fake_graph(llm), max_concurrency=1)
+        sharded = GraphRunner(graph=build_fake_graph(llm), max_concurrency=max_concurrency)
+        base_tput = await run_case(baseline, sessions, turns)
+        shard_tput = await run_case(sharded, sessions, turns)
+        print(f"{sessions:>8} | {base_tput:>18.1f} | {shard_tput:>14.1f} | {shard_tput / base_tput:>6.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--turns", type=int, default=4)
+    parser.add_argument("--max-concurrency", type=int, default=32)
+    args = parser.parse_args()
+    asyncio.run(main(args.latency, args.turns, args.max_concurrency))
@@ -0,0 +1,114 @@
+"""
+도구 선택기(utils/tool_selector.py) 평가: 라벨된 질문 세트의 recall과 프롬프트 토큰 절약량
+
+MCP 서버를 띄우지 않고 smart_home_app/mcp/*.py 소스에서 @mcp.tool 함수의 이름/docstring/인자를 읽어
+실제 서버가 노출하는 것과 같은 도구 카탈로그를 만든 뒤, top-K별로 아래 값을 출력합니다.
+- recall      : 정답 도구 중 선택된 비율 (전체 합산)
+- full recall : 정답 도구가 모두 선택된 질문 비율
+- tokens      : 요청당 도구 설명 + 도구 스키마 토큰 (전체 카탈로그 대비)
+
+실행: python benchmarks/bench_tool_selector.py [--top-k 4,6,8,10,12] [--json result.json]
+"""
+import argparse
+import ast
+import glob
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.tool_selector import ToolSelector, get_tool_selector_stats, load_tool_examples
+
+logging.disable(logging.CRITICAL)
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MCP_DIR = os.path.join(APP_DIR, "..", "mcp")
+LABELS_PATH = os.path.join(APP_DIR, "benchmarks", "tool_selection_labels.json")
+
+
+def load_tool_catalog(mcp_dir: str = MCP_DIR) -> list:
+    """mcp/<server>_mcp.py 에서 @mcp.tool() 함수를 읽어 도구 객체(이름/설명/인자/서버)를 만듭니다."""
+    tools = []
+    for path in sorted(glob.glob(os.path.join(mcp_dir, "*_mcp.py"))):
+        server = os.path.basename(path)[: -len("_mcp.py")]
+        with open(path, "r", encoding="utf-8") as f:
+            tree = ast.parse(f.read())
+        for node in tree.body:
+            if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                continue
+            if not any("mcp.tool" in ast.unparse(decorator) for decorator in node.decorator_list):
+                continue
+            tools.append(SimpleNamespace(
+                name=node.name,
+                description=ast.get_docstring(node) or "",
+                args={arg.arg: {"title": arg.arg} for arg in node.args.args},
+                metadata={"mcp_server": server},
+            ))
+    return tools
+
+
+def evaluate(tools: list, labels: list, top_k: int) -> dict:
+    selector = ToolSelector(tools, top_k=top_k, examples=load_tool_examples())
+    expected_total = found_total = full_hits = 0
+    selected_counts, selected_tokens, misses, latencies = [], [], [], []
+    for case in labels:
+        start = time.perf_counter()
+        selected = selector.select(case["query"])
+        latencies.append((time.perf_counter() - start) * 1000)
+        names = {tool.name for tool in selected}
+        expected = set(case["tools"])
+        found = expected & names
+        expected_total += len(expected)
+        found_total += len(found)
+        full_hits += found == expected
+        selected_counts.append(len(selected))
+        selected_tokens.append(sum(selector._tokens[name] for name in names))
+        if found != expected:
+            misses.append({"query": case["query"], "missing": sorted(expected - found)})
+    return {
+        "top_k": top_k,
+        "recall": round(found_total / expected_total, 3),
+        "full_recall": round(full_hits / len(labels), 3),
+        "avg_selected_tools": round(statistics.mean(selected_counts), 2),
+        "catalog_tokens": selector.catalog_tokens,
+        "avg_selected_tokens": round(statistics.mean(selected_tokens), 1),
+        "tokens_saved_per_request": round(selector.catalog_tokens - statistics.mean(selected_tokens), 1),
+        "select_ms_mean": round(statistics.mean(latencies), 3),
+        "misses": misses,
+    }
+
+
+def main(top_ks: list, output: str) -> None:
+    tools = load_tool_catalog()
+    with open(LABELS_PATH, "r", encoding="utf-8") as f:
+        labels = json.load(f)
+
+    print(f"tools: {len(tools)}, labeled queries: {len(labels)}")
+    print(f"{'top_k':>5} | {'recall':>6} | {'full':>5} | {'tools':>5} | {'tokens/req':>10} | {'catalog':>7} | {'saved':>6} | {'select':>8}")
+    results = []
+    for top_k in top_ks:
+        result = evaluate(tools, labels, top_k)
+        results.append(result)
+        print(f"{top_k:>5} | {result['recall']:>6.3f} | {result['full_recall']:>5.2f} | {result['avg_selected_tools']:>5.1f} | "
+              f"{result['avg_selected_tokens']:>10.0f} | {result['catalog_tokens']:>7} | "
+              f"{result['tokens_saved_per_request'] / result['catalog_tokens']:>6.1%} | {result['select_ms_mean']:>6.2f}ms")
+
+    for result in results:
+        for miss in result["misses"]:
+            print(f"  miss@{result['top_k']}: {miss['query']} -> {miss['missing']}")
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump({"results": results, "selector_stats": get_tool_selector_stats()}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--top-k", default="4,6,8,10,12")
+    parser.add_argument("--json", dest="output")
+    args = parser.parse_args()
+    main([int(k) for k in args.top_k.split(",")], args.output)
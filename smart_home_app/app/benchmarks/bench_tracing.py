@@ -0,0 +1,118 @@
+"""
+trace 수집(utils/tracing.py) 오버헤드 측정 (replay LLM + 스텁 MCP 도구, 완전 오프라인)
+
+서버가 붙이는 콜백(tool_span_tracker, metrics_handler)에 trace를 더한 조건을 번갈아 실행해 요청당 시간(중앙값)을 비교합니다.
+- off       : trace 없음 (TRACE_SINK=none)
+- unsampled : JSONL sink, 샘플되지 않은 세션 (콜백 없음, 요청 끝에 샘플 여부만 확인)
+- sampled   : JSONL sink, 샘플된 세션 (노드/LLM/도구 span 수집 + 배치 내보내기)
+- langfuse  : --langfuse 이면 이전 방식(요청마다 langfuse CallbackHandler)도 측정 (langfuse 설치 필요)
+5% 샘플링일 때 요청당 평균 비용은 0.95 * unsampled + 0.05 * sampled 로 추정합니다.
+
+실행: python benchmarks/bench_tracing.py [--requests 200] [--llm-latency-ms 0] [--langfuse]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import HumanMessage
+
+from benchmarks.bench_node_overhead import install_offline_stubs
+from graph import registry
+from utils.metrics import metrics_handler
+from utils.tool_spans import tool_span_tracker
+from utils.tracing import JSONLTraceSink, NoneTraceSink, Tracer
+
+CASES = {"chat": "오늘 저녁 뭐 먹을까?", "cooking": "김치찌개 요리 도와줘"}
+BASE_CALLBACKS = [tool_span_tracker, metrics_handler]
+
+
+async def run_once(graph, message: str, thread_id: str, tracer: Tracer, extra: list = ()) -> float:
+    state = {"messages": [HumanMessage(content=message)], "system_mode": "normal", "recipe": None, "current_step": None}
+    start = time.perf_counter()
+    trace = tracer.start("chat", thread_id, input=message)
+    config = {"callbacks": [*trace.callbacks, *extra, *BASE_CALLBACKS], "configurable": {"thread_id": thread_id}}
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = await graph.ainvoke(state, config=config)
+    trace.finish(output=result["messages"][-1].content)
+    return (time.perf_counter() - start) * 1000
+
+
+def make_conditions(trace_path: str, langfuse: bool) -> dict:
+    sink = JSONLTraceSink(trace_path)
+    conditions = {
+        "off": (Tracer(sink=NoneTraceSink()), []),
+        "unsampled": (Tracer(sink=sink, sample_rate=0.0), []),
+        "sampled": (Tracer(sink=sink, sample_rate=1.0), []),
+    }
+    if langfuse:
+        from langfuse.callback import CallbackHandler
+
+        conditions["langfuse"] = (Tracer(sink=NoneTraceSink()), [CallbackHandler()])
+    return conditions
+
+
+async def measure(graph, requests: int, conditions: dict) -> dict:
+    results = {}
+    for name, message in CASES.items():
+        timings = {condition: [] for condition in conditions}
+        # 순서 효과(GC, 캐시 워밍)를 줄이기 위해 조건을 번갈아 실행
+        for i in range(requests):
+            for condition, (tracer, extra) in conditions.items():
+                timings[condition].append(
+                    await run_once(graph, message, f"bench-trace-{condition}-{name}-{i}", tracer, extra))
+        results[name] = {condition: statistics.median(values) for condition, values in timings.items()}
+    return results
+
+
+async def main(requests: int, llm_latency_ms: float, langfuse: bool) -> None:
+    install_offline_stubs(llm_latency_ms)
+    graph = registry.get_graph("main")
+    with contextlib.redirect_stdout(io.StringIO()):
+        await registry.warm_up()
+    workdir = tempfile.mkdtemp(prefix="bench-tracing-")
+    trace_path = os.path.join(workdir, "traces.jsonl")
+    conditions = make_conditions(trace_path, langfuse)
+    try:
+        # 첫 실행 비용(모델/에이전트 생성)을 측정에서 제외
+        for name, message in CASES.items():
+            await run_once(graph, message, f"bench-trace-warmup-{name}", conditions["off"][0])
+
+        print(f"requests per case: {requests} (median, replay LLM latency {llm_latency_ms}ms, stub MCP)")
+        names = list(conditions)
+        print(f"{'case':8} | " + " | ".join(f"{name:>10}" for name in names) + f" | {'unsampled+':>10} | {'5% est.+':>9}")
+        for case, medians in (await measure(graph, requests, conditions)).items():
+            off = medians["off"]
+            unsampled = medians["unsampled"] - off
+            estimate = 0.95 * unsampled + 0.05 * (medians["sampled"] - off)
+            print(f"{case:8} | " + " | ".join(f"{medians[name]:>8.2f}ms" for name in names)
+                  + f" | {unsampled:>8.3f}ms | {estimate:>7.3f}ms")
+
+        for tracer, _ in conditions.values():
+            tracer.close()
+        with open(trace_path, "r", encoding="utf-8") as f:
+            traces = [json.loads(line) for line in f]
+        spans = [len(trace["spans"]) for trace in traces]
+        stats = conditions["sampled"][0].stats()
+        print(f"\nexported traces: {len(traces)} in {stats['batches']} batches, "
+              f"spans per trace: {statistics.mean(spans):.1f}, jsonl size: {os.path.getsize(trace_path) / 1024:.0f}KB")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="replay 응답 지연(ms)")
+    parser.add_argument("--langfuse", action="store_true", help="이전 방식(langfuse CallbackHandler)도 측정")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.llm_latency_ms, args.langfuse))
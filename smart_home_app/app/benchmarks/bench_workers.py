@@ -0,0 +1,113 @@
+"""
+멀티 워커(dispatcher.py) 처리량 확장성 측정 (replay LLM + 스텁 MCP 도구, 완전 오프라인)
+
+워커 수를 바꿔 가며 dispatcher.py를 띄우고, load_test.py와 같은 부하를 보내 처리량/지연을 비교합니다.
+워커는 benchmarks/offline_server.py로 뜨며, 체크포인터와 세션 저장소는 임시 디렉터리의 SQLite 파일을 공유합니다.
+- GRAPH_MAX_CONCURRENCY(--concurrency)는 워커마다 적용되므로 워커 수만큼 동시 실행 수가 늘어납니다.
+- --llm-latency-ms 0 이면 CPU가 병목이라 코어 수까지만 늘어나고, 지연을 넣으면 워커별 동시 실행 한도가 병목입니다.
+
+실행: python benchmarks/bench_workers.py [--workers 1,2,4] [--sessions 64] [--turns 3] [--llm-latency-ms 100]
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import httpx
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+from benchmarks.load_test import QUERIES_PATH, LoadTest  # noqa: E402
+
+
+async def wait_ready(client: httpx.AsyncClient, process: subprocess.Popen, timeout: float = 180) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"dispatcher 종료됨 (exit code {process.returncode})")
+        try:
+            if (await client.get("/stats")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.5)
+    raise RuntimeError("dispatcher 준비 시간 초과")
+
+
+async def run_case(workers: int, args: argparse.Namespace, queries: dict) -> dict:
+    workdir = tempfile.mkdtemp(prefix="bench-workers-")
+    env = {
+        **os.environ,
+        "WORKERS": str(workers),
+        "WORKER_APP": "benchmarks.offline_server:app",
+        "WORKER_BASE_PORT": str(args.port + 1),
+        "DISPATCHER_PORT": str(args.port),
+        "GRAPH_MAX_CONCURRENCY": str(args.concurrency),
+        "LLM_REPLAY_LATENCY_MS": str(args.llm_latency_ms),
+        # 승인 제어로 거절되지 않도록 대기열/대기 상한을 넉넉히
+        "ADMISSION_MAX_QUEUE": "100000",
+        "ADMISSION_MAX_QUEUE_WAIT": "300",
+        "CHECKPOINTER": "sqlite",
+        "CHECKPOINT_DB_PATH": os.path.join(workdir, "checkpoints.sqlite"),
+        "SESSION_BACKEND": "sqlite",
+        "SESSION_STORE_PATH": os.path.join(workdir, "sessions.sqlite"),
+    }
+    process = subprocess.Popen([sys.executable, "dispatcher.py"], cwd=APP_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    limits = httpx.Limits(max_connections=args.sessions, max_keepalive_connections=args.sessions)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=300, limits=limits) as client:
+            await wait_ready(client, process)
+            load_args = argparse.Namespace(
+                sessions=args.sessions, turns=args.turns, think_time="0", ramp_up=0.0, mix=args.mix,
+                stream_ratio=args.stream_ratio, seed=1, in_process=False, url=f"http://127.0.0.1:{args.port}",
+            )
+            report = await LoadTest(client, load_args, queries).run()
+            worker_stats = (await client.get("/stats")).json()["workers"]
+        per_worker = Counter({entry["worker"]: entry["stats"]["scheduler"]["admitted"] for entry in worker_stats})
+        return {"report": report, "per_worker": [per_worker[i] for i in range(workers)]}
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+async def main(args: argparse.Namespace) -> None:
+    with open(QUERIES_PATH, "r", encoding="utf-8") as f:
+        queries = json.load(f)
+    counts = [int(n) for n in args.workers.split(",")]
+    print(f"sessions={args.sessions} turns={args.turns} (think time 0) llm latency={args.llm_latency_ms}ms "
+          f"GRAPH_MAX_CONCURRENCY={args.concurrency}/worker, cpu cores={os.cpu_count()}")
+    print(f"{'workers':>7} | {'req/s':>7} | {'scaling':>7} | {'p50':>8} | {'p99':>8} | {'errors':>6} | requests per worker")
+    baseline = None
+    for workers in counts:
+        result = await run_case(workers, args, queries)
+        report = result["report"]
+        throughput = report["throughput_rps"]
+        baseline = baseline or throughput / workers
+        latency = report["overall"]["latency_ms"]
+        print(f"{workers:>7} | {throughput:>7.1f} | {throughput / baseline:>6.2f}x | {latency.get('p50', 0):>6.0f}ms | "
+              f"{latency.get('p99', 0):>6.0f}ms | {report['overall']['errors']:>6} | {result['per_worker']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--sessions", type=int, default=64)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--llm-latency-ms", type=float, default=100.0)
+    parser.add_argument("--concurrency", type=int, default=4, help="워커별 GRAPH_MAX_CONCURRENCY")
+    parser.add_argument("--mix", default="chat=0.5,cooking=0.3,device=0.2")
+    parser.add_argument("--stream-ratio", type=float, default=0.3)
+    parser.add_argument("--port", type=int, default=8990, help="dispatcher 포트 (워커는 +1부터)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,85 @@
+"""
+BoundedMemorySaver 크기 상한 검증: 쿠킹 서브그래프 턴이 계속 쌓여도 보유량이 일정해야 합니다.
+
+한 세션(스레드)에서 --turns 턴을 실행한다고 보고, 턴마다
+루트 체크포인트 1건 -> 새 서브그래프 네임스페이스(cooking:<task_id>)에 체크포인트 --sub-steps건(+ 태스크 쓰기) -> 루트 체크포인트 1건
+을 저장합니다. 채널 값 크기는 턴마다 같으므로, 워밍업 뒤 네임스페이스/체크포인트/blob 수와 대략적인 바이트가 늘어나면 실패입니다.
+
+실행: python benchmarks/check_checkpointer_bounds.py [--turns 100] [--max-per-thread 10]
+      (pytest benchmarks/check_checkpointer_bounds.py 로도 실행 가능)
+"""
+import argparse
+import logging
+import os
+import sys
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.base.id import uuid6
+
+from utils.checkpointer import BoundedMemorySaver
+
+logging.disable(logging.CRITICAL)
+
+
+def put(saver, config: dict, versions: dict, channel_values: dict, step: int) -> dict:
+    versions.update({channel: saver.get_next_version(versions.get(channel), None) for channel in channel_values})
+    checkpoint = {
+        **empty_checkpoint(),
+        "id": str(uuid6(clock_seq=step)),
+        "channel_values": channel_values,
+        "channel_versions": dict(versions),
+    }
+    if "checkpoint_id" in config["configurable"]:
+        saver.put_writes(config, list(channel_values.items()), f"task-{step}")
+    return saver.put(config, checkpoint, {"source": "loop", "step": step, "parents": {}}, dict(versions))
+
+
+def run(turns: int, max_per_thread: int, sub_steps: int = 4) -> list:
+    """턴마다 saver.stats()를 기록해 반환합니다."""
+    saver = BoundedMemorySaver(max_checkpoints_per_thread=max_per_thread)
+    root = {"configurable": {"thread_id": "bounds", "checkpoint_ns": ""}}
+    root_versions: dict = {}
+    history = []
+    for turn in range(turns):
+        messages = [
+            HumanMessage(content=f"{turn}번째 질문: 김치찌개 다음 단계 알려줘"),
+            AIMessage(content="냄비에 물 500ml를 붓고 중불에서 10분간 끓여주세요. " * 20),
+        ]
+        root = put(saver, root, root_versions, {"messages": messages, "system_mode": "cooking"}, turn * 10)
+        sub = {"configurable": {"thread_id": "bounds", "checkpoint_ns": f"cooking:{uuid.uuid4()}"}}
+        sub_versions: dict = {}
+        for step in range(sub_steps):
+            sub = put(saver, sub, sub_versions, {"messages": messages, "recipe_step": step}, turn * 10 + step + 1)
+        root = put(saver, root, root_versions, {"messages": messages, "system_mode": "chat"}, turn * 10 + 9)
+        history.append(saver.stats())
+    latest = saver.get_tuple({"configurable": {"thread_id": "bounds", "checkpoint_ns": ""}})
+    assert latest is not None and latest.checkpoint["channel_values"]["system_mode"] == "chat"
+    return history
+
+
+def test_size_stays_flat(turns: int = 100, max_per_thread: int = 10) -> None:
+    history = run(turns, max_per_thread)
+    warm = history[max_per_thread]
+    for stats in history[max_per_thread:]:
+        assert stats["checkpoints"] <= max_per_thread, stats
+        assert stats["namespaces"] <= warm["namespaces"], stats
+        assert stats["blobs"] <= warm["blobs"], stats
+        assert stats["approx_bytes"] <= warm["approx_bytes"] * 1.05, stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--max-per-thread", type=int, default=10)
+    args = parser.parse_args()
+    history = run(args.turns, args.max_per_thread)
+    for turn in sorted({0, args.max_per_thread - 1, args.turns // 2, args.turns - 1}):
+        stats = history[turn]
+        print(f"  turn {turn + 1:>4}: namespaces {stats['namespaces']:>3}, checkpoints {stats['checkpoints']:>3}, "
+              f"blobs {stats['blobs']:>3}, approx {stats['approx_bytes']:>8}B, pruned {stats['pruned_checkpoints']}")
+    test_size_stays_flat(args.turns, args.max_per_thread)
+    print("OK: 서브그래프 턴이 쌓여도 체크포인트/네임스페이스/blob 수와 바이트가 일정합니다.")
@@ -0,0 +1,282 @@
+"""
+/chat, /chat/stream 부하 테스트 드라이버
+
+세션(가상 사용자)마다 여러 턴을 보내며, 턴 사이에 think time을 둡니다.
+메시지는 benchmarks/load_queries.json 의 카테고리(chat/cooking/device)에서 --mix 비율로 뽑습니다.
+결과(p50/p95/p99 지연, 처리량, 오류율)는 JSON으로 저장해 버전 간 diff 할 수 있습니다.
+
+실행 예시
+  # 1) 실행 중인 서버 대상 (서버는 replay LLM + 목서버로 띄움)
+  #    LLM_PROVIDER=replay LLM_REPLAY_FILE=benchmarks/replay_script.json python server.py
+  python benchmarks/load_test.py --url http://localhost:8999 --sessions 100 --turns 5 --output load.json
+
+  # 2) 서버를 프로세스 안에서 실행 (replay LLM 자동 설정, --stub-mcp 면 MCP 서버도 불필요)
+  python benchmarks/load_test.py --in-process --stub-mcp --sessions 100 --stream-ratio 0.3
+
+주의: --in-process 모드(httpx ASGITransport)는 응답 본문을 모두 받은 뒤 돌려주므로
+스트림의 첫 이벤트 시간(ttfb)은 실제 HTTP 서버 대상일 때만 의미가 있습니다.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+QUERIES_PATH = os.path.join(APP_DIR, "benchmarks", "load_queries.json")
+REPLAY_SCRIPT_PATH = os.path.join(APP_DIR, "benchmarks", "replay_script.json")
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """"chat=0.5,cooking=0.3,device=0.2" -> {"chat": 0.5, ...}"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def parse_range(text: str) -> tuple:
+    """"0.5,2" -> (0.5, 2.0), "1" -> (1.0, 1.0)"""
+    low, _, high = text.partition(",")
+    return float(low), float(high or low)
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """nearest-rank 백분위수"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return round(ordered[min(rank, len(ordered) - 1)], 2)
+
+
+def summarize(latencies: List[float]) -> dict:
+    if not latencies:
+        return {"count": 0}
+    return {
+        "count": len(latencies),
+        "mean": round(statistics.mean(latencies), 2),
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": round(max(latencies), 2),
+    }
+
+
+class LoadTest:
+    def __init__(self, client: httpx.AsyncClient, args: argparse.Namespace, queries: Dict[str, List[str]]) -> None:
+        self.client = client
+        self.args = args
+        self.queries = queries
+        self.mix = {name: weight for name, weight in parse_mix(args.mix).items() if name in queries}
+        if not self.mix:
+            raise ValueError(f"--mix 에 유효한 카테고리가 없습니다: {args.mix} (사용 가능: {list(queries)})")
+        self.think_time = parse_range(args.think_time)
+        self.results: List[dict] = []
+
+    def _pick(self, rng: random.Random) -> tuple:
+        category = rng.choices(list(self.mix), weights=list(self.mix.values()))[0]
+        return category, rng.choice(self.queries[category])
+
+    async def _post_chat(self, session_id: str, message: str) -> dict:
+        resp = await self.client.post("/chat", json={"session_id": session_id, "message": message})
+        if resp.status_code != 200:
+            return {"ok": False, "error": f"http_{resp.status_code}"}
+        return {"ok": True}
+
+    async def _post_stream(self, session_id: str, message: str, start: float) -> dict:
+        result = {"ok": False, "error": "no_final_event", "ttfb_ms": None, "events": 0}
+        event_type = None
+        async with self.client.stream("POST", "/chat/stream", json={"session_id": session_id, "message": message}) as resp:
+            if resp.status_code != 200:
+                return {"ok": False, "error": f"http_{resp.status_code}"}
+            async for line in resp.aiter_lines():
+                if line.startswith("event: "):
+                    event_type = line[len("event: "):]
+                    continue
+                if not line.startswith("data: "):
+                    continue
+                result["events"] += 1
+                # session 이벤트는 서버가 바로 보내므로 첫 응답 이벤트 기준으로 ttfb 측정
+                if event_type != "session" and result["ttfb_ms"] is None:
+                    result["ttfb_ms"] = (time.perf_counter() - start) * 1000
+                if event_type == "error":
+                    # 스트림 시작 뒤 승인 제어에 걸린 경우(status 429)는 HTTP 429와 같이 집계
+                    status = json.loads(line[len("data: "):]).get("status")
+                    result["error"] = f"http_{status}" if status else "stream_error"
+                elif event_type == "final":
+                    result.update(ok=True, error=None)
+        return result
+
+    async def _request(self, rng: random.Random, session_id: str, turn: int) -> None:
+        category, message = self._pick(rng)
+        stream = rng.random() < self.args.stream_ratio
+        start = time.perf_counter()
+        try:
+            if stream:
+                outcome = await self._post_stream(session_id, message, start)
+            else:
+                outcome = await self._post_chat(session_id, message)
+        except httpx.TimeoutException:
+            outcome = {"ok": False, "error": "timeout"}
+        except httpx.HTTPError as e:
+            outcome = {"ok": False, "error": type(e).__name__}
+        outcome.update(
+            endpoint="/chat/stream" if stream else "/chat",
+            category=category,
+            turn=turn,
+            latency_ms=(time.perf_counter() - start) * 1000,
+        )
+        self.results.append(outcome)
+
+    async def _session(self, index: int) -> None:
+        # 세션 시작 시점을 ramp-up 구간에 고르게 분산
+        if self.args.ramp_up > 0:
+            await asyncio.sleep(self.args.ramp_up * index / self.args.sessions)
+        session_id = f"load-{self.args.seed}-{index}"
+        # 세션마다 시드를 고정해 실행 순서와 무관하게 같은 요청 시퀀스를 만듦
+        rng = random.Random(f"{self.args.seed}-{index}")
+        for turn in range(self.args.turns):
+            if turn:
+                await asyncio.sleep(rng.uniform(*self.think_time))
+            await self._request(rng, session_id, turn)
+
+    async def run(self) -> dict:
+        started_at = datetime.now(timezone.utc).isoformat()
+        start = time.perf_counter()
+        await asyncio.gather(*(self._session(i) for i in range(self.args.sessions)))
+        elapsed = time.perf_counter() - start
+        return self.report(started_at, elapsed)
+
+    def report(self, started_at: str, elapsed: float) -> dict:
+        def section(results: List[dict]) -> dict:
+            errors = [r for r in results if not r["ok"]]
+            return {
+                "requests": len(results),
+                "errors": len(errors),
+                "error_rate": round(len(errors) / len(results), 4) if results else 0.0,
+                "latency_ms": summarize([r["latency_ms"] for r in results if r["ok"]]),
+            }
+
+        by_endpoint = defaultdict(list)
+        by_category = defaultdict(list)
+        for r in self.results:
+            by_endpoint[r["endpoint"]].append(r)
+            by_category[r["category"]].append(r)
+
+        ttfb = [r["ttfb_ms"] for r in self.results if r.get("ttfb_ms") is not None]
+        return {
+            "started_at": started_at,
+            "config": {
+                "target": "in-process" if self.args.in_process else self.args.url,
+                "sessions": self.args.sessions,
+                "turns": self.args.turns,
+                "think_time_s": list(self.think_time),
+                "ramp_up_s": self.args.ramp_up,
+                "mix": self.mix,
+                "stream_ratio": self.args.stream_ratio,
+                "seed": self.args.seed,
+            },
+            "duration_s": round(elapsed, 3),
+            "throughput_rps": round(len(self.results) / elapsed, 2) if elapsed else 0.0,
+            "overall": section(self.results),
+            "by_endpoint": {name: section(results) for name, results in sorted(by_endpoint.items())},
+            "by_category": {name: section(results) for name, results in sorted(by_category.items())},
+            "stream_ttfb_ms": summarize(ttfb),
+            "error_kinds": dict(Counter(r["error"] for r in self.results if not r["ok"])),
+        }
+
+
+async def make_in_process_client(stub_mcp: bool, llm_latency_ms: float, timeout: float) -> httpx.AsyncClient:
+    """replay LLM으로 server.app 을 같은 프로세스에서 실행하는 클라이언트를 만듭니다."""
+    import utils.llm_provider as llm_provider
+    from utils.llm_provider import ReplayScript, set_llm_provider
+
+    if stub_mcp:
+        from benchmarks.bench_node_overhead import install_offline_stubs
+
+        install_offline_stubs(llm_latency_ms)
+    llm_provider.LLM_REPLAY_LATENCY_MS = llm_latency_ms
+    set_llm_provider("replay", ReplayScript.load(os.environ.get("LLM_REPLAY_FILE") or REPLAY_SCRIPT_PATH))
+
+    import server
+
+    # ASGITransport는 startup 이벤트를 실행하지 않으므로 직접 호출
+    await server.startup_event()
+    transport = httpx.ASGITransport(app=server.app)
+    return httpx.AsyncClient(transport=transport, base_url="http://in-process", timeout=timeout)
+
+
+async def fetch_server_stats(client: httpx.AsyncClient) -> Optional[dict]:
+    try:
+        resp = await client.get("/stats")
+        return resp.json() if resp.status_code == 200 else None
+    except (httpx.HTTPError, ValueError):
+        return None
+
+
+async def main(args: argparse.Namespace) -> None:
+    with open(args.queries, "r", encoding="utf-8") as f:
+        queries = json.load(f)
+
+    if args.in_process:
+        logging.disable(logging.CRITICAL)
+        client = await make_in_process_client(args.stub_mcp, args.llm_latency_ms, args.timeout)
+    else:
+        limits = httpx.Limits(max_connections=args.sessions, max_keepalive_connections=args.sessions)
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits)
+
+    # 같은 프로세스에서 실행할 때는 에이전트 debug 출력을 버림
+    quiet = contextlib.redirect_stdout(io.StringIO()) if args.in_process else contextlib.nullcontext()
+    async with client:
+        with quiet:
+            report = await LoadTest(client, args, queries).run()
+        report["server_stats"] = await fetch_server_stats(client)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    overall = report["overall"]
+    latency = overall["latency_ms"]
+    print(
+        f"requests={overall['requests']} errors={overall['errors']} ({overall['error_rate']:.2%}) "
+        f"throughput={report['throughput_rps']}req/s "
+        f"p50={latency.get('p50')}ms p95={latency.get('p95')}ms p99={latency.get('p99')}ms",
+        file=sys.stderr,
+    )
+    if not args.output:
+        print(text)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="/chat, /chat/stream load test")
+    parser.add_argument("--url", default="http://localhost:8999", help="대상 서버 주소")
+    parser.add_argument("--sessions", type=int, default=100, help="동시 세션(가상 사용자) 수")
+    parser.add_argument("--turns", type=int, default=5, help="세션당 메시지 수")
+    parser.add_argument("--think-time", default="0.5,2", help="턴 사이 대기 시간(초) 범위 'min,max'")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="세션 시작을 분산할 시간(초)")
+    parser.add_argument("--mix", default="chat=0.5,cooking=0.3,device=0.2", help="카테고리별 메시지 비율")
+    parser.add_argument("--stream-ratio", type=float, default=0.0, help="/chat/stream 으로 보낼 요청 비율 (0~1)")
+    parser.add_argument("--queries", default=QUERIES_PATH, help="카테고리별 메시지 목록 JSON")
+    parser.add_argument("--timeout", type=float, default=60.0, help="요청 타임아웃(초)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="결과 JSON 파일 경로 (없으면 stdout)")
+    parser.add_argument("--in-process", action="store_true", help="server.app 을 replay LLM으로 같은 프로세스에서 실행")
+    parser.add_argument("--stub-mcp", action="store_true", help="--in-process 에서 MCP 도구를 고정 응답 스텁으로 대체")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="--in-process 에서 replay 응답 지연(ms)")
+    asyncio.run(main(parser.parse_args()))
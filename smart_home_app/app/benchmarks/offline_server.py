@@ -0,0 +1,12 @@
+"""
+replay LLM + 스텁 MCP 도구로 server.app을 띄우는 워커 진입점 (벤치마크 전용, 완전 오프라인)
+
+실행: LLM_REPLAY_LATENCY_MS=100 uvicorn benchmarks.offline_server:app --port 9100
+"""
+import os
+
+from benchmarks.bench_node_overhead import install_offline_stubs
+
+install_offline_stubs(float(os.environ.get("LLM_REPLAY_LATENCY_MS", "0")))
+
+from server import app  # noqa: E402
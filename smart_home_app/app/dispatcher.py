@@ -0,0 +1,235 @@
+"""
+멀티 워커 실행용 디스패처
+
+server.py는 프로세스 하나에서 그래프 상태와 세션 스케줄러를 메모리에 두므로 CPU 코어 하나만 씁니다.
+디스패처는 워커 프로세스(server:app) N개를 띄우고, session_id 해시(crc32)로 요청을 한 워커에 고정해 보냅니다.
+- 같은 세션은 항상 같은 워커로 가므로 워커 안의 세션 락(utils/scheduler.py)으로 턴 순서가 유지됩니다.
+- 워커는 기본으로 CHECKPOINTER=sqlite, SESSION_BACKEND=sqlite로 같은 파일을 공유합니다.
+  워커가 죽어 다른 워커로 넘어가도(failover) 대화 상태를 그대로 이어 갑니다.
+- session_id가 없는 요청은 디스패처가 ID를 만들어 넣습니다. (첫 턴부터 워커가 고정되도록)
+
+환경 변수
+- WORKERS: 워커 프로세스 수 (기본 CPU 코어 수)
+- WORKER_BASE_PORT: 첫 워커 포트, 이후 +1씩 (기본 9100)
+- WORKER_APP: 워커로 띄울 ASGI 앱 (기본 server:app)
+- WORKER_URLS: 이미 떠 있는 워커 주소 목록(쉼표 구분). 지정하면 워커를 직접 띄우지 않음
+
+실행: WORKERS=4 python dispatcher.py
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+import zlib
+from typing import List, Optional
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+
+from utils.metrics import CONTENT_TYPE_LATEST, REGISTRY, MetricsMiddleware
+
+import logging
+logger = logging.getLogger("dispatcher")
+logging.basicConfig(level=logging.INFO)
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+WORKERS = int(os.environ.get("WORKERS", str(os.cpu_count() or 1)))
+WORKER_BASE_PORT = int(os.environ.get("WORKER_BASE_PORT", "9100"))
+WORKER_APP = os.environ.get("WORKER_APP", "server:app")
+WORKER_URLS = [url.strip() for url in os.environ.get("WORKER_URLS", "").split(",") if url.strip()]
+# 워커가 그래프 컴파일/MCP 연결(warm_up)을 끝내고 응답할 때까지 기다리는 시간(초)
+WORKER_START_TIMEOUT = float(os.environ.get("WORKER_START_TIMEOUT", "120"))
+DISPATCHER_PORT = int(os.environ.get("DISPATCHER_PORT", "8999"))
+
+# 워커끼리 공유해야 하는 설정 (직접 지정하지 않았을 때만 적용)
+SHARED_WORKER_ENV = {"CHECKPOINTER": "sqlite", "SESSION_BACKEND": "sqlite"}
+
+DISPATCHED = REGISTRY.counter("dispatcher_requests_total", "Requests forwarded to each worker", ["worker"])
+FAILOVERS = REGISTRY.counter("dispatcher_failovers_total", "Requests moved off an unreachable worker", ["worker"])
+
+
+def worker_index(session_id: str, workers: int) -> int:
+    """세션이 고정될 워커 번호 (utils/session.py 샤드와 같은 crc32 해시)"""
+    return zlib.crc32(session_id.encode("utf-8")) % workers
+
+
+class WorkerPool:
+    """워커 프로세스와 워커별 HTTP 연결 풀을 관리합니다."""
+
+    def __init__(self, urls: List[str], processes: Optional[List[subprocess.Popen]] = None) -> None:
+        self.urls = urls
+        self.processes = processes or []
+        self.clients = [
+            httpx.AsyncClient(
+                base_url=url,
+                timeout=httpx.Timeout(None, connect=5.0),
+                limits=httpx.Limits(max_connections=None, max_keepalive_connections=256),
+            )
+            for url in urls
+        ]
+
+    @classmethod
+    def spawn(cls, workers: int, base_port: int, app: str) -> "WorkerPool":
+        env = {**SHARED_WORKER_ENV, **os.environ}
+        processes, urls = [], []
+        for i in range(workers):
+            port = base_port + i
+            command = [sys.executable, "-m", "uvicorn", app, "--host", "127.0.0.1", "--port", str(port),
+                       "--log-level", "warning"]
+            processes.append(subprocess.Popen(command, cwd=APP_DIR, env=env))
+            urls.append(f"http://127.0.0.1:{port}")
+        logger.info(f"워커 {workers}개 시작: {app} (포트 {base_port}~{base_port + workers - 1})")
+        return cls(urls, processes)
+
+    async def wait_ready(self, timeout: float = WORKER_START_TIMEOUT) -> None:
+        deadline = time.monotonic() + timeout
+        for i, client in enumerate(self.clients):
+            while True:
+                if self.processes and self.processes[i].poll() is not None:
+                    raise RuntimeError(f"워커 {i} 종료됨 (exit code {self.processes[i].returncode})")
+                try:
+                    if (await client.get("/stats")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"워커 {i} 준비 시간 초과 ({self.urls[i]})")
+                await asyncio.sleep(0.2)
+        logger.info(f"워커 {len(self.clients)}개 준비 완료")
+
+    def candidates(self, session_id: str) -> List[int]:
+        """고정 워커를 먼저, 나머지는 순서대로 (고정 워커에 연결할 수 없을 때 넘어갈 대상)"""
+        first = worker_index(session_id, len(self.clients))
+        return [(first + offset) % len(self.clients) for offset in range(len(self.clients))]
+
+    async def send(self, session_id: str, path: str, body: bytes, stream: bool = False) -> httpx.Response:
+        """
+        세션의 워커로 요청을 보냅니다.
+        연결 자체가 실패한 경우(요청이 워커에 닿지 않음)에만 다음 워커로 넘깁니다.
+        """
+        last_error: Optional[Exception] = None
+        for index in self.candidates(session_id):
+            client = self.clients[index]
+            try:
+                request = client.build_request("POST", path, content=body, headers={"content-type": "application/json"})
+                response = await client.send(request, stream=stream)
+            except httpx.ConnectError as e:
+                FAILOVERS.inc(1, str(index))
+                logger.warning(f"워커 {index} 연결 실패, 다음 워커로 전달: {e}")
+                last_error = e
+                continue
+            DISPATCHED.inc(1, str(index))
+            return response
+        raise HTTPException(status_code=502, detail=f"no worker available ({last_error})")
+
+    async def stats(self) -> list:
+        async def one(index: int) -> dict:
+            entry = {"worker": index, "url": self.urls[index]}
+            if self.processes:
+                entry["pid"] = self.processes[index].pid
+                entry["alive"] = self.processes[index].poll() is None
+            try:
+                entry["stats"] = (await self.clients[index].get("/stats")).json()
+            except (httpx.HTTPError, ValueError) as e:
+                entry["error"] = type(e).__name__
+            return entry
+
+        return list(await asyncio.gather(*(one(i) for i in range(len(self.clients)))))
+
+    async def close(self) -> None:
+        for client in self.clients:
+            await client.aclose()
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+app = FastAPI(title="Async Cooking Assistant (dispatcher)")
+app.add_middleware(MetricsMiddleware, paths=("/chat", "/chat/stream", "/stats", "/metrics"))
+pool: Optional[WorkerPool] = None
+
+
+@app.on_event("startup")
+async def startup_event():
+    global pool
+    pool = WorkerPool(WORKER_URLS) if WORKER_URLS else WorkerPool.spawn(WORKERS, WORKER_BASE_PORT, WORKER_APP)
+    try:
+        await pool.wait_ready()
+    except Exception:
+        await pool.close()
+        raise
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if pool is not None:
+        await pool.close()
+
+
+async def _session_body(request: Request) -> tuple:
+    """본문의 session_id를 읽고, 없으면 만들어 넣은 본문을 돌려줍니다."""
+    try:
+        body = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid JSON body")
+    if not isinstance(body, dict):
+        raise HTTPException(status_code=400, detail="invalid JSON body")
+    session = body.get("session_id") or str(uuid.uuid4())
+    body["session_id"] = session
+    return session, json.dumps(body, ensure_ascii=False).encode("utf-8")
+
+
+def _passthrough_headers(response: httpx.Response) -> dict:
+    # 429의 Retry-After, 스트림의 캐시/버퍼링 설정을 그대로 전달
+    names = ("retry-after", "cache-control", "x-accel-buffering")
+    return {name: response.headers[name] for name in names if name in response.headers}
+
+
+@app.post("/chat", summary="Forward chat to the session's worker")
+async def chat(request: Request):
+    session, body = await _session_body(request)
+    response = await pool.send(session, "/chat", body)
+    return Response(
+        content=response.content,
+        status_code=response.status_code,
+        headers=_passthrough_headers(response),
+        media_type=response.headers.get("content-type"),
+    )
+
+
+@app.post("/chat/stream", summary="Forward streaming chat to the session's worker")
+async def chat_stream(request: Request):
+    session, body = await _session_body(request)
+    response = await pool.send(session, "/chat/stream", body, stream=True)
+    return StreamingResponse(
+        response.aiter_raw(),
+        status_code=response.status_code,
+        headers=_passthrough_headers(response),
+        media_type=response.headers.get("content-type"),
+        background=BackgroundTask(response.aclose),
+    )
+
+
+@app.get("/stats", summary="Per-worker runtime stats")
+async def stats():
+    return {"workers": await pool.stats()}
+
+
+@app.get("/metrics", summary="Dispatcher metrics (scrape workers on their own ports for graph metrics)")
+async def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE_LATEST)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    uvicorn.run("dispatcher:app", host="0.0.0.0", port=DISPATCHER_PORT)
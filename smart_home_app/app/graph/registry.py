@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Callable, Dict
+
+from utils.checkpointer import BoundedMemorySaver
+from utils.sqlite_checkpointer import SQLiteCheckpointSaver
+
+logger = logging.getLogger("graph_registry")
+logging.basicConfig(level=logging.INFO)
+
+# 프로세스 공용 체크포인터
+# 메인 그래프에만 연결하고, 서브그래프는 checkpointer=None으로 컴파일해 부모의 체크포인터를 물려받습니다.
+# 스레드 수/TTL/스레드별 체크포인트 수는 CHECKPOINT_* 환경 변수로 조정합니다.
+# CHECKPOINTER=sqlite 이면 CHECKPOINT_DB_PATH의 SQLite(WAL) 파일에 저장해 재시작 후에도 대화를 이어갑니다.
+CHECKPOINTER = os.environ.get("CHECKPOINTER", "memory").lower()
+
+
+def create_checkpointer():
+    """CHECKPOINTER 설정에 맞는 체크포인터를 만듭니다."""
+    if CHECKPOINTER == "sqlite":
+        return SQLiteCheckpointSaver()
+    return BoundedMemorySaver()
+
+
+checkpointer = create_checkpointer()
+
+# 컴파일된 그래프 캐시
+_compiled: Dict[str, Any] = {}
+_stats = {"compiles": 0, "compile_seconds": 0.0}
+
+
+def _builders() -> Dict[str, Callable]:
+    # supervisor가 이 모듈을 import하므로 빌더는 지연 import
+    from .main_graph import build_main_graph
+    from .subgraphs import get_cooking_subgraph
+
+    return {
+        "main": build_main_graph,
+        "cooking": get_cooking_subgraph,
+    }
+
+
+def set_checkpointer(saver) -> None:
+    """공용 체크포인터를 교체합니다. 이미 컴파일된 그래프는 버리고 다음 요청 때 다시 컴파일합니다."""
+    global checkpointer
+    checkpointer = saver
+    _compiled.clear()
+
+
+def get_graph(name: str):
+    """이름에 해당하는 그래프를 한 번만 컴파일해서 반환합니다."""
+    graph = _compiled.get(name)
+    if graph is not None:
+        return graph
+
+    builders = _builders()
+    if name not in builders:
+        raise KeyError(f"등록되지 않은 그래프입니다: {name}")
+
+    start = time.perf_counter()
+    saver = checkpointer if name == "main" else None
+    graph = builders[name]().compile(checkpointer=saver)
+    elapsed = time.perf_counter() - start
+
+    _compiled[name] = graph
+    _stats["compiles"] += 1
+    _stats["compile_seconds"] += elapsed
+    logger.info(f"그래프 '{name}' 컴파일 완료 ({elapsed * 1000:.1f}ms)")
+    return graph
+
+
+def close_checkpointer() -> None:
+    """종료 시 체크포인터의 남은 쓰기를 기록하고 연결을 닫습니다. (메모리 체크포인터는 할 일 없음)"""
+    close = getattr(checkpointer, "close", None)
+    if close is not None:
+        close()
+
+
+def get_registry_stats() -> dict:
+    return {**_stats, "graphs": sorted(_compiled)}
+
+
+async def warm_up() -> None:
+    """
+    서버 시작 시 호출하는 워밍업 훅입니다.
+    모든 그래프를 컴파일하고, MCP 연결과 ReAct 에이전트를 미리 준비합니다.
+    MCP 서버가 아직 떠 있지 않아도 실패를 로그로만 남기고 계속 진행합니다.
+    """
+    start = time.perf_counter()
+    for name in _builders():
+        get_graph(name)
+
+    from agents.chat_agent import get_chat_agent
+    from agents.cooking_subgraph.init_agent import get_init_cooking_agent
+    from agents.cooking_subgraph.step_agent import get_step_cooking_agent
+
+    results = await asyncio.gather(
+        get_chat_agent(),
+        get_init_cooking_agent(),
+        get_step_cooking_agent(),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning(f"에이전트 워밍업 실패 (첫 요청 때 다시 시도): {result}")
+    logger.info(f"그래프 워밍업 완료 ({(time.perf_counter() - start) * 1000:.1f}ms)")
@@ -1,18 +1,33 @@
 from langgraph.graph import StateGraph, END
 from utils.state import SmartHomeState
+from utils.history import invoke_with_compacted_history
+from utils.prefetch import cancel_cooking_prefetch, record_init_run, take_cooking_prefetch
+from langchain_core.runnables import RunnableConfig
 from agents.cooking_subgraph.init_agent import get_init_cooking_agent
 from agents.cooking_subgraph.step_agent import get_step_cooking_agent
 import asyncio
 
 # 쿠킹 init 노드 (비동기 agent 호출)
-async def cooking_init_node(state: SmartHomeState):
-    agent = await get_init_cooking_agent()
-    return await agent.ainvoke(state)
+async def cooking_init_node(state: SmartHomeState, config: RunnableConfig):
+    # 라우터가 시작한 프리패치(냉장고/주방기기/선호도)를 에이전트 준비와 겹쳐서 기다림
+    thread_id = config.get("configurable", {}).get("thread_id")
+    prefetch = asyncio.create_task(take_cooking_prefetch(thread_id))
+    try:
+        agent = await get_init_cooking_agent()
+    except BaseException:
+        # 에이전트를 만들지 못하면 프리패치도 버림 (기다리는 쪽 없이 MCP 호출이 남지 않도록)
+        prefetch.cancel()
+        cancel_cooking_prefetch(thread_id)
+        raise
+    context = await prefetch
+    result = await invoke_with_compacted_history(agent, {**state, "cooking_context": context}, config)
+    record_init_run(result["messages"], context)
+    return {**result, "cooking_context": context}
 
 # 쿠킹 step 노드 (비동기 agent 호출)
-async def cooking_step_node(state: SmartHomeState):
+async def cooking_step_node(state: SmartHomeState, config: RunnableConfig):
     agent = await get_step_cooking_agent()
-    return await agent.ainvoke(state)
+    return await invoke_with_compacted_history(agent, state, config)
 
 # 쿠킹 서브그래프 생성 함수
 def get_cooking_subgraph():
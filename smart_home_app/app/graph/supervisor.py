@@ -1,7 +1,10 @@
 from langgraph.graph import StateGraph, END, START
 from utils.state import SmartHomeState
+from utils.history import invoke_with_compacted_history
+from utils.prefetch import start_cooking_prefetch
+from langchain_core.runnables import RunnableConfig
 from agents.chat_agent import get_chat_agent
-from .subgraphs import get_cooking_subgraph
+from .registry import get_graph
 import asyncio
 import logging
 
@@ -10,13 +13,15 @@ logging.basicConfig(level=logging.INFO)
 
 
 # 라우터 노드: dict 반환, 'next' 키에 다음 노드 id를 명시해야 함
-def router_node(state: SmartHomeState):
+async def router_node(state: SmartHomeState, config: RunnableConfig):
     messages = state.get("messages", [])
     logger.info(f"================ super : {messages} ================")
     user_input = messages[-1].content if messages else ""
     if any(word in user_input for word in ["요리", "쿠킹", "레시피"]):
         state["system_mode"] = "cooking"
         logger.info(f"================ super state : {state} ================")
+        # 쿠킹 init 에이전트가 바로 계획을 세울 수 있도록 냉장고/주방기기/선호도 조회를 미리 시작
+        start_cooking_prefetch(config.get("configurable", {}).get("thread_id"))
         return {"next": "cooking"}  # 딕셔너리의 키만 반환
     else:
         state["system_mode"] = "normal"
@@ -38,14 +43,15 @@ def router_node(state: SmartHomeState):
 #         return {**state, "next": "chat"}
 
 # chat 노드 (비동기 agent 호출)
-async def chat_node(state: SmartHomeState):
+async def chat_node(state: SmartHomeState, config: RunnableConfig):
     agent = await get_chat_agent()
     logger.info(f"================ chat_node state {state}================")
-    return await agent.ainvoke(state)
+    # 토큰 예산에 맞게 압축한 이력으로 실행
+    return await invoke_with_compacted_history(agent, state, config)
 
 # cooking 서브그래프 노드 (비동기 agent 호출)
 async def cooking_node(state: SmartHomeState):
-    subgraph = get_cooking_subgraph().compile()
+    subgraph = get_graph("cooking")
     logger.info(f"================ cooking_node state {state}================")
     return await subgraph.ainvoke(state)
 
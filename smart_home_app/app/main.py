@@ -1,23 +1,19 @@
-from graph.main_graph import build_main_graph
+from graph.registry import get_graph, warm_up
 from utils.session import create_session
-from utils.logging import get_logger
+from utils.logging import get_logger, shutdown_logging
+from utils.tool_spans import tool_span_tracker
 import asyncio
 from langchain_core.messages import HumanMessage
-from langfuse.callback import CallbackHandler
-
-langfuse_handler = CallbackHandler(
-    public_key="",
-    secret_key="s",
-    host=""
-)
+from utils.tracing import close_tracer, get_tracer
 
 async def main():
     session_id = create_session()
     logger = get_logger(session_id)
 
-    # 그래프 빌드 및 컴파일
-    graph = build_main_graph()
-    graph = graph.compile()
+    # 레지스트리에서 컴파일된 그래프를 가져오고, MCP 연결/에이전트를 미리 준비
+    graph = get_graph("main")
+    await warm_up()
+    tracer = get_tracer()
 
     # 상태 초기화 (messages, system_mode 등만 사용)
     state = {
@@ -35,9 +31,17 @@ async def main():
             print("대화를 종료합니다. 감사합니다.")
             break
 
-        # 입력 메시지를 messages에 추가
-        state["messages"].append(HumanMessage(content=user_input))
-        result = await graph.ainvoke(input=state, config={"callbacks": [langfuse_handler]})
+        # 이번 턴의 입력 메시지만 전달 (이전 이력은 체크포인터에서 복원)
+        state["messages"] = [HumanMessage(content=user_input)]
+        # 대화 이력은 체크포인터가 세션(thread_id) 단위로 관리
+        trace = tracer.start("chat", session_id, input=user_input)
+        config = {"callbacks": [*trace.callbacks, tool_span_tracker], "configurable": {"thread_id": session_id}}
+        try:
+            result = await graph.ainvoke(input=state, config=config)
+        except Exception as e:
+            trace.finish(error=e)
+            raise
+        trace.finish(output=result["messages"][-1].content if result.get("messages") else None)
         logger.info(f"결과: {result}")
 
         # 마지막 content가 비어있지 않은 메시지 찾기
@@ -47,8 +51,6 @@ async def main():
                     print("=" * 50)
                     print(f"시스템: {msg.content}")
                     print("=" * 50)
-                    # 대화 이력에 AI 응답도 추가
-                    state["messages"].append(msg)
                     break
             else:
                 print("시스템: (응답이 없습니다.)")
@@ -56,4 +58,9 @@ async def main():
             print("시스템: (응답이 없습니다.)")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    try:
+        asyncio.run(main())
+    finally:
+        # 버퍼에 남은 trace와 로그를 내보내고 종료
+        close_tracer()
+        shutdown_logging()
\ No newline at end of file
@@ -1,11 +1,20 @@
+import asyncio
+import json
 import uuid
 from typing import Optional
 
 import uvicorn
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 
 from utils.graph_runner import GraphRunner
+from utils.scheduler import AdmissionRejected
+from utils.mcp_pool import close_mcp_manager, get_mcp_manager
+from utils.metrics import CONTENT_TYPE_LATEST, REGISTRY, MetricsMiddleware
+from utils.session import SessionStore, create_backend
+from utils.tracing import close_tracer
+from graph.registry import close_checkpointer, warm_up
 
 import logging
 logger = logging.getLogger("server")
@@ -15,6 +24,48 @@ app = FastAPI(title="Async Cooking Assistant")
 runner = GraphRunner()
 
 
+# 진행 중인 그래프 상태 정리 태스크 (가비지 컬렉션으로 사라지지 않도록 참조 유지)
+_drop_tasks: set = set()
+
+
+async def _adrop_graph_state(session_id: str, reason: str) -> None:
+    # 태스크가 실행되기 전에 같은 ID로 다시 들어온 세션이면 상태를 남겨 둠
+    if sessions.get(session_id) is not None:
+        return
+    try:
+        if await runner.adrop_session(session_id):
+            logger.info(f"세션 그래프 상태 정리: {session_id} ({reason})")
+    except Exception as e:
+        logger.warning(f"세션 그래프 상태 정리 실패 ({session_id}): {e}")
+
+
+def _drop_graph_state(session_id: str, reason: str) -> None:
+    # 만료/삭제된 세션의 체크포인트를 지워 메모리(또는 DB)를 돌려받음.
+    # on_evict는 요청 처리 중(이벤트 루프 위) 동기로 불리므로, 삭제는 태스크로 넘겨 루프를 막지 않음
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        if runner.drop_session(session_id):
+            logger.info(f"세션 그래프 상태 정리: {session_id} ({reason})")
+        return
+    task = loop.create_task(_adrop_graph_state(session_id, reason))
+    _drop_tasks.add(task)
+    task.add_done_callback(_drop_tasks.discard)
+
+
+# 활성 세션과 마지막 활동 시각 (SESSION_TTL_SECONDS 동안 요청이 없으면 그래프 상태까지 정리)
+sessions = SessionStore(backend=create_backend(), on_evict=_drop_graph_state)
+app.add_middleware(MetricsMiddleware, paths=("/chat", "/chat/stream", "/stats", "/sessions", "/metrics"))
+
+# 수집 시점에 현재 값을 읽는 게이지
+REGISTRY.gauge("graph_runs_in_flight", "Graph runs currently executing").set_function(
+    lambda: {(): runner.in_flight}
+)
+REGISTRY.gauge("mcp_tool_calls_in_flight", "MCP tool calls currently executing", ["server"]).set_function(
+    lambda: {(name,): count for name, count in get_mcp_manager().in_flight().items()}
+)
+
+
 class ChatRequest(BaseModel):
     session_id: Optional[str] = None
     message: str
@@ -25,6 +76,26 @@ class ChatResponse(BaseModel):
     response: str
 
 
+@app.on_event("startup")
+async def startup_event():
+    # 그래프 컴파일, MCP 연결, 에이전트 생성을 첫 요청 전에 끝내 둡니다.
+    await warm_up()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # 공용 MCP 세션 연결 종료
+    await close_mcp_manager()
+    # 진행 중인 세션 그래프 상태 정리를 마친 뒤 체크포인터를 닫음
+    if _drop_tasks:
+        await asyncio.gather(*_drop_tasks, return_exceptions=True)
+    # 체크포인터의 남은 쓰기 기록 (SQLite 사용 시)
+    close_checkpointer()
+    sessions.close()
+    # 버퍼에 남은 trace 내보내기
+    close_tracer()
+
+
 @app.post(
     "/chat", response_model=ChatResponse, summary="Process chat messages"
 )
@@ -34,7 +105,13 @@ async def chat(req: ChatRequest):
 
     session = req.session_id or str(uuid.uuid4())
     try:
-        answer = await runner.ask(session_id=session, user_input=req.message)
+        # 승인(스케줄러 슬롯 획득)된 뒤에만 세션 활동을 갱신 (거절된 요청이 세션을 살려 두지 않도록)
+        answer = await runner.ask(session_id=session, user_input=req.message, on_admitted=lambda: sessions.touch(session))
+    except AdmissionRejected as e:
+        # 과부하: 대기열에 쌓아 두지 않고 바로 돌려보냄
+        raise HTTPException(
+            status_code=429, detail=f"server busy ({e.reason})", headers={"Retry-After": str(e.retry_after)}
+        )
     except Exception as e:
         logger.error(f"Error processing chat message: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -42,5 +119,61 @@ async def chat(req: ChatRequest):
     return ChatResponse(session_id=session, response=answer)
 
 
+@app.get("/stats", summary="Runtime stats (scheduler, checkpointer, tool cache, tool selector, sessions)")
+async def stats():
+    return {**runner.stats(), "sessions": sessions.stats()}
+
+
+@app.get("/sessions", summary="Active sessions ordered by last activity")
+async def list_sessions(limit: int = 100):
+    return {"count": len(sessions), "sessions": sessions.active_sessions(limit=limit)}
+
+
+@app.get("/metrics", summary="Prometheus metrics (text exposition format)")
+async def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE_LATEST)
+
+
+def _sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+@app.post("/chat/stream", summary="Stream chat response as Server-Sent Events")
+async def chat_stream(req: ChatRequest):
+    if not req.message.strip():
+        raise HTTPException(status_code=400, detail="message is empty")
+
+    session = req.session_id or str(uuid.uuid4())
+    # 스트림을 시작한 뒤에는 상태 코드를 바꿀 수 없으므로 먼저 승인 여부를 확인
+    try:
+        runner.check_admission(session)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429, detail=f"server busy ({e.reason})", headers={"Retry-After": str(e.retry_after)}
+        )
+
+    async def event_source():
+        # 첫 이벤트로 세션 ID를 알려서 클라이언트가 다음 요청에 재사용할 수 있도록 함
+        yield _sse({"type": "session", "session_id": session})
+        try:
+            async for event in runner.stream(
+                session_id=session, user_input=req.message, on_admitted=lambda: sessions.touch(session)
+            ):
+                yield _sse(event)
+        except AdmissionRejected as e:
+            # 확인 뒤 대기 상한을 넘긴 경우
+            yield _sse({"type": "error", "status": 429, "detail": f"server busy ({e.reason})",
+                        "retry_after": e.retry_after})
+        except Exception as e:
+            logger.error(f"Error streaming chat message: {e}")
+            yield _sse({"type": "error", "detail": "Internal server error"})
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 if __name__ == "__main__":  # pragma: no cover
     uvicorn.run("server:app", host="0.0.0.0", port=8999, reload=True)
\ No newline at end of file
@@ -0,0 +1,258 @@
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, Optional
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.memory import MemorySaver
+
+logger = logging.getLogger("checkpointer")
+logging.basicConfig(level=logging.INFO)
+
+# 환경 변수 기본값
+DEFAULT_MAX_THREADS = int(os.environ.get("CHECKPOINT_MAX_THREADS", "1000"))
+DEFAULT_TTL_SECONDS = float(os.environ.get("CHECKPOINT_TTL_SECONDS", "3600"))
+DEFAULT_MAX_CHECKPOINTS_PER_THREAD = int(os.environ.get("CHECKPOINT_MAX_PER_THREAD", "10"))
+DEFAULT_SPILL_DIR = os.environ.get("CHECKPOINT_SPILL_DIR") or None
+
+
+class BoundedMemorySaver(MemorySaver):
+    """
+    메모리 사용량이 제한된 MemorySaver 입니다.
+    - 스레드(thread_id) 단위 LRU + TTL 축출
+    - 스레드별로 (서브그래프 네임스페이스 포함) 최신 N개 체크포인트만 유지
+    - spill_dir를 지정하면 축출된 스레드를 디스크에 저장했다가 다시 접근할 때 복원
+    """
+
+    def __init__(
+        self,
+        *,
+        max_threads: int = DEFAULT_MAX_THREADS,
+        ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS,
+        max_checkpoints_per_thread: int = DEFAULT_MAX_CHECKPOINTS_PER_THREAD,
+        spill_dir: Optional[str] = DEFAULT_SPILL_DIR,
+        serde=None,
+    ) -> None:
+        super().__init__(serde=serde)
+        self.max_threads = max_threads
+        self.ttl_seconds = ttl_seconds
+        self.max_checkpoints_per_thread = max_checkpoints_per_thread
+        self.spill_dir = spill_dir
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+        self._lock = threading.RLock()
+        # thread_id -> 마지막 접근 시각 (오래된 순서)
+        self._last_access: "OrderedDict[str, float]" = OrderedDict()
+        # thread_id -> writes/blobs 키 목록 (전체 키를 훑지 않고 스레드 단위로 삭제하기 위함)
+        self._write_keys: Dict[str, set] = {}
+        self._blob_keys: Dict[str, set] = {}
+        self.counters = {
+            "evicted_lru": 0,
+            "evicted_ttl": 0,
+            "pruned_checkpoints": 0,
+            "spilled": 0,
+            "restored": 0,
+        }
+
+    # --- 접근 기록 / 축출 ---
+    def _touch(self, thread_id: str) -> None:
+        self._last_access[thread_id] = time.monotonic()
+        self._last_access.move_to_end(thread_id)
+
+    def _enforce_limits(self) -> None:
+        now = time.monotonic()
+        if self.ttl_seconds is not None:
+            while self._last_access:
+                thread_id, last = next(iter(self._last_access.items()))
+                if now - last < self.ttl_seconds:
+                    break
+                self._evict(thread_id)
+                self.counters["evicted_ttl"] += 1
+        while len(self._last_access) > self.max_threads:
+            thread_id = next(iter(self._last_access))
+            self._evict(thread_id)
+            self.counters["evicted_lru"] += 1
+
+    def _evict(self, thread_id: str) -> None:
+        if self.spill_dir:
+            self._spill(thread_id)
+        self._drop_thread(thread_id)
+
+    def _drop_thread(self, thread_id: str) -> None:
+        self._last_access.pop(thread_id, None)
+        self.storage.pop(thread_id, None)
+        for key in self._write_keys.pop(thread_id, ()):
+            self.writes.pop(key, None)
+        for key in self._blob_keys.pop(thread_id, ()):
+            self.blobs.pop(key, None)
+
+    def sweep(self) -> None:
+        """TTL이 지난 스레드를 정리합니다. (요청이 없을 때 주기적으로 호출 가능)"""
+        with self._lock:
+            self._enforce_limits()
+
+    # --- 디스크 spill ---
+    def _spill_path(self, thread_id: str) -> str:
+        digest = hashlib.sha1(thread_id.encode("utf-8")).hexdigest()
+        return os.path.join(self.spill_dir, f"{digest}.ckpt")
+
+    def _spill(self, thread_id: str) -> None:
+        # 저장되는 값은 이미 직렬화된 (type, bytes) 튜플이므로 그대로 pickle
+        payload = {
+            "thread_id": thread_id,
+            "storage": {ns: dict(checkpoints) for ns, checkpoints in self.storage.get(thread_id, {}).items()},
+            "writes": {key: self.writes[key] for key in self._write_keys.get(thread_id, ()) if key in self.writes},
+            "blobs": {key: self.blobs[key] for key in self._blob_keys.get(thread_id, ()) if key in self.blobs},
+        }
+        with open(self._spill_path(thread_id), "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self.counters["spilled"] += 1
+
+    def _restore(self, thread_id: str) -> None:
+        if not self.spill_dir or thread_id in self._last_access:
+            return
+        path = self._spill_path(thread_id)
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+        os.remove(path)
+        for ns, checkpoints in payload["storage"].items():
+            self.storage[thread_id][ns].update(checkpoints)
+        self.writes.update(payload["writes"])
+        self.blobs.update(payload["blobs"])
+        self._write_keys[thread_id] = set(payload["writes"])
+        self._blob_keys[thread_id] = set(payload["blobs"])
+        self.counters["restored"] += 1
+        logger.info(f"디스크에서 스레드 복원: {thread_id}")
+
+    # --- 스레드별 체크포인트 개수 제한 ---
+    def _prune(self, thread_id: str) -> None:
+        """
+        스레드 전체(모든 네임스페이스)에서 최신 max_checkpoints_per_thread개만 남깁니다.
+        서브그래프는 실행마다 새 네임스페이스(cooking:<task_id>)를 만들므로, 남은 가장 오래된 루트 체크포인트보다
+        오래된 서브그래프 체크포인트(끝난 서브그래프 실행의 이력)는 네임스페이스째 정리합니다. (sqlite_checkpointer와 같은 규칙)
+        """
+        namespaces = self.storage[thread_id]
+        # 체크포인트 id는 네임스페이스와 관계없이 시간순으로 정렬 가능
+        entries = sorted(
+            ((checkpoint_id, checkpoint_ns) for checkpoint_ns, checkpoints in namespaces.items() for checkpoint_id in checkpoints),
+            reverse=True,
+        )
+        keep = set(entries[:self.max_checkpoints_per_thread])
+        roots = namespaces.get("")
+        if roots and not any(checkpoint_ns == "" for _, checkpoint_ns in keep):
+            # 다음 실행을 이어가려면 최신 루트 체크포인트는 항상 필요
+            keep.add((max(roots), ""))
+        oldest_root = min((checkpoint_id for checkpoint_id, checkpoint_ns in keep if checkpoint_ns == ""), default=None)
+        drop = [
+            (checkpoint_id, checkpoint_ns) for checkpoint_id, checkpoint_ns in entries
+            if (checkpoint_id, checkpoint_ns) not in keep
+            or (checkpoint_ns != "" and oldest_root is not None and checkpoint_id < oldest_root)
+        ]
+        if not drop:
+            return
+
+        write_keys = self._write_keys.get(thread_id, set())
+        for checkpoint_id, checkpoint_ns in drop:
+            del namespaces[checkpoint_ns][checkpoint_id]
+            key = (thread_id, checkpoint_ns, checkpoint_id)
+            self.writes.pop(key, None)
+            write_keys.discard(key)
+        for checkpoint_ns in [ns for ns, checkpoints in namespaces.items() if not checkpoints]:
+            del namespaces[checkpoint_ns]
+        self.counters["pruned_checkpoints"] += len(drop)
+
+        # 남은 체크포인트가 참조하지 않는 채널 값(blob) 정리 (없어진 네임스페이스의 blob 포함)
+        referenced = set()
+        for checkpoint_ns, checkpoints in namespaces.items():
+            for saved_checkpoint, _, _ in checkpoints.values():
+                versions = self.serde.loads_typed(saved_checkpoint).get("channel_versions", {})
+                referenced.update((thread_id, checkpoint_ns, channel, version) for channel, version in versions.items())
+        blob_keys = self._blob_keys.get(thread_id, set())
+        for key in [k for k in blob_keys if k not in referenced]:
+            self.blobs.pop(key, None)
+            blob_keys.discard(key)
+
+    # --- BaseCheckpointSaver 구현 ---
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            self._restore(thread_id)
+            if thread_id not in self.storage:
+                return None
+            self._touch(thread_id)
+            return super().get_tuple(config)
+
+    def list(self, config: Optional[RunnableConfig], **kwargs: Any) -> Iterator[CheckpointTuple]:
+        with self._lock:
+            if config is not None:
+                self._restore(config["configurable"]["thread_id"])
+            items = list(super().list(config, **kwargs))
+        yield from items
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self._lock:
+            self._restore(thread_id)
+            result = super().put(config, checkpoint, metadata, new_versions)
+            self._blob_keys.setdefault(thread_id, set()).update(
+                (thread_id, checkpoint_ns, channel, version) for channel, version in new_versions.items()
+            )
+            self._touch(thread_id)
+            self._prune(thread_id)
+            self._enforce_limits()
+            return result
+
+    def put_writes(self, config: RunnableConfig, writes, task_id: str, task_path: str = "") -> None:
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            self._restore(thread_id)
+            super().put_writes(config, writes, task_id, task_path)
+            key = (thread_id, config["configurable"].get("checkpoint_ns", ""), config["configurable"]["checkpoint_id"])
+            self._write_keys.setdefault(thread_id, set()).add(key)
+            self._touch(thread_id)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._drop_thread(thread_id)
+            if self.spill_dir and os.path.exists(self._spill_path(thread_id)):
+                os.remove(self._spill_path(thread_id))
+
+    # --- 리포트 ---
+    def stats(self) -> dict:
+        """보유 스레드/체크포인트 수, 대략적인 메모리 사용량(직렬화 바이트), 축출 횟수를 반환합니다."""
+        with self._lock:
+            checkpoint_count = 0
+            namespace_count = 0
+            size = 0
+            for namespaces in self.storage.values():
+                namespace_count += len(namespaces)
+                for checkpoints in namespaces.values():
+                    checkpoint_count += len(checkpoints)
+                    for saved_checkpoint, saved_metadata, _ in checkpoints.values():
+                        size += len(saved_checkpoint[1]) + len(saved_metadata[1])
+            for outer in self.writes.values():
+                size += sum(len(value[2][1]) for value in outer.values())
+            size += sum(len(value[1]) for value in self.blobs.values())
+            return {
+                "threads": len(self._last_access),
+                "namespaces": namespace_count,
+                "checkpoints": checkpoint_count,
+                "blobs": len(self.blobs),
+                "approx_bytes": size,
+                **self.counters,
+            }
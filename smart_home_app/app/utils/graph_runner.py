@@ -1,27 +1,84 @@
 import asyncio
 import logging
-from langfuse.callback import CallbackHandler
-from graph.main_graph import build_main_graph
-from langgraph.checkpoint.memory import MemorySaver
+from graph.registry import get_graph, checkpointer
+from utils.scheduler import SessionScheduler
+from utils.tool_cache import get_tool_cache
+from utils.tool_spans import tool_span_tracker
+from utils.tool_selector import get_tool_selector_stats
+from utils.prefetch import get_prefetch_stats
+from utils.metrics import metrics_handler
+from utils.tracing import get_tracer
+from utils.history import compactor
 
 from langchain_core.messages import HumanMessage
+from typing import AsyncIterator, Callable, Optional
 import logging
 
 logger = logging.getLogger("runner")
 logging.basicConfig(level=logging.INFO)
-memory= MemorySaver()
+# 그래프 레지스트리와 공유하는 체크포인터
+memory = checkpointer
 
 class GraphRunner:
-    def __init__(self) -> None:
-        
-        self._graph = build_main_graph().compile(checkpointer=memory)
-        self._lock = asyncio.Lock()
-        self.langfuse_handler =  CallbackHandler(
-            public_key="",
-            secret_key="",
-            host=""
-        )
-    async def ask(self, *, session_id: str, user_input: str) -> str:
+    def __init__(self, graph=None, max_concurrency: int | None = None) -> None:
+        # graph를 주입하면 그대로 사용 (벤치마크/테스트용), 없으면 레지스트리에서 한 번만 컴파일된 메인 그래프 사용
+        self._graph = graph if graph is not None else get_graph("main")
+        # 같은 세션은 직렬, 다른 세션은 병렬로 실행 (전역 락 대신)
+        self._scheduler = SessionScheduler(max_concurrency=max_concurrency)
+        # 샘플된 세션만 span을 수집하고, 나머지는 실패했을 때만 요약 trace를 남김
+        self._tracer = get_tracer()
+
+    @property
+    def in_flight(self) -> int:
+        """현재 실행 중인 그래프 실행 수"""
+        return self._scheduler.in_flight
+
+    def stats(self) -> dict:
+        """스케줄러, 체크포인터, MCP 도구 캐시/실행 구간, 도구 선택기, 쿠킹 프리패치 상태를 반환합니다."""
+        saver = getattr(self._graph, "checkpointer", None)
+        return {
+            "scheduler": self._scheduler.stats(),
+            "checkpointer": saver.stats() if hasattr(saver, "stats") else None,
+            "tool_cache": get_tool_cache().stats(),
+            "tool_spans": tool_span_tracker.stats(),
+            "tool_selector": get_tool_selector_stats(),
+            "cooking_prefetch": get_prefetch_stats(),
+            "tracing": self._tracer.stats(),
+        }
+
+    def check_admission(self, session_id: str) -> None:
+        """지금 이 세션의 요청을 받을 수 있는지 확인합니다. (받을 수 없으면 AdmissionRejected)"""
+        self._scheduler.check_admission(session_id)
+
+    def drop_session(self, session_id: str) -> bool:
+        """
+        세션의 그래프 상태(체크포인트, 이력 요약 캐시)를 지웁니다. 실행 중인 세션은 건너뛰고 False를 반환합니다.
+        SQLite 체크포인터는 writer 스레드의 완료를 기다리므로, 이벤트 루프 위에서는 adrop_session을 씁니다.
+        """
+        if self._scheduler.is_active(session_id):
+            return False
+        compactor.forget(session_id)
+        saver = getattr(self._graph, "checkpointer", None)
+        if saver is None:
+            return False
+        saver.delete_thread(session_id)
+        return True
+
+    async def adrop_session(self, session_id: str) -> bool:
+        """drop_session의 비동기 버전 (체크포인트 삭제를 기다리는 동안 이벤트 루프를 막지 않음)"""
+        if self._scheduler.is_active(session_id):
+            return False
+        compactor.forget(session_id)
+        saver = getattr(self._graph, "checkpointer", None)
+        if saver is None:
+            return False
+        await saver.adelete_thread(session_id)
+        return True
+
+    def _config(self, session_id: str, trace) -> dict:
+        return {"callbacks": [*trace.callbacks, tool_span_tracker, *metrics_handler.callbacks()], "configurable": {"thread_id": session_id}}
+
+    async def ask(self, *, session_id: str, user_input: str, on_admitted: Optional[Callable[[], None]] = None) -> str:
         logger.info(
             f"GraphRunner received user input: {user_input} "
             f"for session: {session_id}"
@@ -33,20 +90,91 @@ class GraphRunner:
             "current_step": None
          }
 
-        callbacks = []
-
-        async with self._lock:
+        async with self._scheduler.slot(session_id):
+            if on_admitted is not None:
+                on_admitted()
+            trace = self._tracer.start("chat", session_id, input=user_input)
             try:
                 state["messages"].append(HumanMessage(content=user_input))
-                final_state = await self._graph.ainvoke(input=state, config={"callbacks": [self.langfuse_handler],"configurable": {"thread_id": session_id}})
-              
+                final_state = await self._graph.ainvoke(input=state, config=self._config(session_id, trace))
+                response = final_state["messages"][-1].content
+                trace.finish(output=response)
             except Exception as e:
                 logger.error(f"Graph execution error: {e}")
+                trace.finish(error=e)
                 raise
+            finally:
+                # 클라이언트 연결이 끊겨 취소되면 위의 finish에 닿지 못하므로 취소로 마무리 (이미 끝났으면 무시됨)
+                trace.finish(status="cancelled")
+
+        logger.info(f"response: { response}")
 
-        
+        return response
+
+    async def stream(
+        self, *, session_id: str, user_input: str, on_admitted: Optional[Callable[[], None]] = None
+    ) -> AsyncIterator[dict]:
+        """
+        그래프를 astream_events로 실행하면서 이벤트를 순서대로 내보냅니다.
+        on_admitted는 스케줄러 슬롯을 얻은 직후(승인된 뒤) 한 번 호출됩니다. (ask도 같음)
+        - token      : LLM 토큰 조각
+        - tool_start : 도구 호출 시작 (이름, 입력)
+        - tool_end   : 도구 호출 종료 (이름, 출력 일부)
+        - final      : 최종 응답 (/chat 응답과 동일)
+        """
+        logger.info(
+            f"GraphRunner received streaming input: {user_input} "
+            f"for session: {session_id}"
+        )
+        state = {
+            "messages": [HumanMessage(content=user_input)],
+            "system_mode": "normal",
+            "recipe": None,
+            "current_step": None
+        }
+        async with self._scheduler.slot(session_id):
+            if on_admitted is not None:
+                on_admitted()
+            trace = self._tracer.start("chat_stream", session_id, input=user_input)
+            config = self._config(session_id, trace)
+            try:
+                async for event in self._graph.astream_events(state, config=config, version="v2"):
+                    kind = event["event"]
+                    if kind == "on_chat_model_stream":
+                        text = _chunk_text(event["data"].get("chunk"))
+                        if text:
+                            yield {"type": "token", "content": text, "node": event.get("metadata", {}).get("langgraph_node")}
+                    elif kind == "on_tool_start":
+                        yield {"type": "tool_start", "name": event["name"], "input": event["data"].get("input")}
+                    elif kind == "on_tool_end":
+                        output = event["data"].get("output")
+                        output = getattr(output, "content", output)
+                        yield {"type": "tool_end", "name": event["name"], "output": str(output)[:1000]}
+
+                final_state = await self._graph.aget_state(config)
+                messages = final_state.values.get("messages", [])
+                response = messages[-1].content if messages else ""
+                trace.finish(output=response)
+            except Exception as e:
+                logger.error(f"Graph streaming error: {e}")
+                trace.finish(error=e)
+                raise
+            finally:
+                # 클라이언트가 끊기면 제너레이터가 yield 지점에서 취소/aclose되어 위의 finish에 닿지 못함
+                trace.finish(status="cancelled")
 
-        response = final_state["messages"][-1].content
         logger.info(f"response: { response}")
+        yield {"type": "final", "response": response}
+
 
-        return response
\ No newline at end of file
+def _chunk_text(chunk) -> str:
+    """LLM 스트림 청크에서 텍스트만 추출합니다. (Gemini는 content가 리스트일 수 있음)"""
+    content = getattr(chunk, "content", None)
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            part.get("text", "") if isinstance(part, dict) else str(part)
+            for part in content
+        )
+    return ""
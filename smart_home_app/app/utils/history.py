@@ -0,0 +1,189 @@
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+
+logger = logging.getLogger("history")
+logging.basicConfig(level=logging.INFO)
+
+# 에이전트에 넘길 대화 이력의 토큰 예산과 그대로 유지할 최근 턴 수
+HISTORY_TOKEN_BUDGET = int(os.environ.get("HISTORY_TOKEN_BUDGET", "6000"))
+HISTORY_KEEP_TURNS = int(os.environ.get("HISTORY_KEEP_TURNS", "4"))
+# 도구 결과 요약에 남길 최대 글자 수
+SUMMARY_MAX_CHARS = 200
+# 요약 캐시를 유지할 최대 스레드 수
+SUMMARY_CACHE_THREADS = 1000
+
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 없이 토큰 수를 대략 계산합니다. (영문 약 4자/토큰, 한글 등은 약 1.5자/토큰)"""
+    if not text:
+        return 0
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    other_chars = len(text) - ascii_chars
+    return ascii_chars // 4 + int(other_chars / 1.5) + 1
+
+
+def _content_text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return json.dumps(content, ensure_ascii=False, default=str)
+
+
+def message_tokens(message: BaseMessage) -> int:
+    tokens = estimate_tokens(_content_text(message)) + 4
+    for call in getattr(message, "tool_calls", None) or []:
+        tokens += estimate_tokens(call.get("name", "")) + estimate_tokens(json.dumps(call.get("args", {}), ensure_ascii=False))
+    return tokens
+
+
+class HistoryCompactor:
+    """
+    ReAct 실행 전에 대화 이력을 토큰 예산 안으로 줄입니다.
+    - SystemMessage와 최근 keep_turns개 턴은 그대로 유지
+    - 그 이전 턴의 (도구 호출 AIMessage + ToolMessage) 묶음은 한 줄짜리 요약 AIMessage로 대체
+    - 그래도 예산을 넘으면 오래된 메시지부터 제거
+    도구 호출 요약은 스레드별로 캐시해서 매 턴 다시 만들지 않습니다.
+    """
+
+    def __init__(self, token_budget: int = HISTORY_TOKEN_BUDGET, keep_turns: int = HISTORY_KEEP_TURNS) -> None:
+        self.token_budget = token_budget
+        self.keep_turns = keep_turns
+        self._lock = threading.Lock()
+        # thread_id -> {tool_call AIMessage id: 요약 메시지}
+        self._summaries: "OrderedDict[str, Dict[str, AIMessage]]" = OrderedDict()
+        self.stats = {"runs": 0, "compacted_runs": 0, "summaries_built": 0, "summary_cache_hits": 0, "tokens_saved": 0}
+
+    def _summary_cache(self, thread_id: Optional[str]) -> Dict[str, AIMessage]:
+        key = thread_id or ""
+        with self._lock:
+            cache = self._summaries.get(key)
+            if cache is None:
+                cache = {}
+                self._summaries[key] = cache
+                while len(self._summaries) > SUMMARY_CACHE_THREADS:
+                    self._summaries.popitem(last=False)
+            else:
+                self._summaries.move_to_end(key)
+            return cache
+
+    def forget(self, thread_id: str) -> None:
+        """세션이 정리될 때 해당 스레드의 요약 캐시를 버립니다."""
+        with self._lock:
+            self._summaries.pop(thread_id, None)
+
+    @staticmethod
+    def _split_turns(messages: List[BaseMessage]) -> List[List[BaseMessage]]:
+        turns: List[List[BaseMessage]] = []
+        for message in messages:
+            if isinstance(message, HumanMessage) or not turns:
+                turns.append([])
+            turns[-1].append(message)
+        return turns
+
+    def _summarize_tool_step(self, call_message: AIMessage, observations: List[ToolMessage]) -> AIMessage:
+        results = {obs.tool_call_id: _content_text(obs) for obs in observations}
+        parts = []
+        for call in call_message.tool_calls:
+            args = json.dumps(call.get("args", {}), ensure_ascii=False)
+            result = results.get(call.get("id"), "")
+            if len(result) > SUMMARY_MAX_CHARS:
+                result = result[:SUMMARY_MAX_CHARS] + "..."
+            parts.append(f"{call.get('name')}({args}) → {result}")
+        text = "[이전 도구 호출 요약] " + " / ".join(parts)
+        if isinstance(call_message.content, str) and call_message.content.strip():
+            text = f"{call_message.content.strip()}\n{text}"
+        return AIMessage(content=text)
+
+    def _collapse_turn(self, turn: List[BaseMessage], cache: Dict[str, AIMessage]) -> List[BaseMessage]:
+        collapsed: List[BaseMessage] = []
+        i = 0
+        while i < len(turn):
+            message = turn[i]
+            if isinstance(message, AIMessage) and message.tool_calls:
+                j = i + 1
+                observations = []
+                while j < len(turn) and isinstance(turn[j], ToolMessage):
+                    observations.append(turn[j])
+                    j += 1
+                cache_key = message.id or f"{i}:{message.tool_calls[0].get('id')}"
+                summary = cache.get(cache_key)
+                if summary is None:
+                    summary = self._summarize_tool_step(message, observations)
+                    cache[cache_key] = summary
+                    self.stats["summaries_built"] += 1
+                else:
+                    self.stats["summary_cache_hits"] += 1
+                collapsed.append(summary)
+                i = j
+            elif isinstance(message, ToolMessage):
+                # 짝이 되는 호출 메시지가 없는 관찰 결과는 버림
+                i += 1
+            else:
+                collapsed.append(message)
+                i += 1
+        return collapsed
+
+    def compact(self, messages: List[BaseMessage], thread_id: Optional[str] = None) -> List[BaseMessage]:
+        """예산 안으로 줄인 메시지 목록을 반환합니다. (원본 목록은 수정하지 않음)"""
+        self.stats["runs"] += 1
+        original_tokens = sum(message_tokens(m) for m in messages)
+        if original_tokens <= self.token_budget:
+            return list(messages)
+
+        system = [m for m in messages if isinstance(m, SystemMessage)]
+        turns = self._split_turns([m for m in messages if not isinstance(m, SystemMessage)])
+        recent_turns = turns[-self.keep_turns:] if self.keep_turns > 0 else []
+        older_turns = turns[: len(turns) - len(recent_turns)]
+
+        cache = self._summary_cache(thread_id)
+        older: List[BaseMessage] = []
+        for turn in older_turns:
+            older.extend(self._collapse_turn(turn, cache))
+        recent = [m for turn in recent_turns for m in turn]
+
+        fixed_tokens = sum(message_tokens(m) for m in system + recent)
+        remaining = self.token_budget - fixed_tokens
+        kept_older: List[BaseMessage] = []
+        # 최근 것부터 예산이 허락하는 만큼 유지
+        for message in reversed(older):
+            cost = message_tokens(message)
+            if cost > remaining:
+                break
+            kept_older.append(message)
+            remaining -= cost
+        kept_older.reverse()
+        # 잘린 앞부분이 AI 메시지로 시작하지 않도록 정리 (모델은 사용자 메시지로 시작하는 대화를 기대)
+        while kept_older and not isinstance(kept_older[0], HumanMessage):
+            kept_older.pop(0)
+
+        result = system + kept_older + recent
+        saved = original_tokens - sum(message_tokens(m) for m in result)
+        self.stats["compacted_runs"] += 1
+        self.stats["tokens_saved"] += saved
+        logger.info(f"대화 이력 압축: {len(messages)} → {len(result)} 메시지, 약 {saved} 토큰 절약 (thread={thread_id})")
+        return result
+
+
+# 프로세스 공용 인스턴스
+compactor = HistoryCompactor()
+
+
+def compact_messages(messages: List[BaseMessage], thread_id: Optional[str] = None) -> List[BaseMessage]:
+    return compactor.compact(messages, thread_id)
+
+
+async def invoke_with_compacted_history(agent, state: dict, config: Optional[dict] = None) -> dict:
+    """
+    압축한 이력으로 ReAct 에이전트를 실행하고, 새로 생성된 메시지만 반환합니다.
+    (압축본은 LLM 입력용일 뿐이므로 그래프 상태의 원본 이력은 그대로 둡니다)
+    """
+    thread_id = (config or {}).get("configurable", {}).get("thread_id")
+    compacted = compact_messages(state.get("messages", []), thread_id)
+    result = await agent.ainvoke({**state, "messages": compacted}, config)
+    return {"messages": result["messages"][len(compacted):]}
@@ -1,20 +1,170 @@
 from loguru import logger
+import glob
 import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+
+LOG_DIR = os.environ.get("LOG_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs'))
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+# production에서는 diagnose(예외 시 변수 값 출력)를 끔: 느리고, 토큰/개인정보가 로그에 남을 수 있음
+APP_ENV = os.environ.get("APP_ENV", "development").lower()
+LOG_DIAGNOSE = os.environ.get("LOG_DIAGNOSE", "0" if APP_ENV == "production" else "1") == "1"
+# 1이면 한 줄에 JSON 레코드 하나 (loguru serialize)
+LOG_SERIALIZE = os.environ.get("LOG_SERIALIZE", "0") == "1"
+# 동시에 열어 둘 세션 로그 파일 수 (넘으면 가장 오래 안 쓴 파일부터 닫음)
+LOG_MAX_OPEN_FILES = int(os.environ.get("LOG_MAX_OPEN_FILES", "128"))
+LOG_ROTATION_BYTES = int(float(os.environ.get("LOG_ROTATION_MB", "10")) * 1024 * 1024)
+LOG_RETENTION_DAYS = float(os.environ.get("LOG_RETENTION_DAYS", "10"))
+
+LOG_FORMAT = "{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {name}:{function}:{line} - {message}"
+DEFAULT_LOG_NAME = "smart_home.log"
+
+
+class SessionFileRouter:
+    """
+    로그 레코드를 바인딩된 session_id에 따라 세션별 파일로 나눠 쓰는 loguru sink입니다.
+    - session_id가 없으면 smart_home.log에 기록합니다.
+    - 열린 파일은 LRU 캐시(max_open_files)로 관리해 세션 수와 무관하게 파일 핸들 수가 묶입니다.
+    - 파일이 rotation_bytes를 넘으면 시각을 붙인 이름으로 옮기고, retention_days보다 오래된 파일은 지웁니다.
+    enqueue=True로 등록하면 loguru의 워커 스레드 하나에서만 호출됩니다.
+    """
+
+    def __init__(
+        self,
+        directory: str = LOG_DIR,
+        max_open_files: int = LOG_MAX_OPEN_FILES,
+        rotation_bytes: int = LOG_ROTATION_BYTES,
+        retention_days: Optional[float] = LOG_RETENTION_DAYS,
+    ) -> None:
+        self.directory = directory
+        self.max_open_files = max(max_open_files, 1)
+        self.rotation_bytes = rotation_bytes
+        self.retention_days = retention_days
+        # 경로 -> [파일 핸들, 현재 크기(바이트)]
+        self._files: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"records": 0, "opened": 0, "evicted": 0, "rotated": 0, "removed": 0}
+        os.makedirs(directory, exist_ok=True)
+        self.remove_expired()
+
+    def _path(self, session_id: Optional[str]) -> str:
+        if not session_id:
+            return os.path.join(self.directory, DEFAULT_LOG_NAME)
+        # 경로 구분자가 파일 이름에 들어가지 않도록 정리
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in str(session_id))
+        return os.path.join(self.directory, f"session_{safe}.log")
+
+    def _open(self, path: str) -> list:
+        entry = self._files.get(path)
+        if entry is not None:
+            self._files.move_to_end(path)
+            return entry
+        while len(self._files) >= self.max_open_files:
+            _, (oldest, _) = self._files.popitem(last=False)
+            oldest.close()
+            self.counters["evicted"] += 1
+        # 버퍼 없이 레코드마다 write 한 번: 크래시 때 큐에서 꺼낸 레코드를 잃지 않음
+        handle = open(path, "ab", buffering=0)
+        entry = [handle, os.path.getsize(path)]
+        self._files[path] = entry
+        self.counters["opened"] += 1
+        return entry
+
+    def _rotate(self, path: str) -> None:
+        handle, _ = self._files.pop(path)
+        handle.close()
+        root, ext = os.path.splitext(path)
+        os.replace(path, f"{root}.{datetime.now().strftime('%Y-%m-%d_%H-%M-%S_%f')}{ext}")
+        self.counters["rotated"] += 1
+        self.remove_expired()
+
+    def remove_expired(self) -> None:
+        """retention_days보다 오래 수정되지 않은 로그 파일을 지웁니다. (열려 있는 파일 제외)"""
+        if not self.retention_days:
+            return
+        cutoff = time.time() - self.retention_days * 86400
+        for path in glob.glob(os.path.join(self.directory, "*.log")):
+            if path in self._files:
+                continue
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    self.counters["removed"] += 1
+            except OSError:
+                pass
+
+    def __call__(self, message) -> None:
+        path = self._path(message.record["extra"].get("session_id"))
+        data = message.encode("utf-8")
+        with self._lock:
+            entry = self._open(path)
+            entry[0].write(data)
+            entry[1] += len(data)
+            self.counters["records"] += 1
+            if self.rotation_bytes and entry[1] >= self.rotation_bytes:
+                self._rotate(path)
+
+    def close(self) -> None:
+        with self._lock:
+            for handle, _ in self._files.values():
+                handle.close()
+            self._files.clear()
+
+    def stats(self) -> dict:
+        return {"open_files": len(self._files), "max_open_files": self.max_open_files, **self.counters}
+
+
+_router: Optional[SessionFileRouter] = None
+_sink_id: Optional[int] = None
+_setup_lock = threading.Lock()
+
+
+def setup_logging(directory: Optional[str] = None) -> SessionFileRouter:
+    """
+    파일 로그 sink를 한 번만 등록합니다. (비동기 큐 하나 + 세션별 파일 라우팅)
+    여러 번 호출해도 sink와 큐 스레드는 하나입니다.
+    """
+    global _router, _sink_id
+    with _setup_lock:
+        if _router is None:
+            _router = SessionFileRouter(directory or LOG_DIR)
+            _sink_id = logger.add(
+                _router,
+                level=LOG_LEVEL,
+                format=LOG_FORMAT,
+                serialize=LOG_SERIALIZE,
+                enqueue=True,
+                backtrace=LOG_DIAGNOSE,
+                diagnose=LOG_DIAGNOSE,
+            )
+        return _router
 
-LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs')
-os.makedirs(LOG_DIR, exist_ok=True)
 
 def get_logger(session_id: str = None):
     """
-    세션별 로그 파일을 생성하고 logger를 반환합니다.
+    session_id를 바인딩한 logger를 반환합니다. 레코드는 session_{session_id}.log에 기록됩니다.
     session_id가 없으면 smart_home.log에 기록합니다.
     """
-    if session_id:
-        log_path = os.path.join(LOG_DIR, f"session_{session_id}.log")
-    else:
-        log_path = os.path.join(LOG_DIR, "smart_home.log")
-    logger.add(log_path, rotation="10 MB", retention="10 days", enqueue=True, backtrace=True, diagnose=True)
-    return logger
+    setup_logging()
+    return logger.bind(session_id=session_id)
+
+
+def shutdown_logging() -> None:
+    """큐에 남은 레코드를 모두 쓰고 sink와 열린 파일을 닫습니다."""
+    global _router, _sink_id
+    with _setup_lock:
+        if _sink_id is not None:
+            # remove는 큐가 빌 때까지 기다린 뒤 워커 스레드를 멈춤
+            logger.remove(_sink_id)
+            _router.close()
+        _router, _sink_id = None, None
+
+
+def get_logging_stats() -> dict:
+    return _router.stats() if _router is not None else {}
 
 # 사용 예시:
 # log = get_logger(session_id)
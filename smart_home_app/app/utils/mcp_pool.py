@@ -0,0 +1,333 @@
+import os
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from langchain_core.tools import BaseTool, StructuredTool, ToolException
+from langchain_mcp_adapters.client import MultiServerMCPClient
+
+from utils.metrics import observe_tool_call
+from utils.tool_cache import ToolResultCache, get_tool_cache
+
+logger = logging.getLogger("mcp_pool")
+logging.basicConfig(level=logging.INFO)
+
+# MCP 서버 URL 설정 (chat/cooking 에이전트 공용)
+MCP_SERVERS = {
+    "refrigerator": {
+        "url": os.environ.get("REFRIGERATOR_MCP_URL", "http://localhost:10001/sse"),
+        "transport": "sse",
+    },
+    "induction": {
+        "url": os.environ.get("INDUCTION_MCP_URL", "http://localhost:10002/sse"),
+        "transport": "sse",
+    },
+    "microwave": {
+        "url": os.environ.get("MICROWAVE_MCP_URL", "http://localhost:10003/sse"),
+        "transport": "sse",
+    },
+    "mobile": {
+        "url": os.environ.get("MOBILE_MCP_URL", "http://localhost:10004/sse"),
+        "transport": "sse",
+    },
+    "cooking": {
+        "url": os.environ.get("COOKING_MCP_URL", "http://localhost:10005/sse"),
+        "transport": "sse",
+    },
+    "personalization": {
+        "url": os.environ.get("PERSONALIZATION_MCP_URL", "http://localhost:10006/sse"),
+        "transport": "sse",
+    },
+    "tv": {
+        "url": os.environ.get("TV_MCP_URL", "http://localhost:10007/sse"),
+        "transport": "sse",
+    },
+    "audio": {
+        "url": os.environ.get("AUDIO_MCP_URL", "http://localhost:10008/sse"),
+        "transport": "sse",
+    },
+    "light": {
+        "url": os.environ.get("LIGHT_MCP_URL", "http://localhost:10009/sse"),
+        "transport": "sse",
+    },
+    "curtain": {
+        "url": os.environ.get("CURTAIN_MCP_URL", "http://localhost:10010/sse"),
+        "transport": "sse",
+    },
+}
+
+# 쿠킹 서브그래프 에이전트가 사용하는 서버
+COOKING_MCP_SERVERS = ["refrigerator", "induction", "microwave", "mobile", "cooking"]
+
+CONNECT_TIMEOUT = float(os.environ.get("MCP_CONNECT_TIMEOUT", "10"))
+# 연결 실패한 서버는 이 시간(초) 동안 재연결을 시도하지 않음 (실패할 때마다 2배, 최대 60초)
+RETRY_BACKOFF = float(os.environ.get("MCP_RETRY_BACKOFF", "2"))
+MAX_RETRY_BACKOFF = 60.0
+# 서버(기기)별 동시 도구 호출 상한. 느린 기기는 <NAME>_MCP_CONCURRENCY 로 따로 줄일 수 있음
+DEFAULT_SERVER_CONCURRENCY = int(os.environ.get("MCP_SERVER_CONCURRENCY", "4"))
+# 읽기 전용 도구 결과 캐시 사용 여부 (utils/tool_cache.py 참고)
+TOOL_CACHE_ENABLED = os.environ.get("MCP_TOOL_CACHE", "1").lower() not in ("0", "false", "no")
+
+
+class _ServerConnection:
+    """MCP 서버 하나에 대한 장기 연결과 상태 정보"""
+
+    def __init__(self, name: str, config: dict) -> None:
+        self.name = name
+        self.config = config
+        self.status = "idle"  # idle / connected / unhealthy / closed
+        self.tools: Dict[str, BaseTool] = {}
+        self.proxies: List[BaseTool] = []
+        self.lock = asyncio.Lock()
+        self.task: Optional[asyncio.Task] = None
+        self.stop_event: Optional[asyncio.Event] = None
+        self.connects = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.last_connected_at: Optional[float] = None
+        self.retry_at = 0.0
+        self.max_concurrency = int(os.environ.get(f"{name.upper()}_MCP_CONCURRENCY", DEFAULT_SERVER_CONCURRENCY))
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.in_flight = 0
+        self.waited = 0
+
+    def health(self) -> dict:
+        return {
+            "status": self.status,
+            "tools": len(self.tools),
+            "connects": self.connects,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "last_connected_at": self.last_connected_at,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "waited": self.waited,
+        }
+
+
+class MCPSessionManager:
+    """
+    MCP 서버 연결을 프로세스 전체에서 공유하는 세션 매니저입니다.
+    - 서버별로 처음 필요할 때 연결하고(lazy), 연결은 백그라운드 태스크에서 계속 유지합니다.
+    - 연결이 끊기거나 도구 호출이 실패하면 서버를 unhealthy로 표시하고 다음 호출 때 재연결합니다.
+    - 에이전트에는 실제 MCP 도구 대신 프록시 도구를 넘겨, 재연결 후에도 에이전트를 다시 만들 필요가 없습니다.
+    """
+
+    def __init__(self, servers: Optional[Dict[str, dict]] = None, cache: Optional[ToolResultCache] = None) -> None:
+        self.servers = servers if servers is not None else MCP_SERVERS
+        self.cache = cache if cache is not None else (get_tool_cache() if TOOL_CACHE_ENABLED else None)
+        self._connections: Dict[str, _ServerConnection] = {
+            name: _ServerConnection(name, config) for name, config in self.servers.items()
+        }
+
+    # --- 연결 관리 ---
+    async def _run_connection(self, conn: _ServerConnection, ready: asyncio.Future, stop: asyncio.Event):
+        # SSE 클라이언트는 진입한 태스크에서 종료해야 하므로, 연결 수명 전체를 한 태스크에서 관리합니다.
+        try:
+            async with MultiServerMCPClient({conn.name: conn.config}) as client:
+                ready.set_result(client.get_tools())
+                await stop.wait()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logger.warning(f"MCP 서버 '{conn.name}' 연결이 끊어졌습니다: {e}")
+                self._mark_unhealthy(conn, e)
+
+    def _mark_unhealthy(self, conn: _ServerConnection, error: Exception) -> None:
+        conn.status = "unhealthy"
+        conn.failures += 1
+        conn.last_error = str(error)
+        backoff = min(RETRY_BACKOFF * (2 ** (conn.failures - 1)), MAX_RETRY_BACKOFF)
+        conn.retry_at = time.monotonic() + backoff
+
+    async def _disconnect(self, conn: _ServerConnection) -> None:
+        task, stop = conn.task, conn.stop_event
+        conn.task = None
+        conn.stop_event = None
+        if task is None:
+            return
+        stop.set()
+        try:
+            await asyncio.wait_for(task, timeout=CONNECT_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"MCP 서버 '{conn.name}' 연결 종료 중 오류: {e}")
+            task.cancel()
+
+    async def _ensure_connected(self, conn: _ServerConnection, force: bool = False) -> bool:
+        """서버가 연결되어 있지 않으면 연결합니다. 백오프 중인 unhealthy 서버는 건너뜁니다."""
+        if conn.status == "connected" and not force:
+            return True
+        async with conn.lock:
+            if conn.status == "connected" and not force:
+                return True
+            if conn.status == "unhealthy" and not force and time.monotonic() < conn.retry_at:
+                return False
+
+            await self._disconnect(conn)
+            loop = asyncio.get_running_loop()
+            ready = loop.create_future()
+            stop = asyncio.Event()
+            conn.stop_event = stop
+            conn.task = asyncio.create_task(self._run_connection(conn, ready, stop))
+            try:
+                tools = await asyncio.wait_for(ready, timeout=CONNECT_TIMEOUT)
+            except Exception as e:
+                logger.error(f"MCP 서버 '{conn.name}' 연결 실패: {e}")
+                await self._disconnect(conn)
+                self._mark_unhealthy(conn, e)
+                return False
+
+            # 도구 스키마가 바뀐 경우에만 프록시를 새로 만듭니다. (에이전트 캐시 무효화 기준)
+            previous = tools_fingerprint(list(conn.tools.values()))
+            conn.tools = {tool.name: tool for tool in tools}
+            if not conn.proxies or previous != tools_fingerprint(tools):
+                conn.proxies = [self._make_proxy(conn, tool) for tool in tools]
+            conn.status = "connected"
+            conn.connects += 1
+            conn.failures = 0
+            conn.last_error = None
+            conn.last_connected_at = time.time()
+            logger.info(f"MCP 서버 '{conn.name}' 연결 완료 (도구 {len(tools)}개, 누적 연결 {conn.connects}회)")
+            return True
+
+    # --- 도구 프록시 ---
+    def _make_proxy(self, conn: _ServerConnection, tool: BaseTool) -> BaseTool:
+        """호출 시점에 현재 연결의 실제 도구를 찾아 실행하는 프록시 도구를 만듭니다."""
+        tool_name = tool.name
+
+        async def _call(**kwargs: Any):
+            return await self.call_tool(conn.name, tool_name, kwargs)
+
+        return StructuredTool(
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+            coroutine=_call,
+            response_format=getattr(tool, "response_format", "content"),
+            # MCP 오류 응답(isError)은 실제 도구의 처리기로 status="error"인 ToolMessage가 되도록 그대로 넘김
+            handle_tool_error=getattr(tool, "handle_tool_error", False),
+            metadata={"mcp_server": conn.name},
+        )
+
+    async def call_tool(self, server_name: str, tool_name: str, args: dict):
+        """MCP 도구를 호출합니다. 읽기 전용 도구는 캐시를 거치고, 변경 도구는 관련 캐시를 무효화합니다."""
+        if self.cache is None:
+            return await self._invoke_tool(server_name, tool_name, args)
+        return await self.cache.call(
+            server_name, tool_name, args, lambda: self._invoke_tool(server_name, tool_name, args)
+        )
+
+    async def _invoke_tool(self, server_name: str, tool_name: str, args: dict):
+        """서버별 세마포어 안에서 실제 MCP 도구를 호출합니다."""
+        conn = self._connections[server_name]
+        if conn.semaphore.locked():
+            conn.waited += 1
+        async with conn.semaphore:
+            conn.in_flight += 1
+            started = time.perf_counter()
+            failed = True
+            try:
+                result = await self._invoke_with_retry(conn, tool_name, args)
+                failed = False
+                return result
+            finally:
+                conn.in_flight -= 1
+                observe_tool_call(server_name, tool_name, started, error=failed)
+
+    async def _invoke_with_retry(self, conn: _ServerConnection, tool_name: str, args: dict):
+        """연결 오류 시 한 번 재연결 후 재시도합니다."""
+        server_name = conn.name
+        for attempt in range(2):
+            if not await self._ensure_connected(conn, force=attempt > 0):
+                raise ToolException(f"MCP 서버 '{server_name}'에 연결할 수 없습니다: {conn.last_error}")
+            tool = conn.tools.get(tool_name)
+            if tool is None:
+                raise ToolException(f"MCP 서버 '{server_name}'에 '{tool_name}' 도구가 없습니다.")
+            try:
+                return await tool.coroutine(**args)
+            except ToolException:
+                # 도구 자체의 오류는 연결 문제가 아니므로 그대로 전달
+                raise
+            except Exception as e:
+                logger.warning(f"MCP 도구 '{server_name}.{tool_name}' 호출 실패 (시도 {attempt + 1}): {e}")
+                self._mark_unhealthy(conn, e)
+                if attempt:
+                    raise
+
+    # --- 공개 API ---
+    async def get_tools(self, server_names: Optional[Iterable[str]] = None) -> List[BaseTool]:
+        """요청한 서버들의 (프록시) 도구 목록을 반환합니다. 연결되지 않은 서버는 병렬로 연결합니다."""
+        names = list(server_names) if server_names is not None else list(self._connections)
+        conns = [self._connections[name] for name in names]
+        await asyncio.gather(*(self._ensure_connected(conn) for conn in conns))
+        tools: List[BaseTool] = []
+        for conn in conns:
+            if conn.status == "connected":
+                tools.extend(conn.proxies)
+        return tools
+
+    def in_flight(self) -> Dict[str, int]:
+        """서버별 실행 중인 도구 호출 수를 반환합니다."""
+        return {name: conn.in_flight for name, conn in self._connections.items()}
+
+    def health(self) -> Dict[str, dict]:
+        """서버별 연결 상태를 반환합니다."""
+        return {name: conn.health() for name, conn in self._connections.items()}
+
+    def stats(self) -> dict:
+        return {
+            "connects": sum(conn.connects for conn in self._connections.values()),
+            "connected": sum(1 for conn in self._connections.values() if conn.status == "connected"),
+            "unhealthy": sum(1 for conn in self._connections.values() if conn.status == "unhealthy"),
+            "tool_cache": self.cache.stats() if self.cache is not None else None,
+        }
+
+    async def close(self) -> None:
+        """모든 MCP 연결을 종료합니다."""
+        for conn in self._connections.values():
+            await self._disconnect(conn)
+            conn.status = "closed"
+        logger.info("MCP 세션 매니저 종료 완료")
+
+
+def tools_fingerprint(tools: List) -> str:
+    """도구 이름/설명/인자 스키마로 도구 구성의 지문(sha256)을 계산합니다."""
+    entries = []
+    for tool in tools:
+        try:
+            args = getattr(tool, "args", {})
+        except Exception:
+            args = {}
+        entries.append([
+            getattr(tool, "name", ""),
+            getattr(tool, "description", ""),
+            args,
+        ])
+    entries.sort(key=lambda entry: entry[0])
+    payload = json.dumps(entries, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# 싱글톤 인스턴스
+_manager: Optional[MCPSessionManager] = None
+
+
+def get_mcp_manager() -> MCPSessionManager:
+    """프로세스 공용 MCP 세션 매니저를 반환합니다."""
+    global _manager
+    if _manager is None:
+        _manager = MCPSessionManager()
+    return _manager
+
+
+async def close_mcp_manager() -> None:
+    global _manager
+    if _manager is not None:
+        await _manager.close()
+        _manager = None
@@ -0,0 +1,177 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from utils.mcp_pool import get_mcp_manager
+
+logger = logging.getLogger("prefetch")
+logging.basicConfig(level=logging.INFO)
+
+# 쿠킹 모드 진입 시 미리 조회할 정보 (컨텍스트 키 -> (MCP 서버, 도구))
+COOKING_PREFETCH_TOOLS = {
+    "fridge_items": ("refrigerator", "get_food_items"),
+    "appliances": ("personalization", "get_appliances"),
+    "preferences": ("personalization", "get_preferences"),
+}
+COOKING_PREFETCH_ENABLED = os.environ.get("COOKING_PREFETCH", "1").lower() not in ("0", "false", "no")
+# 프리패치 전체 대기 상한(초). 넘으면 받은 것만 사용하고 나머지는 에이전트가 직접 조회
+COOKING_PREFETCH_TIMEOUT = float(os.environ.get("COOKING_PREFETCH_TIMEOUT", "5"))
+# 라우터가 시작했지만 아직 가져가지 않은 프리패치 최대 개수
+MAX_PENDING_PREFETCHES = 1000
+
+# thread_id -> 프리패치 태스크
+_pending: "OrderedDict[str, asyncio.Task]" = OrderedDict()
+_stats = {
+    "prefetches": 0,
+    "prefetch_ms": 0.0,
+    "tool_errors": 0,
+    "init_runs": 0,
+    "init_llm_calls": 0,
+    "init_tool_calls": 0,
+    # 프리패치한 정보를 에이전트가 다시 조회한 횟수 (프롬프트 주입이 효과가 없었던 경우)
+    "redundant_tool_calls": 0,
+}
+
+
+def _parse_result(result: Any) -> Any:
+    # MCP 어댑터 도구는 (content, artifact) 튜플 또는 JSON 문자열을 돌려줄 수 있음
+    if isinstance(result, tuple):
+        result = result[0]
+    if isinstance(result, str):
+        try:
+            return json.loads(result)
+        except ValueError:
+            return result
+    return result
+
+
+async def _fetch(key: str, server: str, tool: str) -> tuple:
+    try:
+        value = _parse_result(await get_mcp_manager().call_tool(server, tool, {}))
+    except Exception as e:
+        logger.warning(f"프리패치 실패: {server}.{tool}: {e}")
+        return key, None, str(e)
+    # 모의 서버는 백엔드 요청이 실패해도 {"error": ...}를 정상 결과로 돌려줌 -> 실패로 보고 에이전트가 다시 조회하게 함
+    if isinstance(value, dict) and "error" in value:
+        logger.warning(f"프리패치 실패: {server}.{tool}: {value['error']}")
+        return key, None, str(value["error"])
+    return key, value, None
+
+
+async def prefetch_cooking_context() -> Dict[str, Any]:
+    """
+    냉장고 식재료, 주방기기, 사용자 선호도를 동시에 조회해 구조화된 컨텍스트로 반환합니다.
+    실패한 항목은 errors에 담고, 에이전트가 필요하면 직접 도구로 조회합니다.
+    """
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(_fetch(key, server, tool)) for key, (server, tool) in COOKING_PREFETCH_TOOLS.items()]
+    done, not_done = await asyncio.wait(tasks, timeout=COOKING_PREFETCH_TIMEOUT)
+    for task in not_done:
+        task.cancel()
+
+    context: Dict[str, Any] = {"errors": {}}
+    for task in done:
+        key, value, error = task.result()
+        if error is None:
+            context[key] = value
+        else:
+            context["errors"][key] = error
+    for key, (server, tool) in COOKING_PREFETCH_TOOLS.items():
+        if key not in context and key not in context["errors"]:
+            context["errors"][key] = f"timeout ({COOKING_PREFETCH_TIMEOUT}s)"
+
+    elapsed = (time.perf_counter() - start) * 1000
+    context["elapsed_ms"] = round(elapsed, 1)
+    _stats["prefetches"] += 1
+    _stats["prefetch_ms"] += elapsed
+    _stats["tool_errors"] += len(context["errors"])
+    logger.info(f"쿠킹 컨텍스트 프리패치 완료 ({elapsed:.1f}ms, 실패 {len(context['errors'])}건)")
+    return context
+
+
+def start_cooking_prefetch(thread_id: Optional[str]) -> None:
+    """쿠킹 의도가 감지되면 바로 프리패치를 시작합니다. (결과는 take_cooking_prefetch로 가져감)"""
+    if not COOKING_PREFETCH_ENABLED:
+        return
+    key = thread_id or ""
+    previous = _pending.pop(key, None)
+    if previous is not None:
+        previous.cancel()
+    _pending[key] = asyncio.create_task(prefetch_cooking_context())
+    while len(_pending) > MAX_PENDING_PREFETCHES:
+        _, stale = _pending.popitem(last=False)
+        stale.cancel()
+
+
+def cancel_cooking_prefetch(thread_id: Optional[str]) -> None:
+    """라우터가 시작한 프리패치를 쓰지 않게 되었을 때(init 실패 등) 취소합니다."""
+    task = _pending.pop(thread_id or "", None)
+    if task is not None:
+        task.cancel()
+
+
+async def take_cooking_prefetch(thread_id: Optional[str]) -> Optional[Dict[str, Any]]:
+    """라우터가 시작한 프리패치 결과를 가져옵니다. 시작된 것이 없으면 지금 조회합니다."""
+    if not COOKING_PREFETCH_ENABLED:
+        return None
+    task = _pending.pop(thread_id or "", None)
+    if task is None:
+        return await prefetch_cooking_context()
+    # 기다리는 쪽이 취소되면 프리패치도 취소하고, 프리패치만 취소된 경우(같은 스레드에서 새로 시작됨)에는 지금 조회
+    try:
+        await asyncio.wait({task})
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    if task.cancelled():
+        return await prefetch_cooking_context()
+    return task.result()
+
+
+def record_init_run(new_messages: List, context: Optional[Dict[str, Any]]) -> None:
+    """init 에이전트 한 번 실행에서 사용한 LLM 호출/도구 호출 수를 기록합니다."""
+    prefetched = {
+        tool for key, (_, tool) in COOKING_PREFETCH_TOOLS.items()
+        if context is not None and key in context
+    }
+    _stats["init_runs"] += 1
+    for message in new_messages:
+        if getattr(message, "type", None) != "ai":
+            continue
+        _stats["init_llm_calls"] += 1
+        for call in getattr(message, "tool_calls", None) or []:
+            _stats["init_tool_calls"] += 1
+            if call.get("name") in prefetched:
+                _stats["redundant_tool_calls"] += 1
+
+
+def get_prefetch_stats() -> dict:
+    stats = dict(_stats)
+    stats["prefetch_ms"] = round(stats["prefetch_ms"], 1)
+    stats["pending"] = len(_pending)
+    runs = stats["init_runs"]
+    stats["avg_init_llm_calls"] = round(stats["init_llm_calls"] / runs, 2) if runs else 0.0
+    return stats
+
+
+def format_cooking_context(context: Optional[Dict[str, Any]]) -> str:
+    """init 에이전트 시스템 프롬프트에 넣을 컨텍스트 블록을 만듭니다."""
+    if not context:
+        return ""
+    data = {key: context[key] for key in COOKING_PREFETCH_TOOLS if key in context}
+    if not data:
+        return ""
+    lines = [
+        "아래는 방금 조회한 사용자 정보입니다. 이 정보는 다시 도구로 조회하지 말고 바로 레시피 계획에 사용하세요.",
+        "```json",
+        json.dumps(data, ensure_ascii=False, indent=2, default=str),
+        "```",
+    ]
+    missing = [key for key in COOKING_PREFETCH_TOOLS if key not in data]
+    if missing:
+        lines.append(f"조회하지 못한 정보: {', '.join(missing)} (필요하면 도구로 조회하세요)")
+    return "\n".join(lines)
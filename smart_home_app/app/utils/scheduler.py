@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from utils.metrics import REGISTRY
+
+logger = logging.getLogger("scheduler")
+logging.basicConfig(level=logging.INFO)
+
+# 동시에 실행 가능한 그래프 수 (환경 변수로 조정)
+DEFAULT_MAX_CONCURRENCY = int(os.environ.get("GRAPH_MAX_CONCURRENCY", "16"))
+# 실행 슬롯을 기다릴 수 있는 최대 요청 수. 넘으면 바로 거절(429)
+DEFAULT_MAX_QUEUE = int(os.environ.get("ADMISSION_MAX_QUEUE", "64"))
+# 세션 하나가 동시에 가질 수 있는 요청 수 (실행 중 + 대기 중)
+DEFAULT_MAX_PER_SESSION = int(os.environ.get("ADMISSION_MAX_PER_SESSION", "2"))
+# 대기 상한(초). 이 시간 안에 슬롯을 얻지 못하면 거절해 승인된 요청의 꼬리 지연을 묶어 둠
+DEFAULT_MAX_QUEUE_WAIT = float(os.environ.get("ADMISSION_MAX_QUEUE_WAIT", "10"))
+
+QUEUE_WAIT = REGISTRY.histogram(
+    "admission_queue_wait_seconds", "Time admitted requests waited for a graph slot",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+REJECTED = REGISTRY.counter("admission_rejected_total", "Requests rejected by admission control", ["reason"])
+QUEUE_DEPTH = REGISTRY.gauge("admission_queue_depth", "Requests waiting for a graph slot")
+
+
+class AdmissionRejected(Exception):
+    """대기열이 가득 찼거나 대기 상한을 넘어 요청을 받지 않을 때 발생합니다. (HTTP 429로 변환)"""
+
+    def __init__(self, reason: str, retry_after: int) -> None:
+        super().__init__(f"admission rejected: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class SessionScheduler:
+    """
+    세션(thread_id) 단위로 그래프 실행을 스케줄링하고, 과부하 시 요청을 거절하는 승인 제어(admission control)를 겸합니다.
+    - 같은 세션의 요청은 순서대로 하나씩 실행되어 체크포인트가 꼬이지 않습니다.
+    - 서로 다른 세션은 병렬로 실행되며, 전체 동시 실행 수는 max_concurrency로 제한됩니다.
+    - 대기 중인 요청이 max_queue개이거나 세션의 요청이 max_per_session개이면 바로 AdmissionRejected를 냅니다.
+    - max_queue_wait 안에 슬롯을 얻지 못한 요청도 거절하므로, 승인된 요청의 지연은 대기 상한 + 실행 시간으로 묶입니다.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        *,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        max_per_session: int = DEFAULT_MAX_PER_SESSION,
+        max_queue_wait: float = DEFAULT_MAX_QUEUE_WAIT,
+    ) -> None:
+        self.max_concurrency = max_concurrency or DEFAULT_MAX_CONCURRENCY
+        self.max_queue = max_queue
+        self.max_per_session = max_per_session
+        self.max_queue_wait = max_queue_wait
+        self._global = asyncio.Semaphore(self.max_concurrency)
+        self._session_locks: Dict[str, asyncio.Lock] = {}
+        self._session_waiters: Dict[str, int] = {}
+        self.in_flight = 0
+        self.waiting = 0
+        # 실행 시간 지수 이동 평균(초). Retry-After 추정용
+        self._service_ewma = 1.0
+        self.counters = {"admitted": 0, "rejected_queue_full": 0, "rejected_session_limit": 0,
+                         "rejected_queue_timeout": 0, "queue_wait_seconds": 0.0}
+
+    def _acquire_session_lock(self, session_id: str) -> asyncio.Lock:
+        lock = self._session_locks.get(session_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._session_locks[session_id] = lock
+        self._session_waiters[session_id] = self._session_waiters.get(session_id, 0) + 1
+        return lock
+
+    def _release_session_lock(self, session_id: str) -> None:
+        # 대기자가 없으면 락을 정리해서 세션 수만큼 락이 쌓이지 않도록 합니다.
+        remaining = self._session_waiters[session_id] - 1
+        if remaining:
+            self._session_waiters[session_id] = remaining
+        else:
+            del self._session_waiters[session_id]
+            del self._session_locks[session_id]
+
+    def retry_after(self) -> int:
+        """대기열이 빠지는 데 걸릴 대략의 시간(초)을 Retry-After 값으로 추정합니다."""
+        estimate = self._service_ewma * (self.waiting + 1) / self.max_concurrency
+        return min(max(math.ceil(estimate), 1), 60)
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        self.counters[f"rejected_{reason}"] += 1
+        REJECTED.inc(1, reason)
+        return AdmissionRejected(reason, self.retry_after())
+
+    def check_admission(self, session_id: str) -> None:
+        """지금 요청을 받을 수 있는지 확인만 합니다. (받을 수 없으면 AdmissionRejected)"""
+        if self._session_waiters.get(session_id, 0) >= self.max_per_session:
+            raise self._reject("session_limit")
+        if self.waiting >= self.max_queue and self._global.locked():
+            raise self._reject("queue_full")
+
+    async def _acquire(self, lock: asyncio.Lock) -> None:
+        await lock.acquire()
+        try:
+            await self._global.acquire()
+        except BaseException:
+            lock.release()
+            raise
+
+    @asynccontextmanager
+    async def slot(self, session_id: str):
+        """
+        세션 락 -> 전역 슬롯 순서로 획득합니다. (대기 중인 같은 세션 요청이 전역 슬롯을 점유하지 않음)
+        승인되지 않으면 AdmissionRejected를 냅니다.
+        """
+        self.check_admission(session_id)
+        lock = self._acquire_session_lock(session_id)
+        try:
+            self.waiting += 1
+            QUEUE_DEPTH.set(self.waiting)
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(self._acquire(lock), timeout=self.max_queue_wait)
+            except asyncio.TimeoutError:
+                raise self._reject("queue_timeout") from None
+            finally:
+                self.waiting -= 1
+                QUEUE_DEPTH.set(self.waiting)
+            waited = time.perf_counter() - start
+            QUEUE_WAIT.observe(waited)
+            self.counters["admitted"] += 1
+            self.counters["queue_wait_seconds"] += waited
+
+            self.in_flight += 1
+            started = time.perf_counter()
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+                self._service_ewma = 0.8 * self._service_ewma + 0.2 * (time.perf_counter() - started)
+                self._global.release()
+                lock.release()
+        finally:
+            self._release_session_lock(session_id)
+
+    def is_active(self, session_id: str) -> bool:
+        """세션의 요청이 실행 중이거나 대기 중인지 여부"""
+        return session_id in self._session_locks
+
+    def stats(self) -> dict:
+        admitted = self.counters["admitted"]
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "max_per_session": self.max_per_session,
+            "max_queue_wait": self.max_queue_wait,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "active_sessions": len(self._session_locks),
+            **{key: value for key, value in self.counters.items() if key != "queue_wait_seconds"},
+            "avg_queue_wait_ms": round(self.counters["queue_wait_seconds"] / admitted * 1000, 2) if admitted else 0.0,
+            "service_ewma_ms": round(self._service_ewma * 1000, 1),
+        }
@@ -1,19 +1,453 @@
+import abc
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
 import uuid
-from typing import Dict, Any
+import zlib
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+logger = logging.getLogger("session")
+logging.basicConfig(level=logging.INFO)
+
+# 환경 변수 기본값
+DEFAULT_TTL_SECONDS = float(os.environ.get("SESSION_TTL_SECONDS", "1800"))
+DEFAULT_MAX_SESSIONS = int(os.environ.get("SESSION_MAX", "10000"))
+DEFAULT_SHARDS = int(os.environ.get("SESSION_SHARDS", "16"))
+# 전체 만료 정리(백엔드 포함)를 최대 몇 초에 한 번 할지
+DEFAULT_SWEEP_INTERVAL = float(os.environ.get("SESSION_SWEEP_INTERVAL", "60"))
+# 영속 백엔드: "memory"(없음) | "sqlite" | "file"
+SESSION_BACKEND = os.environ.get("SESSION_BACKEND", "memory").lower()
+SESSION_STORE_PATH = os.environ.get(
+    "SESSION_STORE_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "sessions")
+)
+
+
+# --- 영속 백엔드 ---
+class SessionBackend(abc.ABC):
+    """세션 레코드({"data", "created_at", "last_activity"})를 저장하는 백엔드 인터페이스입니다."""
+
+    @abc.abstractmethod
+    def load(self, session_id: str) -> Optional[dict]:
+        """저장된 레코드, 없으면 None"""
+
+    @abc.abstractmethod
+    def save(self, session_id: str, record: dict) -> None:
+        """레코드를 저장(덮어쓰기)합니다."""
+
+    @abc.abstractmethod
+    def delete(self, session_id: str) -> None:
+        """레코드를 지웁니다. (없어도 오류 아님)"""
+
+    @abc.abstractmethod
+    def expired(self, cutoff: float) -> List[str]:
+        """last_activity가 cutoff 이전인 세션 ID 목록"""
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """로컬 SQLite 파일 백엔드 (WAL, 연결 하나를 락으로 보호)"""
+
+    def __init__(self, path: str) -> None:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # 여러 워커 프로세스가 같은 파일을 쓸 때(dispatcher.py) 쓰기 락을 기다림
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions (session_id TEXT PRIMARY KEY, record TEXT NOT NULL, "
+            "last_activity REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_last_activity ON sessions (last_activity)")
+        self._lock = threading.Lock()
+
+    def load(self, session_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT record FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, session_id: str, record: dict) -> None:
+        payload = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, record, last_activity) VALUES (?, ?, ?)",
+                (session_id, payload, record["last_activity"]),
+            )
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def expired(self, cutoff: float) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT session_id FROM sessions WHERE last_activity < ?", (cutoff,)).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class FileSessionBackend(SessionBackend):
+    """세션마다 JSON 파일 하나를 쓰는 백엔드 (임시 파일에 쓴 뒤 교체)"""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, session_id: str) -> str:
+        # 세션 ID를 파일 이름으로 쓰지 않도록 해시 (경로 조작 방지)
+        digest = hashlib.sha1(session_id.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def load(self, session_id: str) -> Optional[dict]:
+        try:
+            with open(self._path(session_id), "r", encoding="utf-8") as f:
+                return json.load(f)["record"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, session_id: str, record: dict) -> None:
+        path = self._path(session_id)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"session_id": session_id, "record": record}, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+
+    def delete(self, session_id: str) -> None:
+        try:
+            os.remove(self._path(session_id))
+        except FileNotFoundError:
+            pass
+
+    def expired(self, cutoff: float) -> List[str]:
+        result = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), "r", encoding="utf-8") as f:
+                    payload = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if payload["record"]["last_activity"] < cutoff:
+                result.append(payload["session_id"])
+        return result
+
+
+def create_backend(kind: str = SESSION_BACKEND, path: str = SESSION_STORE_PATH) -> Optional[SessionBackend]:
+    """SESSION_BACKEND 설정에 맞는 백엔드를 만듭니다. (memory면 None)"""
+    if kind == "sqlite":
+        return SQLiteSessionBackend(path if path.endswith(".sqlite") else f"{path}.sqlite")
+    if kind == "file":
+        return FileSessionBackend(path)
+    return None
+
+
+# --- 세션 저장소 ---
+class _Shard:
+    __slots__ = ("lock", "entries")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        # session_id -> 레코드 (마지막 활동 순서, 오래된 것이 앞)
+        self.entries: "OrderedDict[str, dict]" = OrderedDict()
+
+
+class SessionStore:
+    """
+    TTL 만료와 LRU 상한이 있는 세션 저장소입니다.
+    - session_id 해시로 나눈 샤드마다 락을 따로 두어 동시 접근 시 경합을 줄입니다.
+    - 만료는 접근 시점에 확인하고(lazy), 샤드의 오래된 쪽부터 만료된 항목을 함께 정리합니다.
+      백엔드까지 포함한 전체 정리는 sweep_interval마다 한 번, 다음 접근 때 실행합니다.
+    - 샤드별 상한(max_sessions / shards)을 넘으면 가장 오래 쓰지 않은 세션부터 축출합니다.
+      (백엔드가 있으면 메모리에서만 내리고 다음 접근 때 백엔드에서 복원합니다)
+    - 세션이 만료/축출/삭제되면 on_evict(session_id, reason)를 락 밖에서 호출합니다. (그래프 상태 정리용)
+      만료는 지우기 직전에 메모리와 백엔드의 마지막 활동 시각을 다시 읽어, 그 사이 활동이 있었으면 건너뜁니다.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        shards: int = DEFAULT_SHARDS,
+        sweep_interval: float = DEFAULT_SWEEP_INTERVAL,
+        backend: Optional[SessionBackend] = None,
+        on_evict: Optional[Callable[[str, str], None]] = None,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.sweep_interval = sweep_interval
+        self.backend = backend
+        self.on_evict = on_evict
+        self._shards = [_Shard() for _ in range(max(shards, 1))]
+        self._shard_cap = max(max_sessions // len(self._shards), 1)
+        self._sweep_lock = threading.Lock()
+        self._last_sweep = time.time()
+        self.counters = {"created": 0, "expired": 0, "evicted_lru": 0, "deleted": 0, "restored": 0, "revived": 0, "sweeps": 0}
+
+    def _shard(self, session_id: str) -> _Shard:
+        return self._shards[zlib.crc32(session_id.encode("utf-8")) % len(self._shards)]
+
+    def _is_expired(self, record: dict, now: float) -> bool:
+        return self.ttl_seconds is not None and now - record["last_activity"] >= self.ttl_seconds
+
+    def _collect_expired(self, shard: _Shard, now: float, evicted: List[tuple]) -> None:
+        # 마지막 활동 순으로 정렬되어 있으므로 앞쪽만 보면 됨
+        while shard.entries:
+            session_id, record = next(iter(shard.entries.items()))
+            if not self._is_expired(record, now):
+                break
+            del shard.entries[session_id]
+            evicted.append((session_id, "ttl"))
+
+    def _still_expired(self, session_id: str, now: float) -> bool:
+        """
+        만료로 고른 세션을 지우기 직전에 다시 확인합니다.
+        그 사이 같은 ID로 다시 만들어졌거나(메모리), 다른 워커가 활동을 기록했으면(백엔드) 지우지 않습니다.
+        """
+        shard = self._shard(session_id)
+        with shard.lock:
+            record = shard.entries.get(session_id)
+        if record is not None and not self._is_expired(record, now):
+            return False
+        if self.backend is not None:
+            record = self.backend.load(session_id)
+            if record is not None and not self._is_expired(record, now):
+                return False
+        return True
+
+    def _finish(self, evicted: List[tuple]) -> None:
+        """락 밖에서 백엔드 삭제와 on_evict 콜백을 처리합니다."""
+        now = time.time()
+        for session_id, reason in evicted:
+            if reason == "ttl" and not self._still_expired(session_id, now):
+                self.counters["revived"] += 1
+                continue
+            if reason == "ttl":
+                self.counters["expired"] += 1
+            elif reason == "lru":
+                self.counters["evicted_lru"] += 1
+            else:
+                self.counters["deleted"] += 1
+            # 백엔드가 있으면 LRU 축출은 메모리에서만 내리고, 백엔드에 남겨 다음 접근 때 복원
+            if reason == "lru" and self.backend is not None:
+                continue
+            if self.backend is not None:
+                self.backend.delete(session_id)
+            if self.on_evict is not None:
+                try:
+                    self.on_evict(session_id, reason)
+                except Exception as e:
+                    logger.warning(f"세션 정리 콜백 실패 ({session_id}): {e}")
+        self._maybe_sweep()
+
+    def _maybe_sweep(self) -> None:
+        if time.time() - self._last_sweep < self.sweep_interval or not self._sweep_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_sweep = time.time()
+            self.sweep()
+        finally:
+            self._sweep_lock.release()
+
+    def _store(self, shard: _Shard, session_id: str, record: dict, evicted: List[tuple]) -> None:
+        shard.entries[session_id] = record
+        shard.entries.move_to_end(session_id)
+        while len(shard.entries) > self._shard_cap:
+            old_id, _ = shard.entries.popitem(last=False)
+            evicted.append((old_id, "lru"))
+
+    def _save(self, session_id: str, record: dict, now: float) -> None:
+        record["saved_at"] = now
+        self.backend.save(session_id, record)
+
+    def _load(self, session_id: str) -> Optional[dict]:
+        if self.backend is None:
+            return None
+        record = self.backend.load(session_id)
+        if record is not None:
+            self.counters["restored"] += 1
+        return record
+
+    # --- 공개 API ---
+    def create(self, session_id: Optional[str] = None, data: Optional[dict] = None) -> str:
+        """새 세션을 만들고 ID를 반환합니다."""
+        session_id = session_id or str(uuid.uuid4())
+        now = time.time()
+        record = {"data": data or {}, "created_at": now, "last_activity": now}
+        shard = self._shard(session_id)
+        evicted: List[tuple] = []
+        with shard.lock:
+            self._collect_expired(shard, now, evicted)
+            self._store(shard, session_id, record, evicted)
+        self.counters["created"] += 1
+        if self.backend is not None:
+            self._save(session_id, record, now)
+        self._finish(evicted)
+        return session_id
+
+    def _get_record(self, session_id: str, touch: bool) -> Optional[dict]:
+        now = time.time()
+        shard = self._shard(session_id)
+        evicted: List[tuple] = []
+        with shard.lock:
+            record = shard.entries.get(session_id)
+            if record is not None and self._is_expired(record, now):
+                del shard.entries[session_id]
+                record = None
+                # 백엔드가 있으면 다른 워커가 기록한 활동이 있을 수 있으므로 아래에서 백엔드 레코드로 판단
+                if self.backend is None:
+                    evicted.append((session_id, "ttl"))
+            elif record is not None and touch:
+                record["last_activity"] = now
+                shard.entries.move_to_end(session_id)
+        if record is None and not evicted:
+            record = self._load(session_id)
+            if record is not None and self._is_expired(record, now):
+                evicted.append((session_id, "ttl"))
+                record = None
+            elif record is not None:
+                if touch:
+                    record["last_activity"] = now
+                with shard.lock:
+                    self._collect_expired(shard, now, evicted)
+                    self._store(shard, session_id, record, evicted)
+        # 활동 시각은 sweep_interval마다 한 번만 백엔드에 기록 (재시작 후 만료 판단용)
+        if record is not None and touch and self.backend is not None \
+                and now - record.get("saved_at", 0) >= self.sweep_interval:
+            self._save(session_id, record, now)
+        self._finish(evicted)
+        return record
+
+    def get(self, session_id: str) -> Optional[dict]:
+        """세션 데이터를 반환합니다. (없거나 만료되었으면 None, 마지막 활동 시각은 갱신하지 않음)"""
+        record = self._get_record(session_id, touch=False)
+        return record["data"] if record is not None else None
+
+    def touch(self, session_id: str) -> dict:
+        """세션의 마지막 활동 시각을 갱신합니다. 없거나 만료된 세션이면 같은 ID로 새로 만듭니다."""
+        record = self._get_record(session_id, touch=True)
+        if record is None:
+            self.create(session_id)
+            record = self._get_record(session_id, touch=False)
+        return record
+
+    def set(self, session_id: str, data: dict) -> None:
+        """세션 데이터를 저장합니다. (백엔드가 있으면 바로 기록)"""
+        now = time.time()
+        shard = self._shard(session_id)
+        evicted: List[tuple] = []
+        with shard.lock:
+            record = shard.entries.get(session_id)
+            if record is None:
+                record = {"data": data, "created_at": now, "last_activity": now}
+            else:
+                record["data"] = data
+                record["last_activity"] = now
+            self._collect_expired(shard, now, evicted)
+            self._store(shard, session_id, record, evicted)
+        if self.backend is not None:
+            self._save(session_id, record, now)
+        self._finish(evicted)
+
+    def delete(self, session_id: str) -> None:
+        shard = self._shard(session_id)
+        with shard.lock:
+            shard.entries.pop(session_id, None)
+        self._finish([(session_id, "deleted")])
+
+    def sweep(self) -> int:
+        """모든 샤드와 백엔드에서 만료된 세션을 정리하고 정리한 수를 반환합니다."""
+        now = time.time()
+        evicted: List[tuple] = []
+        for shard in self._shards:
+            with shard.lock:
+                self._collect_expired(shard, now, evicted)
+        if self.backend is not None and self.ttl_seconds is not None:
+            in_memory = set()
+            for shard in self._shards:
+                with shard.lock:
+                    in_memory.update(shard.entries)
+            seen = {session_id for session_id, _ in evicted}
+            for session_id in self.backend.expired(now - self.ttl_seconds):
+                # 메모리의 레코드가 더 최근 활동을 갖고 있을 수 있음 (touch는 백엔드에 가끔만 기록)
+                if session_id not in in_memory and session_id not in seen:
+                    evicted.append((session_id, "ttl"))
+        self.counters["sweeps"] += 1
+        # 여기서는 _finish가 다시 sweep을 부르지 않도록 시각을 먼저 갱신해 둠
+        self._last_sweep = now
+        self._finish(evicted)
+        return len(evicted)
+
+    def active_sessions(self, limit: Optional[int] = None) -> List[dict]:
+        """메모리에 있는 세션을 최근 활동 순으로 반환합니다."""
+        items = []
+        for shard in self._shards:
+            with shard.lock:
+                items.extend(
+                    {"session_id": session_id, "created_at": r["created_at"], "last_activity": r["last_activity"]}
+                    for session_id, r in shard.entries.items()
+                )
+        items.sort(key=lambda item: item["last_activity"], reverse=True)
+        return items[:limit] if limit is not None else items
+
+    def __len__(self) -> int:
+        return sum(len(shard.entries) for shard in self._shards)
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self),
+            "max_sessions": self.max_sessions,
+            "shards": len(self._shards),
+            "ttl_seconds": self.ttl_seconds,
+            "backend": type(self.backend).__name__ if self.backend is not None else None,
+            **self.counters,
+        }
+
+    def close(self) -> None:
+        """메모리의 마지막 활동 시각을 백엔드에 기록하고 닫습니다."""
+        if self.backend is None:
+            return
+        for shard in self._shards:
+            with shard.lock:
+                records = list(shard.entries.items())
+            for session_id, record in records:
+                self._save(session_id, record, time.time())
+        self.backend.close()
+
+
+# 싱글톤 인스턴스
+_store: Optional[SessionStore] = None
+
+
+def get_session_store() -> SessionStore:
+    """프로세스 공용 세션 저장소를 반환합니다."""
+    global _store
+    if _store is None:
+        _store = SessionStore(backend=create_backend())
+    return _store
 
-# 인메모리 세션 저장소
-db: Dict[str, Any] = {}
 
 def create_session() -> str:
     """새로운 세션 ID를 생성하고 초기화합니다."""
-    session_id = str(uuid.uuid4())
-    db[session_id] = {}
-    return session_id
+    return get_session_store().create()
+
 
 def get_session(session_id: str) -> dict:
     """세션 ID로 상태를 조회합니다."""
-    return db.get(session_id, {})
+    return get_session_store().get(session_id) or {}
+
 
 def set_session(session_id: str, state: dict):
     """세션 ID에 상태를 저장합니다."""
-    db[session_id] = state
+    get_session_store().set(session_id, state)
@@ -0,0 +1,519 @@
+import asyncio
+import logging
+import os
+import queue
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+logger = logging.getLogger("sqlite_checkpointer")
+logging.basicConfig(level=logging.INFO)
+
+# 환경 변수 기본값
+DEFAULT_DB_PATH = os.environ.get(
+    "CHECKPOINT_DB_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "checkpoints.sqlite")
+)
+DEFAULT_MAX_CHECKPOINTS_PER_THREAD = int(os.environ.get("CHECKPOINT_MAX_PER_THREAD", "10"))
+# WAL에서 NORMAL은 프로세스 크래시에는 안전하고, 전원 장애 시 마지막 커밋 일부만 잃을 수 있음
+DEFAULT_SYNCHRONOUS = os.environ.get("CHECKPOINT_DB_SYNCHRONOUS", "NORMAL")
+# 한 트랜잭션에 묶는 최대 쓰기 작업 수
+MAX_BATCH_OPS = 256
+# 실행이 그대로 끝날 수 있어 버퍼에 두지 않고 바로 쓰는 채널 (LangGraph의 오류/인터럽트 쓰기)
+_FLUSH_NOW_CHANNELS = ("__error__", "__interrupt__")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT,
+    checkpoint BLOB,
+    metadata_type TEXT,
+    metadata BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    task_path TEXT NOT NULL DEFAULT '',
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT,
+    value BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+"""
+
+_INSERT_WRITE = (
+    "INSERT OR {mode} INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, task_path, idx, channel, type, value) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+# (thread_id, checkpoint_ns)의 최신 N개를 뺀 나머지 체크포인트
+_EXCESS_IDS = (
+    "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+    "ORDER BY checkpoint_id DESC LIMIT -1 OFFSET ?"
+)
+
+
+class _WriteOp:
+    """writer 스레드가 한 트랜잭션 안에서 처리할 쓰기 작업 하나"""
+
+    __slots__ = ("checkpoint", "writes", "prune", "delete_thread", "future")
+
+    def __init__(self, checkpoint: Optional[tuple] = None, writes: Optional[List[Tuple[bool, tuple]]] = None,
+                 prune: Optional[Tuple[str, str]] = None, delete_thread: Optional[str] = None) -> None:
+        self.checkpoint = checkpoint
+        # (덮어쓰기 여부, 행) 목록
+        self.writes = writes or []
+        self.prune = prune
+        self.delete_thread = delete_thread
+        self.future: Future = Future()
+
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver[str]):
+    """
+    로컬 SQLite(WAL) 파일에 체크포인트를 저장하는 체크포인터입니다. 서버를 재시작해도 대화가 유지됩니다.
+    - 쓰기는 전용 writer 스레드 하나가 처리하고, 그 사이 쌓인 여러 세션의 쓰기를 한 트랜잭션으로 커밋합니다(group commit).
+      연결을 여러 스레드가 나눠 쓰지 않으므로 동시 세션에서도 `database is locked` 대기가 생기지 않습니다.
+    - 태스크 중간 결과(put_writes)는 메모리에 모았다가 슈퍼스텝이 끝나는 put 시점에 체크포인트와 함께 씁니다.
+      (오류/인터럽트 쓰기는 다음 put이 없을 수 있으므로 바로 씁니다)
+    - put 때마다 해당 스레드/네임스페이스의 최신 N개 체크포인트만 남기고,
+      남은 루트 체크포인트보다 오래된 서브그래프 체크포인트도 정리합니다.
+    - 읽기는 스레드별 읽기 전용 연결을 사용하며 WAL 덕분에 쓰기와 서로 막지 않습니다.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_DB_PATH,
+        *,
+        max_checkpoints_per_thread: int = DEFAULT_MAX_CHECKPOINTS_PER_THREAD,
+        synchronous: str = DEFAULT_SYNCHRONOUS,
+        batch_writes: bool = True,
+        serde=None,
+    ) -> None:
+        super().__init__(serde=serde)
+        self.path = path
+        self.max_checkpoints_per_thread = max_checkpoints_per_thread
+        self.synchronous = synchronous
+        # False면 쓰기마다 바로 커밋 (벤치마크 비교용)
+        self.batch_writes = batch_writes
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._writer_conn = self._connect()
+        self._writer_conn.executescript(_SCHEMA)
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+
+        self._lock = threading.Lock()
+        # thread_id -> 아직 쓰지 않은 put_writes 행 (덮어쓰기 여부, 행)
+        self._buffered: Dict[str, List[Tuple[bool, tuple]]] = {}
+        self._queue: "queue.Queue[Optional[_WriteOp]]" = queue.Queue()
+        self._closed = False
+        self.counters = {
+            "commits": 0,
+            "ops": 0,
+            "max_batch": 0,
+            "commit_ms": 0.0,
+            "checkpoints_written": 0,
+            "writes_written": 0,
+            "pruned_checkpoints": 0,
+            "errors": 0,
+        }
+        self._writer = threading.Thread(target=self._writer_loop, name="sqlite-checkpointer", daemon=True)
+        self._writer.start()
+        logger.info(f"SQLite 체크포인터 시작: {path} (WAL, synchronous={synchronous})")
+
+    # --- 연결 ---
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: 트랜잭션은 BEGIN/COMMIT으로 직접 관리
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._lock:
+                self._readers.append(conn)
+        return conn
+
+    # --- writer 스레드 ---
+    def _writer_loop(self) -> None:
+        while True:
+            op = self._queue.get()
+            if op is None:
+                return
+            batch = [op]
+            stop = False
+            while len(batch) < MAX_BATCH_OPS:
+                try:
+                    pending = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if pending is None:
+                    stop = True
+                    break
+                batch.append(pending)
+            self._commit(batch)
+            if stop:
+                return
+
+    def _commit(self, batch: List[_WriteOp]) -> None:
+        conn = self._writer_conn
+        start = time.perf_counter()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            pruned = 0
+            for op in batch:
+                pruned += self._apply(conn, op)
+            conn.execute("COMMIT")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            self.counters["errors"] += 1
+            logger.error(f"체크포인트 커밋 실패 ({len(batch)}건): {e}")
+            for op in batch:
+                op.future.set_exception(e)
+            return
+        self.counters["commits"] += 1
+        self.counters["ops"] += len(batch)
+        self.counters["max_batch"] = max(self.counters["max_batch"], len(batch))
+        self.counters["commit_ms"] += (time.perf_counter() - start) * 1000
+        self.counters["pruned_checkpoints"] += pruned
+        for op in batch:
+            op.future.set_result(None)
+
+    def _apply(self, conn: sqlite3.Connection, op: _WriteOp) -> int:
+        if op.delete_thread is not None:
+            conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (op.delete_thread,))
+            conn.execute("DELETE FROM writes WHERE thread_id = ?", (op.delete_thread,))
+            return 0
+        for upsert, row in op.writes:
+            conn.execute(_INSERT_WRITE.format(mode="REPLACE" if upsert else "IGNORE"), row)
+        self.counters["writes_written"] += len(op.writes)
+        if op.checkpoint is not None:
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, "
+                "type, checkpoint, metadata_type, metadata) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                op.checkpoint,
+            )
+            self.counters["checkpoints_written"] += 1
+        if op.prune is None:
+            return 0
+        thread_id, checkpoint_ns = op.prune
+        params = (thread_id, checkpoint_ns, thread_id, checkpoint_ns, self.max_checkpoints_per_thread)
+        conn.execute(
+            f"DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id IN ({_EXCESS_IDS})", params
+        )
+        pruned = conn.execute(
+            f"DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id IN ({_EXCESS_IDS})",
+            params,
+        ).rowcount
+        if checkpoint_ns == "":
+            # 서브그래프 실행마다 새 네임스페이스가 생기므로, 남아 있는 가장 오래된 루트 체크포인트보다
+            # 오래된 서브그래프 체크포인트도 함께 정리 (끝난 서브그래프 실행의 이력)
+            oldest = conn.execute(
+                "SELECT MIN(checkpoint_id) FROM (SELECT checkpoint_id FROM checkpoints "
+                "WHERE thread_id = ? AND checkpoint_ns = '' ORDER BY checkpoint_id DESC LIMIT ?)",
+                (thread_id, self.max_checkpoints_per_thread),
+            ).fetchone()[0]
+            if oldest is not None:
+                conn.execute(
+                    "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns != '' AND checkpoint_id < ?",
+                    (thread_id, oldest),
+                )
+                pruned += conn.execute(
+                    "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns != '' AND checkpoint_id < ?",
+                    (thread_id, oldest),
+                ).rowcount
+        return pruned
+
+    def _submit(self, op: _WriteOp) -> Future:
+        if self._closed:
+            raise RuntimeError("SQLite 체크포인터가 이미 종료되었습니다.")
+        self._queue.put(op)
+        return op.future
+
+    def _take_buffered(self, thread_id: str) -> List[Tuple[bool, tuple]]:
+        with self._lock:
+            return self._buffered.pop(thread_id, [])
+
+    # --- 직렬화 ---
+    def _checkpoint_row(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata) -> tuple:
+        configurable = config["configurable"]
+        type_, serialized = self.serde.dumps_typed(checkpoint)
+        metadata_type, serialized_metadata = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        return (
+            str(configurable["thread_id"]),
+            configurable["checkpoint_ns"],
+            checkpoint["id"],
+            configurable.get("checkpoint_id"),
+            type_,
+            serialized,
+            metadata_type,
+            serialized_metadata,
+        )
+
+    def _write_rows(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                    task_path: str) -> List[Tuple[bool, tuple]]:
+        configurable = config["configurable"]
+        upsert = all(channel in WRITES_IDX_MAP for channel, _ in writes)
+        return [
+            (upsert, (
+                str(configurable["thread_id"]),
+                str(configurable.get("checkpoint_ns", "")),
+                str(configurable["checkpoint_id"]),
+                task_id,
+                task_path,
+                WRITES_IDX_MAP.get(channel, idx),
+                channel,
+                *self.serde.dumps_typed(value),
+            ))
+            for idx, (channel, value) in enumerate(writes)
+        ]
+
+    def _make_tuple(self, conn: sqlite3.Connection, row: tuple, checkpoint_ns: str) -> CheckpointTuple:
+        thread_id, checkpoint_id, parent_checkpoint_id, type_, checkpoint, metadata_type, metadata = row
+        rows = conn.execute(
+            "SELECT task_id, idx, channel, type, value FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        # 아직 디스크에 쓰지 않은 현재 슈퍼스텝의 쓰기도 포함
+        with self._lock:
+            buffered = [
+                r for _, r in self._buffered.get(thread_id, ()) if r[1] == checkpoint_ns and r[2] == checkpoint_id
+            ]
+        writes = {(task_id, idx): (task_id, channel, type_w, value) for task_id, idx, channel, type_w, value in rows}
+        for r in buffered:
+            writes.setdefault((r[3], r[5]), (r[3], r[6], r[7], r[8]))
+        pending = [
+            (task_id, channel, self.serde.loads_typed((type_w, value)))
+            for _, (task_id, channel, type_w, value) in sorted(writes.items())
+        ]
+        return CheckpointTuple(
+            {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}},
+            self.serde.loads_typed((type_, checkpoint)),
+            self.serde.loads_typed((metadata_type, metadata)),
+            (
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                  "checkpoint_id": parent_checkpoint_id}}
+                if parent_checkpoint_id else None
+            ),
+            pending,
+        )
+
+    # --- BaseCheckpointSaver 구현 ---
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        conn = self._reader()
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        columns = "thread_id, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata"
+        if checkpoint_id := get_checkpoint_id(config):
+            row = conn.execute(
+                f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                (thread_id, checkpoint_ns, checkpoint_id),
+            ).fetchone()
+        else:
+            row = conn.execute(
+                f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                "ORDER BY checkpoint_id DESC LIMIT 1",
+                (thread_id, checkpoint_ns),
+            ).fetchone()
+        return self._make_tuple(conn, row, checkpoint_ns) if row else None
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        conn = self._reader()
+        clauses, params = [], []
+        if config is not None:
+            clauses.append("thread_id = ?")
+            params.append(str(config["configurable"]["thread_id"]))
+            checkpoint_ns = config["configurable"].get("checkpoint_ns")
+            if checkpoint_ns is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before is not None and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = conn.execute(
+            "SELECT thread_id, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata, "
+            f"checkpoint_ns FROM checkpoints {where} ORDER BY checkpoint_id DESC",
+            params,
+        ).fetchall()
+        count = 0
+        for *row, checkpoint_ns in rows:
+            item = self._make_tuple(conn, tuple(row), checkpoint_ns)
+            if filter and not all(item.metadata.get(key) == value for key, value in filter.items()):
+                continue
+            yield item
+            count += 1
+            if limit is not None and count >= limit:
+                return
+
+    def _put_op(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata) -> _WriteOp:
+        thread_id = str(config["configurable"]["thread_id"])
+        return _WriteOp(
+            checkpoint=self._checkpoint_row(config, checkpoint, metadata),
+            writes=self._take_buffered(thread_id),
+            prune=(thread_id, config["configurable"]["checkpoint_ns"]),
+        )
+
+    @staticmethod
+    def _saved_config(config: RunnableConfig, checkpoint: Checkpoint) -> RunnableConfig:
+        return {
+            "configurable": {
+                "thread_id": config["configurable"]["thread_id"],
+                "checkpoint_ns": config["configurable"]["checkpoint_ns"],
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        self._submit(self._put_op(config, checkpoint, metadata)).result()
+        return self._saved_config(config, checkpoint)
+
+    def _put_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                    task_path: str) -> Optional[Future]:
+        thread_id = str(config["configurable"]["thread_id"])
+        rows = self._write_rows(config, writes, task_id, task_path)
+        if self.batch_writes and not any(channel in _FLUSH_NOW_CHANNELS for channel, _ in writes):
+            with self._lock:
+                self._buffered.setdefault(thread_id, []).extend(rows)
+            return None
+        # 실행이 여기서 끝날 수 있는 쓰기(오류/인터럽트)는 버퍼와 함께 바로 기록
+        return self._submit(_WriteOp(writes=self._take_buffered(thread_id) + rows))
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                   task_path: str = "") -> None:
+        future = self._put_writes(config, writes, task_id, task_path)
+        if future is not None:
+            future.result()
+
+    def delete_thread(self, thread_id: str) -> None:
+        self._take_buffered(str(thread_id))
+        self._submit(_WriteOp(delete_thread=str(thread_id))).result()
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        # WAL 읽기는 쓰기에 막히지 않고 1ms 미만이므로 이벤트 루프에서 바로 실행
+        return self.get_tuple(config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        for item in self.list(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        await asyncio.wrap_future(self._submit(self._put_op(config, checkpoint, metadata)))
+        return self._saved_config(config, checkpoint)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                          task_path: str = "") -> None:
+        future = self._put_writes(config, writes, task_id, task_path)
+        if future is not None:
+            await asyncio.wrap_future(future)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        self._take_buffered(str(thread_id))
+        await asyncio.wrap_future(self._submit(_WriteOp(delete_thread=str(thread_id))))
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        # MemorySaver와 같은 문자열 버전 (정렬 가능한 정수부 + 난수부)
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    # --- 종료 / 리포트 ---
+    def flush(self) -> None:
+        """버퍼에 남은 쓰기를 모두 기록하고 완료될 때까지 기다립니다."""
+        with self._lock:
+            buffered, self._buffered = self._buffered, {}
+        rows = [row for thread_rows in buffered.values() for row in thread_rows]
+        self._submit(_WriteOp(writes=rows)).result()
+
+    def close(self) -> None:
+        """남은 쓰기를 기록하고 writer 스레드와 연결을 닫습니다."""
+        if self._closed:
+            return
+        self.flush()
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+        self._writer_conn.close()
+        with self._lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+        logger.info(f"SQLite 체크포인터 종료: {self.stats()['commits']}회 커밋")
+
+    def stats(self) -> dict:
+        """보유 스레드/체크포인트 수, DB 파일 크기, 커밋(배치) 통계를 반환합니다."""
+        stats = dict(self.counters)
+        stats["commit_ms"] = round(stats["commit_ms"], 1)
+        stats["avg_batch"] = round(stats["ops"] / stats["commits"], 2) if stats["commits"] else 0.0
+        stats["queued"] = self._queue.qsize()
+        with self._lock:
+            stats["buffered_writes"] = sum(len(rows) for rows in self._buffered.values())
+        if not self._closed:
+            conn = self._reader()
+            stats["threads"] = conn.execute("SELECT COUNT(DISTINCT thread_id) FROM checkpoints").fetchone()[0]
+            stats["checkpoints"] = conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+        stats["db_bytes"] = sum(
+            os.path.getsize(path) for path in (self.path, f"{self.path}-wal") if os.path.exists(path)
+        )
+        return stats
@@ -9,3 +9,5 @@ class SmartHomeState(TypedDict):
     # 필요시 추가 필드 (예: 레시피, 단계 등)
     recipe: dict | None
     current_step: int | None
+    # 쿠킹 모드 진입 시 미리 조회한 냉장고/주방기기/선호도 정보 (utils/prefetch.py)
+    cooking_context: dict | None
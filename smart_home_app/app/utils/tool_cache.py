@@ -0,0 +1,184 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from langchain_core.messages import ToolMessage
+
+logger = logging.getLogger("tool_cache")
+logging.basicConfig(level=logging.INFO)
+
+# 읽기 전용 MCP 도구와 캐시 TTL(초)
+# 여기에 없는 도구는 "변경 도구"로 간주되어 같은 서버(기기)의 캐시를 무효화합니다.
+CACHEABLE_TOOLS: Dict[str, float] = {
+    # refrigerator
+    "get_refrigerator_status": 10,
+    "get_food_items": 30,
+    "get_display_state": 10,
+    "get_cooking_state": 5,
+    # personalization
+    "get_preferences": 300,
+    "get_appliances": 300,
+    "analyze_preferences": 300,
+    # cooking
+    "get_available_foods": 600,
+    "get_recipe": 600,
+    "recommend_food": 300,
+    # mobile
+    "get_messages": 30,
+    "get_calendar_events": 30,
+    "get_alarms": 30,
+    # 기기 상태 조회
+    "get_induction_status": 5,
+    "get_microwave_status": 5,
+    "get_tv_status": 10,
+    "get_tv_channels": 600,
+    "get_audio_status": 10,
+    "get_audio_playlists": 600,
+    "get_playlist_songs": 600,
+    "get_light_status": 10,
+    "get_curtain_status": 10,
+}
+
+# 변경 도구가 자기 서버 외에 추가로 무효화해야 하는 서버
+# (예: cook_recipe는 냉장고 디스플레이/요리 상태를 바꿈)
+EXTRA_INVALIDATIONS: Dict[str, Tuple[str, ...]] = {
+    "cook_recipe": ("refrigerator",),
+    "add_food_item": ("cooking",),
+    "add_preference": ("cooking",),
+    "delete_preference": ("cooking",),
+}
+
+
+def declare_cacheable(tool_name: str, ttl_seconds: float) -> None:
+    """도구를 캐시 대상으로 등록합니다. (ttl_seconds <= 0 이면 캐시 대상에서 제외)"""
+    if ttl_seconds > 0:
+        CACHEABLE_TOOLS[tool_name] = ttl_seconds
+    else:
+        CACHEABLE_TOOLS.pop(tool_name, None)
+
+
+def declare_invalidation(tool_name: str, servers: Iterable[str]) -> None:
+    """변경 도구가 추가로 무효화할 서버를 등록합니다."""
+    EXTRA_INVALIDATIONS[tool_name] = tuple(servers)
+
+
+def _is_error_result(result: Any) -> bool:
+    # 실패한 호출은 캐시하지 않음: MCP 오류 응답(isError)은 예외로 올라오고, 도구가 ToolMessage를 직접 돌려주면 status로 판단
+    if isinstance(result, ToolMessage):
+        return result.status == "error"
+    # 모의 서버 도구는 백엔드 요청이 실패해도 {"error": ...}를 정상 결과로 돌려줌 (최상위 "error" 키로만 판단)
+    if isinstance(result, tuple):
+        result = result[0]
+    if isinstance(result, str):
+        try:
+            result = json.loads(result)
+        except ValueError:
+            return False
+    return isinstance(result, dict) and "error" in result
+
+
+class ToolResultCache:
+    """
+    MCP 도구 결과 read-through 캐시입니다.
+    - CACHEABLE_TOOLS에 등록된 도구만 (서버, 도구, 인자) 키로 TTL 동안 캐시
+    - 같은 키로 동시에 들어온 요청은 한 번만 실제 호출 (single-flight)
+    - 변경 도구 호출 시 같은 서버 + EXTRA_INVALIDATIONS 서버의 캐시를 무효화
+    - 예외로 끝난 호출, status="error"인 ToolMessage, 최상위 "error" 키가 있는 JSON 결과는 캐시하지 않음
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[tuple, Tuple[float, Any]] = {}
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        # 서버별 세대 번호: 무효화 이후 끝난 이전 호출 결과가 캐시에 들어가지 않도록 함
+        self._generation: Dict[str, int] = {}
+        self.counters = {"hits": 0, "misses": 0, "shared": 0, "invalidations": 0}
+        self.per_tool: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def _key(server: str, tool: str, args: dict) -> tuple:
+        return server, tool, json.dumps(args or {}, sort_keys=True, ensure_ascii=False, default=str)
+
+    def _count(self, tool: str, kind: str) -> None:
+        self.counters[kind] += 1
+        stats = self.per_tool.setdefault(tool, {"hits": 0, "misses": 0})
+        if kind in stats:
+            stats[kind] += 1
+
+    def invalidate(self, server: str) -> None:
+        self._generation[server] = self._generation.get(server, 0) + 1
+        stale = [key for key in self._entries if key[0] == server]
+        for key in stale:
+            del self._entries[key]
+        self.counters["invalidations"] += 1
+        if stale:
+            logger.info(f"'{server}' 서버 캐시 {len(stale)}건 무효화")
+
+    async def call(self, server: str, tool: str, args: dict, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        ttl = CACHEABLE_TOOLS.get(tool)
+        if ttl is None:
+            # 변경 도구: 호출 전후로 무효화 (호출 중 들어온 읽기 결과도 버리도록)
+            targets = (server, *EXTRA_INVALIDATIONS.get(tool, ()))
+            for target in targets:
+                self.invalidate(target)
+            try:
+                return await fetch()
+            finally:
+                for target in targets:
+                    self.invalidate(target)
+
+        key = self._key(server, tool, args)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._count(tool, "hits")
+            return entry[1]
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self._count(tool, "hits")
+            self.counters["shared"] += 1
+            return await asyncio.shield(pending)
+
+        self._count(tool, "misses")
+        generation = self._generation.get(server, 0)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await fetch()
+        except BaseException as e:
+            if not future.done():
+                future.set_exception(e)
+                # 기다리는 쪽이 없을 때 "exception was never retrieved" 경고 방지
+                future.exception()
+            raise
+        else:
+            future.set_result(result)
+            if self._generation.get(server, 0) == generation and not _is_error_result(result):
+                self._entries[key] = (time.monotonic() + ttl, result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            **self.counters,
+            "entries": len(self._entries),
+            "hit_rate": round(self.counters["hits"] / lookups, 4) if lookups else 0.0,
+            "per_tool": self.per_tool,
+        }
+
+
+# 프로세스 공용 인스턴스
+_cache: Optional[ToolResultCache] = None
+
+
+def get_tool_cache() -> ToolResultCache:
+    global _cache
+    if _cache is None:
+        _cache = ToolResultCache()
+    return _cache
@@ -0,0 +1,270 @@
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+
+from utils.history import estimate_tokens
+
+logger = logging.getLogger("tool_selector")
+logging.basicConfig(level=logging.INFO)
+
+# 턴마다 관련 도구 top-K만 프롬프트에 설명하고 모델에 바인딩할지 여부
+TOOL_SELECTOR_ENABLED = os.environ.get("TOOL_SELECTOR", "1").lower() not in ("0", "false", "no")
+TOOL_SELECTOR_TOP_K = int(os.environ.get("TOOL_SELECTOR_TOP_K", "8"))
+# 도구별 예시 발화 (색인에 함께 넣어 사용자 표현과 도구 설명의 어휘 차이를 줄임)
+TOOL_EXAMPLES_PATH = os.environ.get(
+    "TOOL_EXAMPLES_PATH", os.path.join(os.path.dirname(__file__), "../prompts/tool_examples.json")
+)
+
+# MCP 서버 이름 -> 사용자가 흔히 쓰는 표현 (해당 서버의 모든 도구 문서에 추가)
+SERVER_ALIASES = {
+    "refrigerator": "냉장고 식재료 재료",
+    "induction": "인덕션 화구 가스레인지",
+    "microwave": "전자레인지",
+    "mobile": "휴대폰 핸드폰 모바일 문자 메시지 일정 알람",
+    "cooking": "요리 음식 레시피 메뉴",
+    "personalization": "선호도 취향 개인화 가전",
+    "tv": "티비 텔레비전",
+    "audio": "오디오 음악 노래 스피커",
+    "light": "조명 불 전등",
+    "curtain": "커튼 블라인드",
+}
+
+# BM25 파라미터
+BM25_K1 = 1.2
+BM25_B = 0.75
+# 선택 결과 캐시 크기 (같은 턴 안의 여러 LLM 호출, 같은 질문 반복)
+SELECTION_CACHE_SIZE = 512
+# 도구 부분집합별 bind_tools 결과 캐시 크기
+BOUND_MODEL_CACHE_SIZE = 128
+
+_WORD_RE = re.compile(r"[0-9a-z]+|[가-힣]+")
+# 도구 설명에서 색인하지 않을 부분 (응답 형식/예시 JSON은 사용자 질문과 무관한 어휘가 대부분)
+_DESCRIPTION_CUT_RE = re.compile(r"\n\s*(Returns?:|응답에 포함되는 정보:|예시 응답:)")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    영문/숫자는 단어 단위, 한글은 음절 bigram으로 나눕니다.
+    (조사/어미가 붙어도 "냉장고에" -> 냉장, 장고, 고에 처럼 어간 bigram이 겹치도록)
+    """
+    tokens: List[str] = []
+    for word in _WORD_RE.findall(text.lower().replace("_", " ")):
+        if "가" <= word[0] <= "힣":
+            if len(word) == 1:
+                tokens.append(word)
+            else:
+                tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+def index_description(description: str) -> str:
+    return _DESCRIPTION_CUT_RE.split(description or "", maxsplit=1)[0]
+
+
+def tool_server(tool) -> Optional[str]:
+    metadata = getattr(tool, "metadata", None) or {}
+    return metadata.get("mcp_server")
+
+
+def tool_prompt_tokens(tool) -> int:
+    """도구 하나가 요청에 더하는 토큰 수 (시스템 프롬프트의 도구 설명 + 바인딩되는 도구 스키마)"""
+    description = getattr(tool, "description", "") or ""
+    try:
+        args = getattr(tool, "args", {}) or {}
+    except Exception:
+        args = {}
+    line = f"{getattr(tool, 'name', '')}: {description}"
+    schema = json.dumps({"name": getattr(tool, "name", ""), "description": description, "parameters": args},
+                        ensure_ascii=False, default=str)
+    return estimate_tokens(line) + estimate_tokens(schema)
+
+
+def load_tool_examples(path: Optional[str] = TOOL_EXAMPLES_PATH) -> Dict[str, List[str]]:
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class ToolIndex:
+    """도구 이름/설명/서버 별칭/예시 발화로 만든 BM25 색인입니다."""
+
+    def __init__(self, tools: Sequence, examples: Optional[Dict[str, List[str]]] = None) -> None:
+        examples = examples if examples is not None else load_tool_examples()
+        self.tools = list(tools)
+        self._doc_terms: List[Counter] = []
+        self._doc_lengths: List[int] = []
+        df: Counter = Counter()
+        for tool in self.tools:
+            name = getattr(tool, "name", "")
+            text = " ".join([
+                name,
+                SERVER_ALIASES.get(tool_server(tool) or "", ""),
+                index_description(getattr(tool, "description", "")),
+                " ".join(examples.get(name, [])),
+            ])
+            terms = Counter(tokenize(text))
+            self._doc_terms.append(terms)
+            self._doc_lengths.append(sum(terms.values()))
+            df.update(terms.keys())
+        count = len(self.tools)
+        self._avg_length = (sum(self._doc_lengths) / count) if count else 0.0
+        self._idf = {term: math.log(1 + (count - n + 0.5) / (n + 0.5)) for term, n in df.items()}
+
+    def scores(self, query: str) -> List[float]:
+        query_terms = set(tokenize(query))
+        results = []
+        for terms, length in zip(self._doc_terms, self._doc_lengths):
+            score = 0.0
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / self._avg_length) if self._avg_length else BM25_K1
+            for term in query_terms:
+                tf = terms.get(term)
+                if tf:
+                    score += self._idf[term] * tf * (BM25_K1 + 1) / (tf + norm)
+            results.append(score)
+        return results
+
+    def search(self, query: str, top_k: int) -> List[Tuple[float, object]]:
+        """점수가 0보다 큰 도구를 점수 순으로 최대 top_k개 반환합니다."""
+        ranked = sorted(
+            ((score, i) for i, score in enumerate(self.scores(query)) if score > 0),
+            key=lambda item: (-item[0], item[1]),
+        )
+        return [(score, self.tools[i]) for score, i in ranked[:top_k]]
+
+
+# 프로세스 전체 누적 통계 (GET /stats)
+_stats_lock = threading.Lock()
+_stats = {
+    "selections": 0,
+    "cache_hits": 0,
+    "fallback_previous_turn": 0,
+    "fallback_all_tools": 0,
+    "selected_tools": 0,
+    "catalog_tokens": 0,
+    "selected_tokens": 0,
+}
+
+
+def _record(**deltas: int) -> None:
+    with _stats_lock:
+        for key, value in deltas.items():
+            _stats[key] += value
+
+
+def get_tool_selector_stats() -> dict:
+    with _stats_lock:
+        stats = dict(_stats)
+    selections = stats["selections"]
+    stats["tokens_saved"] = stats["catalog_tokens"] - stats["selected_tokens"]
+    stats["avg_selected_tools"] = round(stats["selected_tools"] / selections, 2) if selections else 0.0
+    stats["saved_ratio"] = round(stats["tokens_saved"] / stats["catalog_tokens"], 3) if stats["catalog_tokens"] else 0.0
+    return stats
+
+
+class ToolSelector:
+    """
+    사용자 메시지마다 관련 있는 도구 top-K를 고릅니다.
+    - 질문: 마지막 사용자 메시지. 아무 도구와도 겹치지 않으면 직전 사용자 메시지를 함께 사용
+      ("응 그렇게 해줘" 같은 후속 답변), 그래도 없으면 전체 도구를 사용합니다.
+    - 이번 턴에서 이미 호출한 도구는 항상 포함해 ReAct 루프 중간에 도구가 빠지지 않게 합니다.
+    색인은 도구 구성이 바뀔 때(에이전트 재생성 시) 한 번만 만듭니다.
+    """
+
+    def __init__(self, tools: Sequence, top_k: int = TOOL_SELECTOR_TOP_K,
+                 examples: Optional[Dict[str, List[str]]] = None) -> None:
+        self.tools = list(tools)
+        self.top_k = top_k
+        self.index = ToolIndex(self.tools, examples)
+        self._by_name = {tool.name: tool for tool in self.tools}
+        self._tokens = {tool.name: tool_prompt_tokens(tool) for tool in self.tools}
+        self.catalog_tokens = sum(self._tokens.values())
+        self._lock = threading.Lock()
+        self._selections: "OrderedDict[tuple, List]" = OrderedDict()
+        self._bound: "OrderedDict[tuple, object]" = OrderedDict()
+        logger.info(f"도구 색인 생성: 도구 {len(self.tools)}개, 전체 설명 약 {self.catalog_tokens} 토큰, top_k={top_k}")
+
+    def select(self, query: str, previous_query: str = "", always: Iterable[str] = ()) -> List:
+        """질문에 맞는 도구 목록을 원래 도구 순서대로 반환합니다."""
+        hits = self.index.search(query, self.top_k)
+        fallback = None
+        if not hits and previous_query:
+            hits = self.index.search(f"{previous_query} {query}", self.top_k)
+            fallback = "fallback_previous_turn"
+        if not hits:
+            selected = list(self.tools)
+            fallback = "fallback_all_tools"
+        else:
+            names = {tool.name for _, tool in hits} | {name for name in always if name in self._by_name}
+            selected = [tool for tool in self.tools if tool.name in names]
+
+        selected_tokens = sum(self._tokens[tool.name] for tool in selected)
+        deltas = {
+            "selections": 1,
+            "selected_tools": len(selected),
+            "catalog_tokens": self.catalog_tokens,
+            "selected_tokens": selected_tokens,
+        }
+        if fallback:
+            deltas[fallback] = 1
+        _record(**deltas)
+        return selected
+
+    def select_for_messages(self, messages: List[BaseMessage]) -> List:
+        """에이전트 상태의 메시지로 이번 턴의 도구를 고릅니다. (같은 턴의 LLM 호출끼리는 결과를 재사용)"""
+        human_indexes = [i for i, m in enumerate(messages) if isinstance(m, HumanMessage)]
+        if not human_indexes:
+            return list(self.tools)
+        last = human_indexes[-1]
+        query = _text(messages[last])
+        previous = _text(messages[human_indexes[-2]]) if len(human_indexes) > 1 else ""
+        called = tuple(sorted({
+            call["name"]
+            for m in messages[last + 1:] if isinstance(m, AIMessage)
+            for call in m.tool_calls
+        }))
+
+        key = (query, previous, called)
+        with self._lock:
+            cached = self._selections.get(key)
+            if cached is not None:
+                self._selections.move_to_end(key)
+        if cached is not None:
+            _record(cache_hits=1)
+            return cached
+
+        selected = self.select(query, previous, called)
+        with self._lock:
+            self._selections[key] = selected
+            while len(self._selections) > SELECTION_CACHE_SIZE:
+                self._selections.popitem(last=False)
+        return selected
+
+    def bind(self, llm, tools: Sequence):
+        """도구 부분집합별 bind_tools 결과를 캐시해서 반환합니다."""
+        key = tuple(tool.name for tool in tools)
+        with self._lock:
+            bound = self._bound.get(key)
+            if bound is not None:
+                self._bound.move_to_end(key)
+                return bound
+        bound = llm.bind_tools(list(tools))
+        with self._lock:
+            self._bound[key] = bound
+            while len(self._bound) > BOUND_MODEL_CACHE_SIZE:
+                self._bound.popitem(last=False)
+        return bound
+
+
+def _text(message: BaseMessage) -> str:
+    content = message.content
+    return content if isinstance(content, str) else json.dumps(content, ensure_ascii=False, default=str)
@@ -0,0 +1,118 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+logger = logging.getLogger("tool_spans")
+logging.basicConfig(level=logging.INFO)
+
+
+class ToolSpanTracker(BaseCallbackHandler):
+    """
+    ReAct 에이전트의 도구 실행 구간(span)을 측정하는 콜백 핸들러입니다.
+    한 스텝에서 함께 실행된 도구 호출을 하나의 배치로 묶어
+    실제 경과 시간(wall)과 순차 실행했을 때의 시간(각 호출 시간의 합)을 비교합니다.
+    도구 호출은 도구 노드 태스크(Send 사용 시 호출마다 별도 태스크) 아래에서 실행되므로,
+    그 태스크의 부모(에이전트 그래프 run)를 배치 키로 사용합니다.
+    """
+
+    run_inline = True
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # 체인 run_id -> 부모 run_id
+        self._chain_parents: Dict[UUID, Optional[UUID]] = {}
+        # 배치 키(에이전트 그래프 run_id) -> 배치 정보
+        self._batches: Dict[Optional[UUID], dict] = {}
+        # 도구 run_id -> (배치 키, 시작 시각)
+        self._runs: Dict[UUID, tuple] = {}
+        self.counters = {
+            "batches": 0,
+            "parallel_batches": 0,
+            "tool_calls": 0,
+            "wall_ms": 0.0,
+            "serial_ms": 0.0,
+            "saved_ms": 0.0,
+        }
+
+    def on_chain_start(
+        self,
+        serialized: Dict[str, Any],
+        inputs: Dict[str, Any],
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        **kwargs: Any,
+    ) -> None:
+        self._chain_parents[run_id] = parent_run_id
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._chain_parents.pop(run_id, None)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._chain_parents.pop(run_id, None)
+
+    def on_tool_start(
+        self,
+        serialized: Dict[str, Any],
+        input_str: str,
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        **kwargs: Any,
+    ) -> None:
+        now = time.perf_counter()
+        key = self._chain_parents.get(parent_run_id, parent_run_id)
+        with self._lock:
+            batch = self._batches.get(key)
+            if batch is None:
+                batch = {"start": now, "open": 0, "calls": 0, "serial": 0.0}
+                self._batches[key] = batch
+            batch["open"] += 1
+            batch["calls"] += 1
+            self._runs[run_id] = (key, now)
+
+    def _finish(self, run_id: UUID) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            entry = self._runs.pop(run_id, None)
+            if entry is None:
+                return
+            key, started = entry
+            batch = self._batches[key]
+            batch["serial"] += now - started
+            batch["open"] -= 1
+            if batch["open"] > 0:
+                return
+            del self._batches[key]
+            wall_ms = (now - batch["start"]) * 1000
+            serial_ms = batch["serial"] * 1000
+            saved_ms = max(serial_ms - wall_ms, 0.0)
+            self.counters["batches"] += 1
+            self.counters["tool_calls"] += batch["calls"]
+            self.counters["wall_ms"] += wall_ms
+            self.counters["serial_ms"] += serial_ms
+            self.counters["saved_ms"] += saved_ms
+            if batch["calls"] > 1:
+                self.counters["parallel_batches"] += 1
+                logger.info(
+                    f"도구 {batch['calls']}개 병렬 실행: wall {wall_ms:.1f}ms / 순차 합계 {serial_ms:.1f}ms "
+                    f"(절약 {saved_ms:.1f}ms)"
+                )
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {key: round(value, 1) if isinstance(value, float) else value for key, value in self.counters.items()}
+
+
+# 프로세스 공용 인스턴스 (그래프 실행 config의 callbacks에 추가)
+tool_span_tracker = ToolSpanTracker()
@@ -0,0 +1,416 @@
+import abc
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+import zlib
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from utils.metrics import _token_usage, node_path
+
+logger = logging.getLogger("tracing")
+logging.basicConfig(level=logging.INFO)
+
+# 환경 변수 기본값
+# 내보낼 곳: "none" | "jsonl" | "langfuse"
+TRACE_SINK = os.environ.get("TRACE_SINK", "none").lower()
+# 세션 단위 head 샘플링 비율 (샘플된 세션은 모든 턴을 span까지 기록)
+TRACE_SAMPLE_RATE = float(os.environ.get("TRACE_SAMPLE_RATE", "0.05"))
+# 샘플되지 않은 요청도 실패하면 요약 trace(root span)를 남김
+TRACE_ERRORS = os.environ.get("TRACE_ERRORS", "1") == "1"
+TRACE_BATCH_SIZE = int(os.environ.get("TRACE_BATCH_SIZE", "100"))
+TRACE_FLUSH_INTERVAL = float(os.environ.get("TRACE_FLUSH_INTERVAL", "5"))
+# 내보내기가 밀릴 때 버퍼에 둘 최대 trace 수 (넘으면 오래된 것부터 버림)
+TRACE_MAX_BUFFER = int(os.environ.get("TRACE_MAX_BUFFER", "10000"))
+TRACE_JSONL_PATH = os.environ.get(
+    "TRACE_JSONL_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs", "traces.jsonl")
+)
+# 입력/출력 미리보기 최대 길이
+_PREVIEW_CHARS = 500
+
+
+def _preview(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    text = value if isinstance(value, str) else str(getattr(value, "content", value))
+    return text[:_PREVIEW_CHARS]
+
+
+# --- span 수집 ---
+class TraceCollector(BaseCallbackHandler):
+    """
+    샘플된 요청 하나의 span(그래프 노드, LLM 호출, 도구 호출)을 모으는 콜백 핸들러입니다.
+    요청마다 새로 만들어 그 요청의 config에만 붙이므로, 샘플되지 않은 요청에는 비용이 없습니다.
+    노드/LLM/도구가 아닌 체인은 부모 관계만 기록해 span 트리를 이어 붙입니다.
+    """
+
+    run_inline = True
+
+    def __init__(self, started: float) -> None:
+        self._started = started
+        # 체인 run_id -> 부모 run_id (span이 아닌 체인을 건너뛰어 부모 span을 찾기 위해)
+        self._parents: Dict[UUID, Optional[UUID]] = {}
+        self._open: Dict[UUID, dict] = {}
+        self.spans: List[dict] = []
+
+    def _offset_ms(self) -> float:
+        return round((time.perf_counter() - self._started) * 1000, 3)
+
+    def _parent_span(self, parent_run_id: Optional[UUID]) -> Optional[str]:
+        while parent_run_id is not None:
+            if parent_run_id in self._open:
+                return str(parent_run_id)
+            parent_run_id = self._parents.get(parent_run_id)
+        return None
+
+    def _start(self, run_id: UUID, parent_run_id: Optional[UUID], kind: str, name: str, **attributes: Any) -> None:
+        self._open[run_id] = {
+            "id": str(run_id),
+            "parent_id": self._parent_span(parent_run_id),
+            "kind": kind,
+            "name": name,
+            "start_ms": self._offset_ms(),
+            **attributes,
+        }
+
+    def _end(self, run_id: UUID, error: Optional[BaseException] = None, **attributes: Any) -> None:
+        span = self._open.pop(run_id, None)
+        self._parents.pop(run_id, None)
+        if span is None:
+            return
+        span["duration_ms"] = round(self._offset_ms() - span["start_ms"], 3)
+        if error is not None:
+            span["error"] = f"{type(error).__name__}: {error}"[:_PREVIEW_CHARS]
+        span.update(attributes)
+        self.spans.append(span)
+
+    def close_open(self, reason: str) -> None:
+        """끝나지 않은 span(요청이 취소된 경우)을 reason으로 닫아 spans에 옮깁니다."""
+        offset = self._offset_ms()
+        for span in self._open.values():
+            span["duration_ms"] = round(offset - span["start_ms"], 3)
+            span["error"] = reason
+            self.spans.append(span)
+        self._open.clear()
+        self._parents.clear()
+
+    # --- 그래프 노드 ---
+    def on_chain_start(self, serialized: Dict[str, Any], inputs: Any, *, run_id: UUID,
+                       parent_run_id: Optional[UUID] = None, metadata: Optional[Dict[str, Any]] = None,
+                       **kwargs: Any) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        if node and kwargs.get("name") == node:
+            self._start(run_id, parent_run_id, "node", node_path(metadata))
+        else:
+            self._parents[run_id] = parent_run_id
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error)
+
+    # --- LLM ---
+    def _start_llm(self, run_id: UUID, parent_run_id: Optional[UUID], metadata: Optional[Dict[str, Any]],
+                   kwargs: Dict[str, Any]) -> None:
+        metadata = metadata or {}
+        params = kwargs.get("invocation_params") or {}
+        model = metadata.get("ls_model_name") or params.get("model_name") or params.get("model") or "unknown"
+        self._start(run_id, parent_run_id, "llm", str(model))
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: Any, *, run_id: UUID,
+                            parent_run_id: Optional[UUID] = None, metadata: Optional[Dict[str, Any]] = None,
+                            **kwargs: Any) -> None:
+        self._start_llm(run_id, parent_run_id, metadata, kwargs)
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: Any, *, run_id: UUID,
+                     parent_run_id: Optional[UUID] = None, metadata: Optional[Dict[str, Any]] = None,
+                     **kwargs: Any) -> None:
+        self._start_llm(run_id, parent_run_id, metadata, kwargs)
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        input_tokens, output_tokens = _token_usage(response)
+        self._end(run_id, input_tokens=input_tokens, output_tokens=output_tokens)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error)
+
+    # --- 도구 ---
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID,
+                      parent_run_id: Optional[UUID] = None, **kwargs: Any) -> None:
+        name = kwargs.get("name") or (serialized or {}).get("name") or "tool"
+        self._start(run_id, parent_run_id, "tool", name, input=_preview(input_str))
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, output=_preview(output))
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error)
+
+
+class Trace:
+    """
+    요청 하나의 trace입니다. 샘플되지 않았으면 callbacks가 비어 있고, finish는 실패했을 때만 기록을 남깁니다.
+    """
+
+    __slots__ = ("tracer", "name", "session_id", "sampled", "input", "start_time", "_started", "collector", "finished")
+
+    def __init__(self, tracer: "Tracer", name: str, session_id: str, sampled: bool, input: Any = None) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.session_id = session_id
+        self.sampled = sampled
+        self.input = input
+        self.start_time = time.time()
+        self._started = time.perf_counter()
+        self.collector = TraceCollector(self._started) if sampled else None
+        self.finished = False
+
+    @property
+    def callbacks(self) -> list:
+        """그래프 실행 config의 callbacks에 더할 핸들러 (샘플되지 않았으면 빈 목록)"""
+        return [self.collector] if self.collector is not None else []
+
+    def finish(self, output: Any = None, error: Optional[BaseException] = None, status: Optional[str] = None) -> None:
+        """
+        trace를 마칩니다. 두 번째 호출부터는 무시하므로 finally에서 status="cancelled"로 다시 불러도 됩니다.
+        status: "ok" | "error" | "cancelled" (생략하면 error 여부로 정함)
+        """
+        if self.finished:
+            return
+        self.finished = True
+        status = status or ("error" if error is not None else "ok")
+        if not self.sampled and (status == "ok" or not self.tracer.capture_errors):
+            return
+        if status == "cancelled" and self.collector is not None:
+            self.collector.close_open("cancelled")
+        self.tracer._submit({
+            "trace_id": str(uuid.uuid4()),
+            "name": self.name,
+            "session_id": self.session_id,
+            "sampled": self.sampled,
+            "start_time": datetime.fromtimestamp(self.start_time, timezone.utc).isoformat(),
+            "duration_ms": round((time.perf_counter() - self._started) * 1000, 3),
+            "input": _preview(self.input),
+            "output": _preview(output),
+            "status": status,
+            "error": f"{type(error).__name__}: {error}"[:_PREVIEW_CHARS] if error is not None else None,
+            "spans": self.collector.spans if self.collector is not None else [],
+        })
+
+
+# --- 내보내기 ---
+class TraceSink(abc.ABC):
+    """trace 묶음을 내보내는 곳의 인터페이스입니다. (Tracer의 내보내기 스레드에서 호출)"""
+
+    @abc.abstractmethod
+    def export(self, traces: List[dict]) -> None:
+        """trace 묶음을 내보냅니다. 실패는 예외로 알리며, Tracer가 그 묶음을 버리고 실패 횟수를 셉니다."""
+
+    def close(self) -> None:
+        pass
+
+
+class NoneTraceSink(TraceSink):
+    def export(self, traces: List[dict]) -> None:
+        pass
+
+
+class JSONLTraceSink(TraceSink):
+    """한 줄에 trace 하나를 JSON으로 추가합니다."""
+
+    def __init__(self, path: str = TRACE_JSONL_PATH) -> None:
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def export(self, traces: List[dict]) -> None:
+        lines = "".join(json.dumps(trace, ensure_ascii=False, default=str) + "\n" for trace in traces)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+class LangfuseTraceSink(TraceSink):
+    """
+    Langfuse로 내보냅니다. 자격 증명은 LANGFUSE_PUBLIC_KEY / LANGFUSE_SECRET_KEY / LANGFUSE_HOST 환경 변수를 씁니다.
+    langfuse 패키지는 이 sink를 고를 때만 import 합니다.
+    """
+
+    def __init__(self) -> None:
+        from langfuse import Langfuse
+
+        self._client = Langfuse()
+
+    def export(self, traces: List[dict]) -> None:
+        for trace in traces:
+            start = datetime.fromisoformat(trace["start_time"])
+            client_trace = self._client.trace(
+                id=trace["trace_id"],
+                name=trace["name"],
+                session_id=trace["session_id"],
+                input=trace["input"],
+                output=trace["output"],
+                timestamp=start,
+                metadata={"sampled": trace["sampled"], "status": trace["status"], "error": trace["error"],
+                          "duration_ms": trace["duration_ms"]},
+            )
+            for span in trace["spans"]:
+                fields = {
+                    "id": span["id"],
+                    "parent_observation_id": span["parent_id"],
+                    "name": span["name"],
+                    "start_time": start + timedelta(milliseconds=span["start_ms"]),
+                    "end_time": start + timedelta(milliseconds=span["start_ms"] + span.get("duration_ms", 0.0)),
+                    "input": span.get("input"),
+                    "output": span.get("output"),
+                    "level": "ERROR" if span.get("error") else "DEFAULT",
+                    "status_message": span.get("error"),
+                }
+                if span["kind"] == "llm":
+                    client_trace.generation(model=span["name"], usage={
+                        "input": span.get("input_tokens", 0), "output": span.get("output_tokens", 0)}, **fields)
+                else:
+                    client_trace.span(metadata={"kind": span["kind"]}, **fields)
+        self._client.flush()
+
+    def close(self) -> None:
+        self._client.shutdown()
+
+
+def create_sink(kind: str = TRACE_SINK) -> TraceSink:
+    """TRACE_SINK 설정에 맞는 sink를 만듭니다."""
+    if kind == "jsonl":
+        return JSONLTraceSink()
+    if kind == "langfuse":
+        return LangfuseTraceSink()
+    return NoneTraceSink()
+
+
+class Tracer:
+    """
+    세션 단위 head 샘플링 + 메모리 배치로 trace를 내보냅니다.
+    - 샘플 여부는 session_id 해시로 정해서, 같은 세션의 턴은 모두 기록되거나 모두 빠집니다.
+    - 샘플되지 않은 요청은 콜백을 붙이지 않고, 실패했을 때만 요약 trace를 남깁니다. (capture_errors)
+    - 끝난 trace는 버퍼에 모았다가 batch_size개가 차거나 flush_interval마다 내보내기 스레드가 sink로 보냅니다.
+    """
+
+    def __init__(
+        self,
+        sink: Optional[TraceSink] = None,
+        sample_rate: float = TRACE_SAMPLE_RATE,
+        capture_errors: bool = TRACE_ERRORS,
+        batch_size: int = TRACE_BATCH_SIZE,
+        flush_interval: float = TRACE_FLUSH_INTERVAL,
+        max_buffer: int = TRACE_MAX_BUFFER,
+    ) -> None:
+        self.sink = sink if sink is not None else create_sink()
+        self.enabled = not isinstance(self.sink, NoneTraceSink)
+        self.sample_rate = sample_rate
+        self.capture_errors = capture_errors
+        self.batch_size = max(batch_size, 1)
+        self.flush_interval = flush_interval
+        self._threshold = int(min(max(sample_rate, 0.0), 1.0) * 10000)
+        self._buffer: deque = deque(maxlen=max_buffer)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self.counters = {"started": 0, "sampled": 0, "errors": 0, "cancelled": 0, "exported": 0, "batches": 0,
+                         "dropped": 0, "export_failures": 0}
+        self._exporter: Optional[threading.Thread] = None
+        if self.enabled:
+            self._exporter = threading.Thread(target=self._export_loop, name="trace-exporter", daemon=True)
+            self._exporter.start()
+
+    def is_sampled(self, session_id: str) -> bool:
+        return self.enabled and zlib.crc32(session_id.encode("utf-8")) % 10000 < self._threshold
+
+    def start(self, name: str, session_id: str, input: Any = None) -> Trace:
+        self.counters["started"] += 1
+        sampled = self.is_sampled(session_id)
+        if sampled:
+            self.counters["sampled"] += 1
+        return Trace(self, name, session_id, sampled and not self._closed, input)
+
+    def _submit(self, trace: dict) -> None:
+        if not self.enabled or self._closed:
+            return
+        with self._lock:
+            if trace["error"]:
+                self.counters["errors"] += 1
+            if trace["status"] == "cancelled":
+                self.counters["cancelled"] += 1
+            if len(self._buffer) == self._buffer.maxlen:
+                self.counters["dropped"] += 1
+            self._buffer.append(trace)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def _drain(self) -> None:
+        while True:
+            with self._lock:
+                batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+            if not batch:
+                return
+            try:
+                self.sink.export(batch)
+                self.counters["exported"] += len(batch)
+                self.counters["batches"] += 1
+            except Exception as e:
+                # 내보내기 실패가 요청 처리에 영향을 주지 않도록 버림
+                self.counters["export_failures"] += 1
+                logger.warning(f"trace 내보내기 실패 ({len(batch)}건 버림): {e}")
+
+    def _export_loop(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._drain()
+
+    def flush(self) -> None:
+        """버퍼에 남은 trace를 지금 내보냅니다."""
+        if self.enabled:
+            self._drain()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._exporter is not None:
+            self._wakeup.set()
+            self._exporter.join(timeout=10)
+        self.flush()
+        self.sink.close()
+
+    def stats(self) -> dict:
+        return {
+            "sink": type(self.sink).__name__,
+            "sample_rate": self.sample_rate,
+            "buffered": len(self._buffer),
+            **self.counters,
+        }
+
+
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Tracer:
+    """프로세스 공용 Tracer"""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer()
+    return _tracer
+
+
+def close_tracer() -> None:
+    global _tracer
+    if _tracer is not None:
+        _tracer.close()
+        _tracer = None
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+DevOps ReAct 에이전트 노드별 오버헤드 벤치마크 (replay LLM + 스텁 MCP 도구, 완전 오프라인)
+
+benchmarks/replay_script.json 의 응답(도구 호출 포함)으로 react_using_mcp 의 에이전트를 실행하고
+노드(agent / tools)별 실행 시간을 집계합니다. MCP 서버 없이 고정 응답을 돌려주는 스텁 도구를 사용합니다.
+
+실행 (using_mcp 디렉토리에서): python benchmarks/bench_react_overhead.py [--requests 100] [--llm-latency-ms 0]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import HumanMessage
+from langchain_core.tools import StructuredTool
+
+import llm_provider
+import react_using_mcp
+from llm_provider import ReplayScript, set_llm_provider
+
+SCRIPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "replay_script.json")
+
+# 스텁 MCP 도구가 돌려줄 고정 응답
+STUB_RESULTS = {
+    "deploy_application": {"status": "success", "app_name": "order-service", "sync_status": "Synced"},
+    "check_deployment_status": {"app_name": "order-service", "health": "Healthy", "pods": 3},
+    "get_dashboard_metrics": {"dashboard": "CPU 사용률", "cpu_usage": "42%"},
+}
+
+
+def make_stub_tool(name: str, result: dict) -> StructuredTool:
+    async def _call(**kwargs: Any) -> str:
+        return json.dumps(result, ensure_ascii=False)
+
+    arg_name = "dashboard_name" if name == "get_dashboard_metrics" else "app_name"
+    schema = {"type": "object", "properties": {arg_name: {"type": "string"}}}
+    return StructuredTool(name=name, description=f"{name} (stub)", args_schema=schema, coroutine=_call)
+
+
+class NodeTimer(BaseCallbackHandler):
+    """ReAct 그래프 노드별 실행 시간을 모읍니다."""
+
+    run_inline = True
+
+    def __init__(self) -> None:
+        self._started: Dict[UUID, tuple] = {}
+        self.durations = defaultdict(list)
+
+    def on_chain_start(self, serialized, inputs, *, run_id: UUID, parent_run_id: Optional[UUID] = None,
+                       metadata: Optional[dict] = None, **kwargs: Any) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        if node and kwargs.get("name") == node:
+            self._started[run_id] = (node, time.perf_counter())
+
+    def on_chain_end(self, outputs, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            node, start = started
+            self.durations[node].append((time.perf_counter() - start) * 1000)
+
+    def on_chain_error(self, error, *, run_id: UUID, **kwargs: Any) -> None:
+        self.on_chain_end(None, run_id=run_id)
+
+
+def install_offline_stubs(llm_latency_ms: float) -> None:
+    llm_provider.LLM_REPLAY_LATENCY_MS = llm_latency_ms
+    set_llm_provider("replay", ReplayScript.load(SCRIPT_PATH))
+    tools = [make_stub_tool(name, result) for name, result in STUB_RESULTS.items()]
+
+    async def get_stub_tools():
+        return tools
+
+    react_using_mcp.get_tools_with_details = get_stub_tools
+
+
+def p95(values: list) -> float:
+    ordered = sorted(values)
+    return ordered[max(int(len(ordered) * 0.95) - 1, 0)]
+
+
+async def main(requests: int, llm_latency_ms: float) -> None:
+    install_offline_stubs(llm_latency_ms)
+    with contextlib.redirect_stdout(io.StringIO()):
+        agent = await react_using_mcp.create_devops_agent()
+
+    timer = NodeTimer()
+    latencies = []
+    for _ in range(requests):
+        inputs = {"messages": [HumanMessage(content="오더 서비스를 배포하고 상태를 확인해줘")]}
+        start = time.perf_counter()
+        # create_react_agent(debug=True) 출력은 버림
+        with contextlib.redirect_stdout(io.StringIO()):
+            await agent.ainvoke(inputs, config={"callbacks": [timer]})
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    print(f"requests: {requests} (replay LLM latency {llm_latency_ms}ms, stub MCP)")
+    print(f"request mean={statistics.mean(latencies):.2f}ms p95={p95(latencies):.2f}ms")
+    print(f"  {'node':10} {'calls':>6} {'mean':>9} {'p95':>9}")
+    for node, durations in sorted(timer.durations.items()):
+        print(f"  {node:10} {len(durations):6d} {statistics.mean(durations):7.2f}ms {p95(durations):7.2f}ms")
+    print(f"\nreplay stats: {llm_provider.get_llm_provider_stats()['replay']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.llm_latency_ms))
@@ -12,7 +12,7 @@ import os
 import asyncio
 from typing import Dict, List, Any
 
-from langchain_google_vertexai import ChatVertexAI
+from llm_provider import get_chat_model
 from dotenv import load_dotenv
 
 # 환경 변수 로드
@@ -30,7 +30,7 @@ import os
 import asyncio
 from typing import Dict, List, Any
 
-from langchain_google_vertexai import ChatVertexAI
+from llm_provider import get_chat_model
 from dotenv import load_dotenv
 
 # 환경 변수 로드
@@ -117,7 +117,8 @@ async def get_llm():
         model_name = os.environ.get("VERTEX_MODEL", "gemini-2.0-flash")
         print(f"LLM 모델 초기화: {model_name}")
         
-        _llm_instance = ChatVertexAI(
+        _llm_instance = get_chat_model(
+            "planner",
             model=model_name,
             temperature=0.2,
             max_output_tokens=8190
@@ -389,7 +390,8 @@ async def get_llm():
         model_name = os.environ.get("VERTEX_MODEL", "gemini-2.0-flash")
         print(f"LLM 모델 초기화: {model_name}")
         
-        _llm_instance = ChatVertexAI(
+        _llm_instance = get_chat_model(
+            "planner",
             model=model_name,
             temperature=0.2,
             max_output_tokens=8190
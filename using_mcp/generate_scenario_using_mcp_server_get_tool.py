@@ -15,7 +15,7 @@ import signal
 from typing import Dict, List, Any
 import contextlib
 
-from langchain_google_vertexai import ChatVertexAI
+from llm_provider import get_chat_model
 from dotenv import load_dotenv
 from langchain_mcp_adapters.client import MultiServerMCPClient
 
@@ -162,7 +162,8 @@ async def get_llm():
         model_name = os.environ.get("VERTEX_MODEL", "gemini-2.0-flash")
         print(f"LLM 모델 초기화: {model_name}")
         
-        _llm_instance = ChatVertexAI(
+        _llm_instance = get_chat_model(
+            "planner",
             model=model_name,
             temperature=0.2,
             max_output_tokens=8190
@@ -15,7 +15,7 @@ from typing import Dict, List, Any, Literal
 from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 
-from langchain_google_vertexai import ChatVertexAI
+from llm_provider import get_chat_model
 
 from langgraph.graph import StateGraph, END, MessagesState
 from langgraph.prebuilt import create_react_agent
@@ -35,6 +35,10 @@ load_dotenv()
 _agent_instance = None
 _mcp_client = None
 
+# 대화 이력 토큰 예산 / 그대로 유지할 최근 턴 수
+HISTORY_TOKEN_BUDGET = int(os.environ.get("HISTORY_TOKEN_BUDGET", "6000"))
+HISTORY_KEEP_TURNS = int(os.environ.get("HISTORY_KEEP_TURNS", "4"))
+
 # MCP 서버 URL 설정
 MCP_SERVERS = {
     "grafana": {
@@ -119,7 +123,8 @@ async def create_devops_agent():
     try:
         # LLM 초기화
         print("LLM 초기화 중...")
-        llm = ChatVertexAI(
+        llm = get_chat_model(
+            "devops",
             model=model_name,
             temperature=0.1,
             max_output_tokens=8190
@@ -196,6 +201,45 @@ async def create_devops_agent():
     
     return _agent_instance
 
+# 토큰 수 추정 함수
+def estimate_tokens(text: str) -> int:
+    """토크나이저 없이 토큰 수를 대략 계산합니다. (영문 약 4자/토큰, 한글 등은 약 1.5자/토큰)"""
+    if not isinstance(text, str):
+        text = json.dumps(text, ensure_ascii=False, default=str)
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return ascii_chars // 4 + int((len(text) - ascii_chars) / 1.5) + 1
+
+# 대화 이력 압축 함수
+def trim_conversation_history(history: List) -> List:
+    """
+    최근 HISTORY_KEEP_TURNS개 턴은 그대로 두고, 그 이전 메시지는 토큰 예산 안에서 최신 것부터 유지합니다.
+    (conversation_history에는 사용자 메시지와 최종 답변만 쌓이므로 도구 호출은 포함되지 않음)
+    """
+    total = sum(estimate_tokens(msg.content) for msg in history)
+    if total <= HISTORY_TOKEN_BUDGET:
+        return history
+
+    # 사용자 메시지 기준으로 최근 턴의 시작 위치 찾기
+    human_indexes = [i for i, msg in enumerate(history) if isinstance(msg, HumanMessage)]
+    split = human_indexes[-HISTORY_KEEP_TURNS] if len(human_indexes) >= HISTORY_KEEP_TURNS else 0
+    recent = history[split:]
+    remaining = HISTORY_TOKEN_BUDGET - sum(estimate_tokens(msg.content) for msg in recent)
+
+    kept = []
+    for msg in reversed(history[:split]):
+        cost = estimate_tokens(msg.content)
+        if cost > remaining:
+            break
+        kept.append(msg)
+        remaining -= cost
+    kept.reverse()
+    # 사용자 메시지로 시작하도록 정리
+    while kept and not isinstance(kept[0], HumanMessage):
+        kept.pop(0)
+
+    print(f"(대화 이력 압축: {len(history)} → {len(kept) + len(recent)} 메시지)")
+    return kept + recent
+
 # 대화 인터페이스 구현
 async def run_conversation_async():
     """대화형 인터페이스 실행 (비동기)"""
@@ -216,8 +260,9 @@ async def run_conversation_async():
             print("대화를 종료합니다. 감사합니다.")
             break
         
-        # 사용자 메시지 추가
+        # 사용자 메시지 추가 후 토큰 예산에 맞게 이력 정리
         conversation_history.append(HumanMessage(content=user_input))
+        conversation_history = trim_conversation_history(conversation_history)
         
         # 에이전트에 입력 전달
         inputs = {"messages": conversation_history}